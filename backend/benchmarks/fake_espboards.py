@@ -0,0 +1,120 @@
+"""
+Offline stand-in for espboards.dev: serves the fixture pages under
+`fixtures/espboards` (catalog, microcontroller and board pages) plus a tiny PNG
+for every image, optionally with an artificial upstream latency.
+
+    python benchmarks/fake_espboards.py --port 8099 --delay-ms 50
+    ESPBOARDS_URL=http://127.0.0.1:8099 PYTHONPATH=src python -m eve_schema_service
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import re
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "espboards"
+
+# 1x1 transparent PNG.
+PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=")
+
+_CARD_RE = re.compile(r'href="/(?:esp32|esp8266)/([^/"]+)/".*?<h3[^>]*>([^<]+)</h3>', re.DOTALL)
+_MICRO_RE = re.compile(r"^/esp32/microcontroller/([a-z0-9-]+)/$")
+_BOARD_RE = re.compile(r"^/(esp32|esp8266)/([a-z0-9-]+)/$")
+
+
+class FakeEspboards:
+    """Threaded HTTP server on 127.0.0.1; use as a context manager and read `url`."""
+
+    def __init__(self, *, port: int = 0, delay_ms: float = 0.0, fixtures: Path = FIXTURES) -> None:
+        self.fixtures = fixtures
+        self.delay_s = delay_ms / 1000
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._board = string.Template((fixtures / "board.html").read_text(encoding="utf-8"))
+        self._names: dict[str, str] = {}
+        for page in fixtures.glob("*.html"):
+            for slug, name in _CARD_RE.findall(page.read_text(encoding="utf-8")):
+                self._names.setdefault(slug, name.strip())
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-espboards", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def board_slugs(self) -> list[str]:
+        return sorted(self._names)
+
+    def __enter__(self) -> FakeEspboards:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def page(self, path: str) -> tuple[bytes, str] | None:
+        """(body, content type) served for `path`, or None for a 404."""
+        if path.startswith("/img/") and path.endswith(".png"):
+            return PNG, "image/png"
+        if path in ("/esp32/", "/esp8266/"):
+            fixture = self.fixtures / f"{path.strip('/')}.html"
+        elif m := _MICRO_RE.match(path):
+            fixture = self.fixtures / f"microcontroller-{m.group(1)}.html"
+        elif (m := _BOARD_RE.match(path)) and m.group(2) in self._names:
+            html = self._board.safe_substitute(slug=m.group(2), name=self._names[m.group(2)])
+            return html.encode("utf-8"), "text/html; charset=utf-8"
+        else:
+            return None
+        if not fixture.is_file():
+            return None
+        return fixture.read_bytes(), "text/html; charset=utf-8"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                with fake._lock:
+                    fake.requests += 1
+                if fake.delay_s:
+                    time.sleep(fake.delay_s)
+                found = fake.page(self.path.split("?", 1)[0])
+                body, content_type = found if found is not None else (b"not found", "text/plain")
+                self.send_response(200 if found is not None else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_: object) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="artificial latency per upstream request")
+    args = parser.parse_args()
+    with FakeEspboards(port=args.port, delay_ms=args.delay_ms) as fake:
+        print(f"serving {len(fake.board_slugs)} boards at {fake.url}", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Replay thousands of small edits through the project history store and report
+storage amplification.
+
+    PYTHONPATH=src python benchmarks/history_amplification.py --edits 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from eve_schema_service.project_history import HistoryStore
+
+
+def _base_config(sensors: int) -> list[str]:
+    lines = [
+        "esphome:\n",
+        "  name: bench-device\n",
+        "esp32:\n",
+        "  board: esp32dev\n",
+        "wifi:\n",
+        "  ssid: !secret wifi_ssid\n",
+        "  password: !secret wifi_password\n",
+        "sensor:\n",
+    ]
+    for i in range(sensors):
+        lines += [
+            "  - platform: template\n",
+            f"    name: Sensor {i}\n",
+            f"    id: sensor_{i}\n",
+            "    update_interval: 60s\n",
+            "    accuracy_decimals: 1\n",
+            "    lambda: |-\n",
+            f"      return id(sensor_{i}).state * {i % 7 + 1};\n",
+        ]
+    return lines
+
+
+def _edit(lines: list[str], rng: random.Random) -> None:
+    op = rng.random()
+    i = rng.randrange(8, len(lines))
+    if op < 0.7:
+        # Tweak a value in place (the common "change one option" save).
+        if re.search(r"[0-9]+", lines[i]):
+            lines[i] = re.sub(r"[0-9]+", str(rng.randrange(1000)), lines[i], count=1)
+        else:
+            lines[i] = lines[i].rstrip("\n") + " # edited\n"
+    elif op < 0.85:
+        lines.insert(i, f"    # note {rng.randrange(10_000)}\n")
+    elif len(lines) > 16:
+        del lines[i]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edits", type=int, default=5000)
+    parser.add_argument("--sensors", type=int, default=80)
+    parser.add_argument("--keep", type=int, default=0, help="revisions kept per project (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lines = _base_config(args.sensors)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(Path(tmp) / "history.sqlite3", keep=args.keep)
+        started = time.perf_counter()
+        for _ in range(args.edits):
+            _edit(lines, rng)
+            store.record("bench", "".join(lines))
+        elapsed = time.perf_counter() - started
+        store.gc()
+        stats = store.stats()
+        db_bytes = sum(p.stat().st_size for p in Path(tmp).iterdir())
+        store.close()
+
+    stats.update(
+        edits=args.edits,
+        documentBytes=len("".join(lines)),
+        sqliteFileBytes=db_bytes,
+        recordMsAvg=round(elapsed / args.edits * 1000, 3),
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
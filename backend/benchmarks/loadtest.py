@@ -0,0 +1,515 @@
+"""
+Load-test the service with concurrent simulated editors and report throughput,
+latency percentiles and error rates per endpoint (and per scenario) as JSON.
+
+Each virtual user opens a project (project, component list and the schemas it
+uses, revalidated with ETags like a browser cache), auto-saves small edits with
+`If-Match`, sends validation bursts and browses the board catalog. The server
+runs as a subprocess against fresh temporary projects/cache directories, and
+board pages come from a local fake espboards.dev (`fake_espboards.py`), so runs
+are offline and reproducible for a given `--seed`.
+
+    PYTHONPATH=src python benchmarks/loadtest.py --users 20 --duration 30
+    PYTHONPATH=src python benchmarks/loadtest.py --workers 4 --mix open=1,save=8,validate=0,boards=2
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from fake_espboards import FakeEspboards
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# (domain, platform) pairs and core components used by the seeded projects.
+PLATFORMS = [
+    ("sensor", "template"),
+    ("sensor", "uptime"),
+    ("switch", "gpio"),
+    ("binary_sensor", "gpio"),
+    ("output", "gpio"),
+    ("light", "binary"),
+]
+CORE_COMPONENTS = ["wifi", "api", "logger"]
+DEFAULT_MIX = "open=2,save=10,validate=1,boards=3"
+PERCENTILES = (50, 90, 95, 99)
+
+_INTERVAL_RE = re.compile(r"update_interval: (\d+)s")
+
+
+def project_yaml(name: str, sensors: int) -> str:
+    lines = [
+        "esphome:",
+        f"  name: {name}",
+        "esp32:",
+        "  board: esp32dev",
+        "logger:",
+        "api:",
+        "wifi:",
+        "  ssid: !secret wifi_ssid",
+        "  password: !secret wifi_password",
+        "sensor:",
+        "  - platform: uptime",
+        "    name: Uptime",
+    ]
+    for i in range(sensors):
+        lines += [
+            "  - platform: template",
+            f"    name: Sensor {i}",
+            f"    lambda: return {i}.0;",
+            f"    update_interval: {60 + i}s",
+        ]
+    lines += [
+        "switch:",
+        "  - platform: gpio",
+        "    name: Relay",
+        "    pin: GPIO4",
+        "binary_sensor:",
+        "  - platform: gpio",
+        "    name: Button",
+        "    pin: GPIO0",
+        "output:",
+        "  - platform: gpio",
+        "    id: led_out",
+        "    pin: GPIO2",
+        "light:",
+        "  - platform: binary",
+        "    name: LED",
+        "    output: led_out",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class Recorder:
+    """Thread-safe latency samples and status counts per endpoint label and per scenario."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = {}
+        self.statuses: dict[str, Counter[str]] = {}
+        self.errors: Counter[str] = Counter()
+        self.scenarios: dict[str, list[float]] = {}
+        self.scenario_failures: Counter[str] = Counter()
+
+    def request(self, label: str, seconds: float, status: str, *, error: bool) -> None:
+        with self._lock:
+            self.latencies.setdefault(label, []).append(seconds)
+            self.statuses.setdefault(label, Counter())[status] += 1
+            if error:
+                self.errors[label] += 1
+
+    def scenario(self, name: str, seconds: float, *, ok: bool) -> None:
+        with self._lock:
+            self.scenarios.setdefault(name, []).append(seconds)
+            if not ok:
+                self.scenario_failures[name] += 1
+
+
+class Client:
+    """One keep-alive connection per virtual user, like a browser tab."""
+
+    def __init__(self, host: str, port: int, recorder: Recorder, *, timeout_s: float) -> None:
+        self.host, self.port, self.timeout_s = host, port, timeout_s
+        self.recorder = recorder
+        self._conn: http.client.HTTPConnection | None = None
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def request(
+        self,
+        label: str,
+        method: str,
+        path: str,
+        *,
+        body: object = None,
+        headers: dict[str, str] | None = None,
+        expect: tuple[int, ...] = (200,),
+    ) -> tuple[int, dict[str, str], bytes]:
+        """(status, lowercased headers, decoded body); status 0 on a transport error."""
+        send_headers = {"Accept-Encoding": "gzip", **(headers or {})}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            send_headers["Content-Type"] = "application/json"
+        started = time.perf_counter()
+        try:
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout_s)
+            self._conn.request(method, path, body=payload, headers=send_headers)
+            resp = self._conn.getresponse()
+            data = resp.read()
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            status = resp.status
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            self.recorder.request(label, time.perf_counter() - started, type(e).__name__, error=True)
+            return 0, {}, b""
+        elapsed = time.perf_counter() - started
+        if resp_headers.get("content-encoding") == "gzip":
+            data = gzip.decompress(data)
+        self.recorder.request(label, elapsed, str(status), error=status not in expect)
+        return status, resp_headers, data
+
+
+@dataclass
+class Editor:
+    """What one user's browser remembers between actions."""
+
+    project: str
+    yaml: str | None = None
+    etag: str | None = None
+    # path -> ETag of cached GET responses (schemas, component list).
+    cached: dict[str, str] = field(default_factory=dict)
+
+
+def _cached_get(client: Client, editor: Editor, label: str, path: str) -> bool:
+    etag = editor.cached.get(path)
+    status, headers, _ = client.request(
+        label, "GET", path, headers={"If-None-Match": etag} if etag else None, expect=(200, 304)
+    )
+    if status == 200 and "etag" in headers:
+        editor.cached[path] = headers["etag"]
+    return status in (200, 304)
+
+
+def _load_project(client: Client, editor: Editor) -> bool:
+    path = f"/api/projects/{editor.project}"
+    headers = {"If-None-Match": editor.etag} if editor.etag and editor.yaml is not None else None
+    status, _, body = client.request("GET /api/projects/{name}", "GET", path, headers=headers, expect=(200, 304))
+    if status == 200:
+        data = json.loads(body)
+        editor.yaml, editor.etag = data["yaml"], data["etag"]
+    return status in (200, 304)
+
+
+def open_project(client: Client, editor: Editor, rng: random.Random) -> bool:
+    ok = client.request("GET /api/projects", "GET", "/api/projects")[0] == 200
+    ok = _load_project(client, editor) and ok
+    ok = _cached_get(client, editor, "GET /api/components", "/api/components") and ok
+    for domain, platform in PLATFORMS:
+        ok = (
+            _cached_get(client, editor, "GET /api/schema/{domain}/{platform}", f"/api/schema/{domain}/{platform}")
+            and ok
+        )
+    for name in CORE_COMPONENTS:
+        ok = _cached_get(client, editor, "GET /api/core-schema/{name}", f"/api/core-schema/{name}") and ok
+    return ok
+
+
+def auto_save(client: Client, editor: Editor, rng: random.Random) -> bool:
+    if editor.yaml is None and not _load_project(client, editor):
+        return False
+    assert editor.yaml is not None
+    # The common edit: change one option value.
+    editor.yaml = _INTERVAL_RE.sub(lambda _: f"update_interval: {rng.randrange(10, 600)}s", editor.yaml, count=1)
+    status, headers, body = client.request(
+        "PUT /api/projects/{name}",
+        "PUT",
+        f"/api/projects/{editor.project}",
+        body={"yaml": editor.yaml},
+        headers={"If-Match": editor.etag} if editor.etag else None,
+        expect=(200, 412),
+    )
+    if status == 200:
+        editor.etag = json.loads(body)["etag"]
+        return True
+    if status == 412:
+        # Another editor saved first: reload their version and carry on from it.
+        editor.etag = headers.get("etag")
+        editor.yaml = None
+        return _load_project(client, editor)
+    return False
+
+
+def validate_burst(client: Client, editor: Editor, rng: random.Random, *, burst: int) -> bool:
+    if editor.yaml is None and not _load_project(client, editor):
+        return False
+    results: list[bool] = []
+
+    def send(c: Client) -> None:
+        status = c.request("POST /api/validate", "POST", "/api/validate", body={"yaml": editor.yaml})[0]
+        results.append(status == 200)
+
+    # Repeated clicks on "Validate" from several tabs at once.
+    extra = [Client(client.host, client.port, client.recorder, timeout_s=client.timeout_s) for _ in range(burst - 1)]
+    threads = [threading.Thread(target=send, args=(c,)) for c in extra]
+    for t in threads:
+        t.start()
+    send(client)
+    for t in threads:
+        t.join()
+    for c in extra:
+        c.close()
+    return all(results)
+
+
+def browse_boards(client: Client, editor: Editor, rng: random.Random) -> bool:
+    target = rng.choice(["esp32", "esp8266"])
+    status, _, body = client.request("GET /api/espboards/{target}", "GET", f"/api/espboards/{target}")
+    if status != 200:
+        return False
+    boards = json.loads(body)["boards"]
+    ok = True
+    for board in rng.sample(boards, min(2, len(boards))):
+        status, _, body = client.request(
+            "GET /api/espboards/{target}/{slug}", "GET", f"/api/espboards/{target}/{board['slug']}"
+        )
+        ok = ok and status == 200
+        images = [board.get("imageUrl")]
+        if status == 200:
+            details = json.loads(body)
+            images += [details.get("boardImageUrl"), details.get("pinoutImageUrl")]
+        for url in images:
+            if isinstance(url, str) and url.startswith("/api/espboards/img/"):
+                ok = _cached_get(client, editor, "GET /api/espboards/img/{key}", url) and ok
+    return ok
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("open", "save", "validate", "boards"):
+            raise SystemExit(f"unknown scenario {name!r} in --mix")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise SystemExit("--mix needs at least one scenario with a positive weight")
+    return mix
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    out = {f"p{p}": round(ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)] * 1000, 2) for p in PERCENTILES}
+    out["mean"] = round(sum(ordered) / len(ordered) * 1000, 2)
+    out["max"] = round(ordered[-1] * 1000, 2)
+    return out
+
+
+def summarize(recorder: Recorder, duration_s: float) -> dict[str, object]:
+    endpoints: dict[str, object] = {}
+    for label in sorted(recorder.latencies):
+        samples = recorder.latencies[label]
+        endpoints[label] = {
+            "requests": len(samples),
+            "errors": recorder.errors[label],
+            "errorRate": round(recorder.errors[label] / len(samples), 4),
+            "throughputRps": round(len(samples) / duration_s, 2),
+            "statuses": dict(sorted(recorder.statuses[label].items())),
+            "latencyMs": _percentiles(samples),
+        }
+    scenarios: dict[str, object] = {}
+    for name in sorted(recorder.scenarios):
+        samples = recorder.scenarios[name]
+        scenarios[name] = {
+            "runs": len(samples),
+            "failures": recorder.scenario_failures[name],
+            "latencyMs": _percentiles(samples),
+        }
+    total = sum(len(s) for s in recorder.latencies.values())
+    errors = sum(recorder.errors.values())
+    all_samples = [x for s in recorder.latencies.values() for x in s]
+    return {
+        "durationSeconds": round(duration_s, 3),
+        "total": {
+            "requests": total,
+            "errors": errors,
+            "errorRate": round(errors / total, 4) if total else 0.0,
+            "throughputRps": round(total / duration_s, 2),
+            "latencyMs": _percentiles(all_samples) if all_samples else {},
+        },
+        "endpoints": endpoints,
+        "scenarios": scenarios,
+    }
+
+
+def run_users(
+    host: str,
+    port: int,
+    *,
+    users: int,
+    projects: list[str],
+    duration_s: float,
+    mix: dict[str, float],
+    think_s: float,
+    ramp_up_s: float,
+    validate_burst_size: int,
+    seed: int,
+    timeout_s: float,
+) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    scenarios: dict[str, Callable[[Client, Editor, random.Random], bool]] = {
+        "open": open_project,
+        "save": auto_save,
+        "validate": lambda c, e, r: validate_burst(c, e, r, burst=validate_burst_size),
+        "boards": browse_boards,
+    }
+    names = [n for n, w in mix.items() if w > 0]
+    weights = [mix[n] for n in names]
+    started = time.perf_counter()
+    deadline = started + duration_s
+
+    def user(index: int) -> None:
+        rng = random.Random(seed * 10_007 + index)
+        time.sleep(ramp_up_s * index / max(users, 1))
+        client = Client(host, port, recorder, timeout_s=timeout_s)
+        # Several users share a project once there are more users than projects.
+        editor = Editor(project=projects[index % len(projects)])
+        name = "open"  # every session starts by opening its project
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            ok = scenarios[name](client, editor, rng)
+            recorder.scenario(name, time.perf_counter() - t0, ok=ok)
+            if think_s > 0:
+                time.sleep(min(rng.expovariate(1 / think_s), max(deadline - time.perf_counter(), 0)))
+            name = rng.choices(names, weights)[0]
+        client.close()
+
+    threads = [threading.Thread(target=user, args=(i,), name=f"user-{i}") for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - started
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def start_server(env: dict[str, str], port: int, *, timeout_s: float = 60.0) -> subprocess.Popen[bytes]:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "eve_schema_service"],
+        env={**env, "HOST": "127.0.0.1", "PORT": str(port)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout_s:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/meta", timeout=1) as resp:
+                resp.read()
+                return proc
+        except OSError:
+            time.sleep(0.05)
+    stop_server(proc)
+    raise TimeoutError(f"no /api/meta response within {timeout_s:g}s")
+
+
+def stop_server(proc: subprocess.Popen[bytes]) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated editors")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds of unmeasured load first (warm caches)")
+    parser.add_argument("--ramp-up", type=float, default=1.0, help="seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=250.0, help="mean pause between a user's actions")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--projects", type=int, default=0, help="projects to seed (default: one per user)")
+    parser.add_argument("--sensors", type=int, default=20, help="template sensors per seeded project")
+    parser.add_argument("--validate-burst", type=int, default=3, help="concurrent validations per burst")
+    parser.add_argument("--workers", type=int, default=1, help="server processes (WORKERS)")
+    parser.add_argument("--upstream-delay-ms", type=float, default=50.0, help="fake espboards latency")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="also write the JSON report here")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory(prefix="eve-load-") as tmp, FakeEspboards(delay_ms=args.upstream_delay_ms) as fake:
+        projects_dir = Path(tmp) / "projects"
+        projects_dir.mkdir()
+        projects = [f"load-{i}" for i in range(args.projects or args.users)]
+        for name in projects:
+            (projects_dir / f"{name}.yaml").write_text(project_yaml(name, args.sensors), encoding="utf-8")
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (str(SRC), env.get("PYTHONPATH", "")) if p)
+        env.update(
+            PROJECTS_DIR=str(projects_dir),
+            CACHE_DIR=str(Path(tmp) / "cache"),
+            ESPBOARDS_URL=fake.url,
+            WORKERS=str(args.workers),
+            RELOAD="0",
+            PIN_INDEX_ON_STARTUP="0",
+            WARM_USED_SCHEMAS="0",
+            STATIC_DIR="",
+        )
+        port = _free_port()
+        server_started = time.perf_counter()
+        proc = start_server(env, port)
+        startup_s = time.perf_counter() - server_started
+        try:
+            common = {
+                "users": args.users,
+                "projects": projects,
+                "mix": mix,
+                "think_s": args.think_ms / 1000,
+                "validate_burst_size": max(args.validate_burst, 1),
+                "timeout_s": args.timeout,
+            }
+            if args.warmup > 0:
+                run_users("127.0.0.1", port, duration_s=args.warmup, ramp_up_s=0, seed=args.seed + 1, **common)
+            recorder, duration_s = run_users(
+                "127.0.0.1", port, duration_s=args.duration, ramp_up_s=args.ramp_up, seed=args.seed, **common
+            )
+        finally:
+            stop_server(proc)
+        upstream_requests = fake.requests
+
+    report = {
+        "config": {
+            "users": args.users,
+            "projects": len(projects),
+            "workers": args.workers,
+            "mix": mix,
+            "thinkMs": args.think_ms,
+            "warmupSeconds": args.warmup,
+            "validateBurst": args.validate_burst,
+            "upstreamDelayMs": args.upstream_delay_ms,
+            "seed": args.seed,
+        },
+        "serverStartupSeconds": round(startup_s, 3),
+        "upstreamRequests": upstream_requests,
+        **summarize(recorder, duration_s),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
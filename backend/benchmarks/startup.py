@@ -0,0 +1,127 @@
+"""
+Measure service startup: import time of the app module (per module, from
+`python -X importtime`) and the time from process start to the first
+successful `/api/meta` (what the Docker healthcheck waits for).
+
+    PYTHONPATH=src python benchmarks/startup.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Modules that must only load on first use (schema requests, validation, ...).
+HEAVY_MODULES = ("esphome", "voluptuous", "eve_schema_service.convert.voluptuous_to_ui")
+
+
+def _env(projects_dir: Path) -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(SRC), env.get("PYTHONPATH", "")) if p)
+    env.update(PROJECTS_DIR=str(projects_dir), WORKERS="1", RELOAD="0", PIN_INDEX_ON_STARTUP="0")
+    env.update(WARM_USED_SCHEMAS="0", STATIC_DIR="")
+    return env
+
+
+def import_profile(env: dict[str, str]) -> tuple[float, list[dict[str, object]]]:
+    """Seconds to import the app module, plus per-module self/cumulative import times."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import eve_schema_service.server"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules: list[dict[str, object]] = []
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if not self_us.isdigit():
+            continue  # header line
+        modules.append({"module": name, "selfMs": int(self_us) / 1000, "cumulativeMs": int(cumulative_us) / 1000})
+        if name == "eve_schema_service.server":
+            total_us = int(cumulative_us)
+    return total_us / 1e6, modules
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def time_to_first_meta(env: dict[str, str], *, timeout_s: float = 30.0) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/meta"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "eve_schema_service"],
+        env={**env, "HOST": "127.0.0.1", "PORT": str(port)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout_s:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    resp.read()
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"no /api/meta response within {timeout_s:g}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules (by self time) to report")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(Path(tmp) / "projects")
+        import_s, modules = import_profile(env)
+        first_meta = [time_to_first_meta(env) for _ in range(args.runs)]
+
+    loaded = {str(m["module"]) for m in modules}
+    print(
+        json.dumps(
+            {
+                "importSeconds": round(import_s, 4),
+                "firstMetaSeconds": {
+                    "min": round(min(first_meta), 4),
+                    "median": round(statistics.median(first_meta), 4),
+                    "max": round(max(first_meta), 4),
+                    "runs": args.runs,
+                },
+                "heavyModulesImported": [m for m in HEAVY_MODULES if m in loaded],
+                "slowestModules": sorted(modules, key=lambda m: float(str(m["selfMs"])), reverse=True)[: args.top],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
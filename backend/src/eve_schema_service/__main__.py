@@ -9,7 +9,21 @@ def main() -> None:
     host = os.environ.get("HOST") or os.environ.get("EVE_HOST", "0.0.0.0")
     port = int(os.environ.get("PORT") or os.environ.get("EVE_PORT") or "6056")
     reload = (os.environ.get("RELOAD") or os.environ.get("EVE_RELOAD") or "0") == "1"
-    uvicorn.run("eve_schema_service.server:app", host=host, port=port, reload=reload)
+    workers = int(os.environ.get("WORKERS") or os.environ.get("EVE_WORKERS") or "1")
+    prefork = (os.environ.get("PREFORK") or os.environ.get("EVE_PREFORK") or "1") == "1"
+    if workers > 1 and prefork and not reload and hasattr(os, "fork"):
+        from .prefork import serve_prefork
+        from .server import app, prefork_warm
+
+        serve_prefork(app, host=host, port=port, workers=workers, warm=prefork_warm)
+        return
+    uvicorn.run(
+        "eve_schema_service.server:app",
+        host=host,
+        port=port,
+        reload=reload,
+        workers=workers if workers > 1 and not reload else None,
+    )
 
 
 if __name__ == "__main__":
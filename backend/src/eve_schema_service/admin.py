@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+from . import espboards
+from .esphome_introspect import load_component_ui_schema, load_core_component_ui_schema, load_esphome_root_ui_schema
+from .http_errors import BadRequest, NotFound, Unauthorized
+from .memory_report import (
+    build_report,
+    deep_sizeof,
+    forget_payloads,
+    payload_bytes,
+    process_usage,
+    release_free_memory,
+)
+from .metrics import lru_stats
+from .pin_index import get_pin_index
+from .profiling import ProfileStore, check_token
+from .responses import JSONResponse
+
+if TYPE_CHECKING:
+    from .compression import CompressedBodyCache
+    from .search_index import SearchIndex
+
+
+class _AdminState:
+    """What the admin endpoints act on; set by the server (see `configure_admin` and `use_caches`)."""
+
+    token: str = ""
+    profiles: ProfileStore | None = None
+    compressed_bodies: CompressedBodyCache | None = None
+    search: SearchIndex | None = None
+
+
+_state = _AdminState()
+
+
+def configure_admin(*, token: str, profiles: ProfileStore | None) -> None:
+    _state.token = token
+    _state.profiles = profiles
+
+
+def use_caches(*, compressed_bodies: CompressedBodyCache, search: SearchIndex) -> None:
+    _state.compressed_bodies = compressed_bodies
+    _state.search = search
+
+
+def require_admin(request: Request) -> None:
+    if not _state.token:
+        raise NotFound("Admin endpoints need an ADMIN_TOKEN.")
+    if not check_token(_state.token, request.headers):
+        raise Unauthorized("Admin token required.")
+
+
+def _admin_store(request: Request) -> ProfileStore:
+    if _state.profiles is None:
+        raise NotFound("Profiling is disabled.")
+    require_admin(request)
+    return _state.profiles
+
+
+async def profiles_list(request: Request) -> JSONResponse:
+    try:
+        store = _admin_store(request)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except Unauthorized as e:
+        return JSONResponse({"detail": str(e)}, status_code=401)
+    return JSONResponse({"profiles": await run_in_threadpool(store.list)})
+
+
+async def profiles_capture(request: Request) -> JSONResponse:
+    try:
+        store = _admin_store(request)
+        seconds = float(request.query_params.get("seconds", "10"))
+        profile_id = await run_in_threadpool(store.capture_window, seconds)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except Unauthorized as e:
+        return JSONResponse({"detail": str(e)}, status_code=401)
+    except (BadRequest, ValueError) as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse({"id": profile_id})
+
+
+async def profile_download(request: Request) -> Response:
+    profile_id = request.path_params["profile_id"]
+    try:
+        store = _admin_store(request)
+        if request.query_params.get("format") == "text":
+            text = await run_in_threadpool(
+                store.pstats_text, profile_id, sort=request.query_params.get("sort", "cumulative")
+            )
+            return Response(text, media_type="text/plain; charset=utf-8")
+        mode, path = store.path(profile_id)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except Unauthorized as e:
+        return JSONResponse({"detail": str(e)}, status_code=401)
+    except (BadRequest, KeyError) as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return FileResponse(
+        str(path),
+        media_type="application/octet-stream" if mode == "cprofile" else "text/plain; charset=utf-8",
+        filename=path.name,
+    )
+
+
+def _cache_memory() -> dict[str, tuple[int, int]]:
+    """(entries, bytes) per in-memory cache; schema payload sizes are measured when each is built."""
+    boards = espboards.cache_memory()
+    out = {
+        "component_schema": (lru_stats(load_component_ui_schema)()[2], payload_bytes(core=False)[1]),
+        "core_schema": (lru_stats(load_core_component_ui_schema)()[2], payload_bytes(core=True)[1]),
+        "espboards_catalog": boards["catalog"],
+        "espboards_details": boards["details"],
+    }
+    if _state.compressed_bodies is not None:
+        out["compressed_bodies"] = (len(_state.compressed_bodies), _state.compressed_bodies.stats()["bytes"])
+    if _state.search is not None:
+        out["search_index"] = (len(_state.search), deep_sizeof(_state.search))
+    pins = get_pin_index()
+    if pins is not None:
+        out["pin_index"] = (len(pins), deep_sizeof(pins))
+    return out
+
+
+async def memory(request: Request) -> JSONResponse:
+    """
+    Where the memory goes: process RSS, bytes per cache, the costliest ESPHome
+    imports and schema payloads and, with MEMORY_TRACE, live allocations by
+    the component or package that made them.
+    """
+    try:
+        require_admin(request)
+        limit = min(int(request.query_params.get("limit") or 20), 500)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except Unauthorized as e:
+        return JSONResponse({"detail": str(e)}, status_code=401)
+    except ValueError:
+        return JSONResponse({"detail": "limit must be an integer."}, status_code=400)
+    caches = await run_in_threadpool(_cache_memory)
+    report = await run_in_threadpool(build_report, caches, limit=limit)
+    return JSONResponse(report, headers={"Cache-Control": "no-store"})
+
+
+async def memory_drop_caches(request: Request) -> JSONResponse:
+    """
+    Empty the in-memory schema, espboards and compressed body caches and hand
+    freed heap back to the OS. Imported ESPHome modules stay loaded; dropped
+    schemas are reloaded from the shared cache when it is enabled.
+    """
+    try:
+        require_admin(request)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except Unauthorized as e:
+        return JSONResponse({"detail": str(e)}, status_code=401)
+    before = process_usage()
+    # On the event loop: the compression middleware uses the body cache from here too.
+    dropped = {
+        "component_schema": lru_stats(load_component_ui_schema)()[2],
+        "core_schema": lru_stats(load_core_component_ui_schema)()[2],
+        "espboards": espboards.clear_caches(),
+        "compressed_bodies": _state.compressed_bodies.clear() if _state.compressed_bodies is not None else 0,
+    }
+    load_component_ui_schema.cache_clear()
+    load_core_component_ui_schema.cache_clear()
+    load_esphome_root_ui_schema.cache_clear()
+    forget_payloads()
+    trimmed = await run_in_threadpool(release_free_memory)
+    after = process_usage()
+    freed = before["rssBytes"] - after["rssBytes"] if before["rssBytes"] and after["rssBytes"] else None
+    return JSONResponse(
+        {"dropped": dropped, "before": before, "after": after, "freedRssBytes": freed, "mallocTrim": trimmed}
+    )
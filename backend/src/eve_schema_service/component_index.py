@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .fsutil import write_atomic
+
+# Bump when the persisted layout or the parsing rules change.
+INDEX_FORMAT = 3
+
+_MANIFEST_KEYS = {
+    "DEPENDENCIES": "dependencies",
+    "AUTO_LOAD": "auto_load",
+    "CONFLICTS_WITH": "conflicts_with",
+    "CODEOWNERS": "codeowners",
+}
+
+
+@dataclass(frozen=True)
+class Manifest:
+    """
+    Module-level metadata of a component (`<name>/__init__.py`) or platform module
+    (`<name>/<domain>.py`), read from the source without importing it.
+
+    `dynamic` lists the keys whose value is only known at import time (e.g.
+    `def AUTO_LOAD(config)` or a list built from another module's constant).
+    `description` is the module docstring (what the schema's `docs.description` shows).
+    """
+
+    dependencies: tuple[str, ...] = ()
+    auto_load: tuple[str, ...] = ()
+    conflicts_with: tuple[str, ...] = ()
+    codeowners: tuple[str, ...] = ()
+    dynamic: tuple[str, ...] = ()
+    description: str | None = None
+
+    def to_json(self) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        if self.dependencies:
+            out["dependencies"] = list(self.dependencies)
+        if self.auto_load:
+            out["autoLoad"] = list(self.auto_load)
+        if self.conflicts_with:
+            out["conflictsWith"] = list(self.conflicts_with)
+        if self.codeowners:
+            out["codeowners"] = list(self.codeowners)
+        if self.dynamic:
+            out["dynamic"] = list(self.dynamic)
+        if self.description:
+            out["description"] = self.description
+        return out
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> Manifest:
+        return cls(
+            dependencies=tuple(data.get("dependencies", ())),
+            auto_load=tuple(data.get("autoLoad", ())),
+            conflicts_with=tuple(data.get("conflictsWith", ())),
+            codeowners=tuple(data.get("codeowners", ())),
+            dynamic=tuple(data.get("dynamic", ())),
+            description=data.get("description"),
+        )
+
+
+@dataclass(frozen=True)
+class ComponentIndex:
+    """Every (domain, platform) pair ESPHome ships, plus manifest metadata."""
+
+    fingerprint: str
+    domains: frozenset[str]
+    components: dict[str, Manifest] = field(default_factory=dict)
+    platforms: dict[tuple[str, str], Manifest] = field(default_factory=dict)
+
+    def pairs(self) -> list[tuple[str, str]]:
+        return sorted(self.platforms)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "format": INDEX_FORMAT,
+            "fingerprint": self.fingerprint,
+            "domains": sorted(self.domains),
+            "components": {name: m.to_json() for name, m in sorted(self.components.items())},
+            "platforms": [[d, p, m.to_json()] for (d, p), m in sorted(self.platforms.items())],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> ComponentIndex:
+        if data.get("format") != INDEX_FORMAT:
+            raise ValueError("Unsupported component index format.")
+        return cls(
+            fingerprint=str(data["fingerprint"]),
+            domains=frozenset(data["domains"]),
+            components={name: Manifest.from_json(m) for name, m in data["components"].items()},
+            platforms={(d, p): Manifest.from_json(m) for d, p, m in data["platforms"]},
+        )
+
+
+def _string_constants(tree: ast.Module) -> dict[str, str]:
+    out: dict[str, str] = {}
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        ):
+            out[node.targets[0].id] = node.value.value
+    return out
+
+
+def _parse(source: bytes) -> ast.Module | None:
+    try:
+        return ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+
+def _strings(value: ast.expr, names: dict[str, str]) -> tuple[str, ...] | None:
+    if not isinstance(value, ast.List | ast.Tuple | ast.Set):
+        return None
+    out: list[str] = []
+    for elt in value.elts:
+        if isinstance(elt, ast.Constant) and isinstance(elt.value, str):
+            out.append(elt.value)
+        elif isinstance(elt, ast.Name) and elt.id in names:
+            out.append(names[elt.id])
+        else:
+            return None
+    return tuple(out)
+
+
+def parse_manifest(source: bytes, consts: dict[str, str] | None = None) -> tuple[Manifest, bool]:
+    """
+    Read DEPENDENCIES / AUTO_LOAD / CONFLICTS_WITH / CODEOWNERS,
+    IS_PLATFORM_COMPONENT and the docstring from the module-level statements of
+    `source`. Names inside the lists resolve against the module's own string
+    constants and `consts` (esphome.const).
+    """
+    tree = _parse(source)
+    if tree is None:
+        return Manifest(), False
+    names = {**(consts or {}), **_string_constants(tree)}
+    values: dict[str, tuple[str, ...]] = {}
+    dynamic: list[str] = []
+    is_platform = False
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in _MANIFEST_KEYS:
+            dynamic.append(node.name)
+            continue
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name, value = node.targets[0].id, node.value
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+            name, value = node.target.id, node.value
+        else:
+            continue
+        if name == "IS_PLATFORM_COMPONENT":
+            is_platform = isinstance(value, ast.Constant) and value.value is True
+        elif name in _MANIFEST_KEYS:
+            strings = _strings(value, names)
+            if strings is None:
+                dynamic.append(name)
+            else:
+                values[_MANIFEST_KEYS[name]] = strings
+    description = (ast.get_docstring(tree) or "").strip() or None
+    return Manifest(**values, dynamic=tuple(sorted(set(dynamic))), description=description), is_platform
+
+
+def _read(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _component_dirs(root: Path, version: str | None) -> tuple[list[os.DirEntry[str]], str]:
+    """
+    List the component directories and fingerprint them: the ESPHome version plus
+    the mtime of the components directory and of every component directory (a
+    platform module being added or removed changes its parent's mtime).
+    """
+    digest = hashlib.sha256(f"{INDEX_FORMAT}\0{version}\0{root}\0{root.stat().st_mtime_ns}".encode())
+    dirs: list[os.DirEntry[str]] = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name.startswith(("_", ".")) or not entry.is_dir():
+                continue
+            dirs.append(entry)
+    dirs.sort(key=lambda e: e.name)
+    for entry in dirs:
+        digest.update(f"\0{entry.name}:{entry.stat().st_mtime_ns}".encode())
+    return dirs, digest.hexdigest()[:24]
+
+
+def build_component_index(root: Path, *, version: str | None = None) -> ComponentIndex:
+    dirs, fingerprint = _component_dirs(root, version)
+    return _build(root, dirs, fingerprint)
+
+
+def _build(root: Path, dirs: list[os.DirEntry[str]], fingerprint: str) -> ComponentIndex:
+    const_tree = _parse(_read(str(root.parent / "const.py")) or b"")
+    consts = _string_constants(const_tree) if const_tree is not None else {}
+
+    components: dict[str, Manifest] = {}
+    domains: set[str] = set()
+    # component -> candidate platform name -> path of its module (None: package still to confirm)
+    candidates: dict[str, dict[str, str | None]] = {}
+    for comp in dirs:
+        found: dict[str, str | None] = {}
+        has_init = False
+        with os.scandir(comp.path) as it:
+            for entry in it:
+                name = entry.name
+                if name == "__init__.py":
+                    has_init = True
+                elif name.startswith(("_", ".")):
+                    continue
+                elif name.endswith(".py"):
+                    found[name[:-3]] = entry.path
+                elif entry.is_dir():
+                    found.setdefault(name, None)
+        candidates[comp.name] = found
+        if has_init:
+            source = _read(os.path.join(comp.path, "__init__.py"))
+            manifest, is_platform = parse_manifest(source or b"", consts)
+            components[comp.name] = manifest
+            if is_platform:
+                domains.add(comp.name)
+
+    platforms: dict[tuple[str, str], Manifest] = {}
+    for comp in dirs:
+        for domain in domains.intersection(candidates[comp.name]):
+            path = candidates[comp.name][domain] or os.path.join(comp.path, domain, "__init__.py")
+            source = _read(path)
+            if source is None:
+                continue
+            platforms[(domain, comp.name)] = parse_manifest(source, consts)[0]
+    return ComponentIndex(
+        fingerprint=fingerprint, domains=frozenset(domains), components=components, platforms=platforms
+    )
+
+
+def load_component_index(root: Path, *, version: str | None, cache_path: Path | None) -> ComponentIndex:
+    """
+    Return the index of `root`, reusing the copy persisted at `cache_path` while
+    its fingerprint matches; otherwise walk the tree once and persist the result.
+    """
+    dirs, fingerprint = _component_dirs(root, version)
+    if cache_path is not None:
+        try:
+            cached = ComponentIndex.from_json(json.loads(cache_path.read_bytes()))
+            if cached.fingerprint == fingerprint:
+                return cached
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    index = _build(root, dirs, fingerprint)
+    if cache_path is not None:
+        try:
+            write_atomic(cache_path, json.dumps(index.to_json(), separators=(",", ":")).encode("utf-8"))
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from .esphome_yaml import ComponentKey
+
+
+class ComponentUsageIndex:
+    """
+    Reverse index: component -> projects that use it.
+
+    Maintained incrementally by `ProjectIndex`: only projects whose content
+    changed are re-parsed, and `apply` moves just their postings.
+    """
+
+    def __init__(self) -> None:
+        self._projects: dict[ComponentKey, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, project: str, old: Iterable[ComponentKey], new: Iterable[ComponentKey]) -> None:
+        old_set, new_set = set(old), set(new)
+        with self._lock:
+            for key in old_set - new_set:
+                names = self._projects.get(key)
+                if names is not None:
+                    names.discard(project)
+                    if not names:
+                        del self._projects[key]
+            for key in new_set - old_set:
+                self._projects.setdefault(key, set()).add(project)
+
+    def projects_for(self, domain: str, platform: str | None = None) -> list[str]:
+        with self._lock:
+            return sorted(self._projects.get((domain, platform), ()))
+
+    def platform_components(self) -> set[tuple[str, str]]:
+        """(domain, platform) pairs in use, e.g. to warm schemas or derive an allowlist."""
+        with self._lock:
+            return {(d, p) for d, p in self._projects if p is not None}
+
+    def to_json(self, *, domain: str | None = None, platform: str | None = None) -> dict[str, Any]:
+        with self._lock:
+            items = sorted(self._projects.items(), key=lambda kv: (kv[0][0], kv[0][1] or ""))
+        components: list[dict[str, Any]] = []
+        core: list[dict[str, Any]] = []
+        for (d, p), names in items:
+            if domain is not None and d != domain:
+                continue
+            if platform is not None and p != platform:
+                continue
+            row = {"projects": sorted(names), "count": len(names)}
+            if p is None:
+                core.append({"name": d, **row})
+            else:
+                components.append({"domain": d, "platform": p, **row})
+        return {"components": components, "core": core}
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Any
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+_ENCODINGS = ("br", "gzip")
+_CONDITIONAL_HEADERS = (b"if-match", b"if-none-match")
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+# Bodies larger than this are compressed in a worker thread so the event loop keeps serving.
+_OFFLOAD_BYTES = 256 * 1024
+
+# (gzip level, brotli quality): fast settings for one-off bodies, denser ones for
+# bodies that are cached and therefore only compressed once.
+_LEVELS_DYNAMIC = (6, 4)
+_LEVELS_CACHED = (9, 9)
+
+
+def negotiate_encoding(accept_encoding: str | None, *, brotli_available: bool = brotli is not None) -> str | None:
+    """Pick `br` or `gzip` from an `Accept-Encoding` header (q-values honoured), or None."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token.strip().lower()] = q
+    star = weights.get("*", 0.0)
+    best_name: str | None = None
+    best_q = 0.0
+    # Ties go to the first candidate, so brotli wins over gzip at equal weight.
+    for name in _ENCODINGS if brotli_available else ("gzip",):
+        q = weights.get(name, star)
+        if q > best_q:
+            best_name, best_q = name, q
+    return best_name
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the `encoding` variant of a representation: `"abc"` becomes `"abc-gzip"`."""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_encoded_etags(header: str) -> tuple[str, set[str]]:
+    """Undo `encoded_etag` in an `If-Match`/`If-None-Match` list; also returns the encodings removed."""
+    found: set[str] = set()
+    tags: list[str] = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        for encoding in _ENCODINGS:
+            suffix = f'-{encoding}"'
+            if tag.endswith(suffix):
+                tag = tag[: -len(suffix)] + '"'
+                found.add(encoding)
+                break
+        tags.append(tag)
+    return ", ".join(tags), found
+
+
+def compress(data: bytes, encoding: str, *, cached: bool = False) -> bytes:
+    gzip_level, br_quality = _LEVELS_CACHED if cached else _LEVELS_DYNAMIC
+    if encoding == "br":
+        assert brotli is not None
+        return brotli.compress(data, quality=br_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class CompressedBodyCache:
+    """Byte-bounded LRU of compressed bodies keyed by (encoding, digest of the uncompressed body)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> bytes | None:
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple[str, bytes], value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._items[key] = value
+        self._size += len(value)
+        while self._size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= len(evicted)
+
+    def stats(self) -> dict[str, Any]:
+        return {"entries": len(self._items), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> int:
+        dropped = len(self._items)
+        self._items.clear()
+        self._size = 0
+        return dropped
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli for buffered API responses of at least `minimum_size` bytes.
+
+    Streaming responses (Server-Sent Events, archive downloads, file responses) are
+    passed through untouched. For paths under `cache_prefixes` the compressed body
+    is memoised, so a schema or board catalog is compressed once per encoding.
+
+    Compressed responses get their own ETag (`encoded_etag`), which is mapped back
+    in `If-Match`/`If-None-Match` before the app sees it, and every response that
+    could have been compressed carries `Vary: Accept-Encoding`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        path_prefix: str = "/api/",
+        cache_prefixes: tuple[str, ...] = (),
+        cache_bytes: int = 32 * 1024 * 1024,
+        cache: CompressedBodyCache | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.path_prefix = path_prefix
+        self.cache_prefixes = cache_prefixes
+        self.cache = cache if cache is not None else CompressedBodyCache(cache_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        validated = _strip_conditional_etags(scope)
+        cached = scope["path"].startswith(self.cache_prefixes) if self.cache_prefixes else False
+        start: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            passthrough = True
+            headers = MutableHeaders(raw=start["headers"])
+            if start["status"] == 304:
+                # Revalidated the variant the client holds: answer with that variant's ETag.
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is not None and encoding in validated and "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+                await send(start)
+                await send(message)
+                return
+            body: bytes = message.get("body", b"")
+            if not self._compressible(start):
+                await send(start)
+                await send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None or message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+            compressed = await self._compress(body, encoding, cached)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(start: Message) -> bool:
+        if start["status"] in {204, 206}:
+            return False
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+
+    async def _compress(self, body: bytes, encoding: str, cached: bool) -> bytes:
+        key = CompressedBodyCache.key(encoding, body) if cached else None
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        if len(body) >= _OFFLOAD_BYTES:
+            compressed = await anyio.to_thread.run_sync(lambda: compress(body, encoding, cached=cached))
+        else:
+            compressed = compress(body, encoding, cached=cached)
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
+
+
+def _strip_conditional_etags(scope: Scope) -> set[str]:
+    """
+    Remove `encoded_etag` suffixes from the conditional headers of `scope` and
+    return the encodings seen. The scope is updated in place: outer middleware
+    (metrics) reads what the router writes into it.
+    """
+    if not any(name in _CONDITIONAL_HEADERS for name, _ in scope["headers"]):
+        return set()
+    found: set[str] = set()
+    headers: list[tuple[bytes, bytes]] = []
+    for name, value in scope["headers"]:
+        if name in _CONDITIONAL_HEADERS:
+            stripped, encodings = strip_encoded_etags(value.decode("latin-1"))
+            value = stripped.encode("latin-1")
+            found |= encodings
+        headers.append((name, value))
+    scope["headers"] = headers
+    return found
@@ -12,6 +12,35 @@ class Settings:
     allowlist: set[tuple[str, str]] | None
     cors_origins: list[str]
     static_dir: Path | None
+    pin_index_on_startup: bool
+    cache_dir: Path
+    image_proxy: bool
+    projects_poll_interval_s: float
+    history_enabled: bool
+    history_keep: int
+    history_max_age_days: float
+    import_max_mb: int
+    warm_used_schemas: bool
+    json_encoder: str
+    compress_min_size: int
+    static_precompress: bool
+    metrics: bool
+    profiling: bool
+    admin_token: str
+    shared_cache: bool
+    search_index_all: bool
+    espboards_url: str
+    validate_max_memory_mb: int
+    validate_max_cpu_s: int
+    validate_max_open_files: int
+    validate_max_file_mb: int
+    validate_nice: int
+    validate_tmp_dir: Path | None
+    memory_trace_frames: int
+
+
+def _env(name: str, default: str = "") -> str:
+    return (os.environ.get(name) or os.environ.get(f"EVE_{name}") or default).strip()
 
 
 def _parse_allowlist(value: str) -> set[tuple[str, str]]:
@@ -46,6 +75,31 @@ def load_settings() -> Settings:
     ]
     static_dir_raw = (os.environ.get("STATIC_DIR") or os.environ.get("EVE_STATIC_DIR") or "").strip()
     static_dir = Path(static_dir_raw).resolve() if static_dir_raw else None
+    pin_index_on_startup = _env("PIN_INDEX_ON_STARTUP", "0") == "1"
+    image_proxy = _env("IMAGE_PROXY", "1") == "1"
+    projects_poll_interval_s = float(_env("PROJECTS_POLL_INTERVAL", "10"))
+    history_enabled = _env("HISTORY", "1") == "1"
+    history_keep = int(_env("HISTORY_KEEP", "200"))
+    history_max_age_days = float(_env("HISTORY_MAX_AGE_DAYS", "0"))
+    import_max_mb = int(_env("IMPORT_MAX_MB", "64"))
+    warm_used_schemas = _env("WARM_USED_SCHEMAS", "0") == "1"
+    json_encoder = _env("JSON_ENCODER", "auto").lower()
+    compress_min_size = int(_env("COMPRESS_MIN_SIZE", "1024"))
+    static_precompress = _env("STATIC_PRECOMPRESS", "1") == "1"
+    metrics = _env("METRICS", "1") == "1"
+    profiling = _env("PROFILING", "0") == "1"
+    admin_token = _env("ADMIN_TOKEN")
+    shared_cache = _env("SHARED_CACHE", "1") == "1"
+    search_index_all = _env("SEARCH_INDEX_ALL", "0") == "1"
+    espboards_url = _env("ESPBOARDS_URL", "https://www.espboards.dev")
+    validate_max_memory_mb = int(_env("VALIDATE_MAX_MEMORY_MB", "1024"))
+    validate_max_cpu_s = int(_env("VALIDATE_MAX_CPU_SECONDS", "60"))
+    validate_max_open_files = int(_env("VALIDATE_MAX_OPEN_FILES", "256"))
+    validate_max_file_mb = int(_env("VALIDATE_MAX_FILE_MB", "64"))
+    validate_nice = int(_env("VALIDATE_NICE", "10"))
+    validate_tmp_dir_raw = _env("VALIDATE_TMP_DIR")
+    validate_tmp_dir = Path(validate_tmp_dir_raw).resolve() if validate_tmp_dir_raw else None
+    memory_trace_frames = int(_env("MEMORY_TRACE", "0"))
 
     # Home Assistant add-on options support (Supervisor mounts options at /data/options.json).
     options_path = Path("/data/options.json")
@@ -63,15 +117,39 @@ def load_settings() -> Settings:
         except Exception:
             pass
 
-    try:
-        projects_dir.mkdir(parents=True, exist_ok=True)
-    except Exception:
-        # If the directory is not writable/mapped, endpoints will surface errors.
-        pass
+    # Service-owned state (image store, indexes, ...). Defaults to a hidden folder
+    # next to the projects so it lives on the same (persistent) volume.
+    cache_dir_raw = _env("CACHE_DIR")
+    cache_dir = Path(cache_dir_raw).resolve() if cache_dir_raw else projects_dir / ".eve"
 
     return Settings(
         projects_dir=projects_dir,
         allowlist=None if not allowlist_raw else allowlist,
         cors_origins=cors_origins,
         static_dir=static_dir,
+        pin_index_on_startup=pin_index_on_startup,
+        cache_dir=cache_dir,
+        image_proxy=image_proxy,
+        projects_poll_interval_s=projects_poll_interval_s,
+        history_enabled=history_enabled,
+        history_keep=history_keep,
+        history_max_age_days=history_max_age_days,
+        import_max_mb=import_max_mb,
+        warm_used_schemas=warm_used_schemas,
+        json_encoder=json_encoder,
+        compress_min_size=compress_min_size,
+        static_precompress=static_precompress,
+        metrics=metrics,
+        profiling=profiling,
+        admin_token=admin_token,
+        shared_cache=shared_cache,
+        search_index_all=search_index_all,
+        espboards_url=espboards_url,
+        validate_max_memory_mb=validate_max_memory_mb,
+        validate_max_cpu_s=validate_max_cpu_s,
+        validate_max_open_files=validate_max_open_files,
+        validate_max_file_mb=validate_max_file_mb,
+        validate_nice=validate_nice,
+        validate_tmp_dir=validate_tmp_dir,
+        memory_trace_frames=memory_trace_frames,
     )
@@ -1 +1,5 @@
 """Voluptuous -> UI schema conversion utilities."""
+
+# Bump whenever the generated UI schema changes shape; part of the schema ETags.
+# Kept here (not in voluptuous_to_ui) so computing the ETags does not import voluptuous.
+CONVERTER_VERSION = 1
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .component_index import ComponentIndex, Manifest
+
+
+@dataclass(frozen=True)
+class GraphNode:
+    """
+    A component (`i2c`) or platform (`sensor.dht`). A platform implicitly needs
+    its domain component; `dependencies` must be configured by the user while
+    `auto_load` components are added by ESPHome itself.
+    """
+
+    key: str
+    dependencies: tuple[str, ...] = ()
+    auto_load: tuple[str, ...] = ()
+    conflicts_with: tuple[str, ...] = ()
+    # Manifest keys whose value is computed at import time and could not be resolved.
+    unresolved: tuple[str, ...] = ()
+
+    @property
+    def domain(self) -> str | None:
+        return self.key.split(".", 1)[0] if "." in self.key else None
+
+    def edges(self) -> list[tuple[str, str]]:
+        out: list[tuple[str, str]] = []
+        if self.domain is not None:
+            out.append(("domain", self.domain))
+        out += [("dependency", d) for d in self.dependencies]
+        out += [("auto_load", a) for a in self.auto_load]
+        return out
+
+    def to_json(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"key": self.key}
+        if self.domain is not None:
+            out["domain"] = self.domain
+        if self.dependencies:
+            out["dependencies"] = list(self.dependencies)
+        if self.auto_load:
+            out["autoLoad"] = list(self.auto_load)
+        if self.conflicts_with:
+            out["conflictsWith"] = list(self.conflicts_with)
+        if self.unresolved:
+            out["unresolved"] = list(self.unresolved)
+        return out
+
+
+def node_from_manifest(key: str, manifest: Manifest) -> GraphNode:
+    return GraphNode(
+        key=key,
+        # Platform dependencies may name another platform ("sensor.xyz") or a component.
+        dependencies=tuple(dict.fromkeys(manifest.dependencies)),
+        auto_load=tuple(dict.fromkeys(manifest.auto_load)),
+        conflicts_with=tuple(dict.fromkeys(manifest.conflicts_with)),
+        unresolved=tuple(k for k in manifest.dynamic if k != "CODEOWNERS"),
+    )
+
+
+@dataclass
+class Closure:
+    requested: list[str]
+    # key -> [(relation, parent)]; requested keys have no parent.
+    reached: dict[str, list[tuple[str, str]]] = field(default_factory=dict)
+    missing: list[str] = field(default_factory=list)
+    conflicts: list[tuple[str, str]] = field(default_factory=list)
+
+    def to_json(self, graph: DependencyGraph) -> dict[str, Any]:
+        return {
+            "requested": self.requested,
+            "components": [
+                {
+                    **graph.nodes[key].to_json(),
+                    "requested": key in self.requested,
+                    "via": [{"relation": rel, "from": parent} for rel, parent in via],
+                }
+                for key, via in self.reached.items()
+            ],
+            "missing": self.missing,
+            "conflicts": [{"a": a, "b": b} for a, b in self.conflicts],
+        }
+
+
+class DependencyGraph:
+    """
+    DEPENDENCIES / AUTO_LOAD / CONFLICTS_WITH over every bundled component and
+    platform, built from the (persisted) component index without importing
+    ESPHome. Nodes whose manifest is computed at import time can be resolved
+    lazily with `resolve` (see `esphome_introspect.resolve_manifest`).
+    """
+
+    def __init__(self, nodes: dict[str, GraphNode], *, resolve: Callable[[str], Manifest | None] | None = None):
+        self.nodes = nodes
+        self._resolve = resolve
+
+    @classmethod
+    def from_index(
+        cls, index: ComponentIndex, *, resolve: Callable[[str], Manifest | None] | None = None
+    ) -> DependencyGraph:
+        nodes = {name: node_from_manifest(name, m) for name, m in index.components.items()}
+        for (domain, platform), m in index.platforms.items():
+            nodes[f"{domain}.{platform}"] = node_from_manifest(f"{domain}.{platform}", m)
+        return cls(nodes, resolve=resolve)
+
+    def node(self, key: str) -> GraphNode | None:
+        node = self.nodes.get(key)
+        if node is not None and node.unresolved and self._resolve is not None:
+            manifest = self._resolve(key)
+            if manifest is not None:
+                node = self.nodes[key] = node_from_manifest(key, manifest)
+        return node
+
+    def closure(self, keys: Iterable[str]) -> Closure:
+        """Everything `keys` pull in, breadth first, with the edges that reached each node."""
+        requested = list(dict.fromkeys(keys))
+        out = Closure(requested=requested)
+        queue = deque(requested)
+        for key in requested:
+            out.reached[key] = []
+        while queue:
+            key = queue.popleft()
+            node = self.node(key)
+            if node is None:
+                out.missing.append(key)
+                continue
+            for relation, target in node.edges():
+                if target not in out.reached:
+                    out.reached[target] = []
+                    queue.append(target)
+                out.reached[target].append((relation, key))
+        for key in out.missing:
+            out.reached.pop(key, None)
+        names = set(out.reached)
+        for key in out.reached:
+            for other in self.nodes[key].conflicts_with:
+                if other in names and (other, key) not in out.conflicts:
+                    out.conflicts.append((key, other))
+        return out
+
+    def to_json(self) -> dict[str, Any]:
+        return {"nodes": [self.nodes[k].to_json() for k in sorted(self.nodes)]}
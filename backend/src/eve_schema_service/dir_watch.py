@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from threading import Event
+
+# inotify(7) event masks (see <sys/inotify.h>).
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE) | (
+    _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _ = libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def watch_directory(
+    path: Path,
+    on_names: Callable[[set[str]], None],
+    on_rescan: Callable[[], None],
+    *,
+    interval_s: float | None,
+    stop: Event,
+) -> None:
+    """
+    Block until `stop` is set, reporting changes in `path`.
+
+    Uses inotify when available: `on_names` receives the changed file names
+    (batched per wakeup). A full `on_rescan` still runs every `interval_s` (and
+    on queue overflow), because inotify misses edits made through network
+    filesystems or bind mounts from other hosts. Without inotify this degrades
+    to polling with `on_rescan`. `interval_s=None` disables the periodic rescans.
+    """
+    libc = _load_libc()
+    fd = -1
+    if libc is not None:
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd >= 0:
+            wd = libc.inotify_add_watch(fd, os.fsencode(str(path)), _WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                fd = -1
+    try:
+        if fd < 0:
+            while interval_s is not None and not stop.wait(interval_s):
+                on_rescan()
+            return
+        last_rescan = time.monotonic()
+        while not stop.is_set():
+            # Short select timeout so `stop` is honoured promptly.
+            ready, _, _ = select.select([fd], [], [], min(interval_s or 1.0, 1.0))
+            if stop.is_set():
+                return
+            names, overflow = _read_events(fd) if ready else (set(), False)
+            if overflow or (interval_s is not None and time.monotonic() - last_rescan >= interval_s):
+                last_rescan = time.monotonic()
+                on_rescan()
+            elif names:
+                on_names(names)
+    finally:
+        if fd >= 0:
+            os.close(fd)
+
+
+def _read_events(fd: int) -> tuple[set[str], bool]:
+    names: set[str] = set()
+    overflow = False
+    while True:
+        try:
+            buf = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            break
+        if not buf:
+            break
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buf):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = buf[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & (_IN_Q_OVERFLOW | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                overflow = True
+            elif raw_name:
+                names.add(os.fsdecode(raw_name))
+    return names, overflow
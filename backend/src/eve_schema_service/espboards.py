@@ -1,14 +1,34 @@
 from __future__ import annotations
 
+import json
 import re
 import time
 import urllib.request
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from .memory_report import deep_sizeof
+
+if TYPE_CHECKING:
+    from .shared_cache import SharedCache
 
 ESPBOARDS_BASE = "https://www.espboards.dev"
 
 
+class _Upstream:
+    """Where board pages are scraped from (see `use_base_url`)."""
+
+    base = ESPBOARDS_BASE
+
+
+_upstream = _Upstream()
+
+
+def use_base_url(url: str) -> None:
+    """Scrape a mirror or a local stand-in (load tests) instead of espboards.dev."""
+    _upstream.base = url.rstrip("/") or ESPBOARDS_BASE
+
+
 @dataclass(frozen=True)
 class EspBoard:
     target: str  # "esp32" | "esp8266"
@@ -38,7 +58,7 @@ def _abs(url: str) -> str:
         return url
     if not url.startswith("/"):
         url = "/" + url
-    return ESPBOARDS_BASE + url
+    return _upstream.base + url
 
 
 _ESP32_MICRO_RE = re.compile(r'href="/esp32/microcontroller/([^/]+)/"', re.IGNORECASE)
@@ -64,7 +84,7 @@ def _parse_esp8266_boards(html: str) -> list[EspBoard]:
                 target="esp8266",
                 slug=slug,
                 name=name or slug,
-                url=f"{ESPBOARDS_BASE}/esp8266/{slug}/",
+                url=f"{_upstream.base}/esp8266/{slug}/",
                 image_url=img,
             )
         )
@@ -91,7 +111,7 @@ def _parse_esp32_boards_from_microcontroller(html: str, microcontroller: str) ->
                 target="esp32",
                 slug=slug,
                 name=name or slug,
-                url=f"{ESPBOARDS_BASE}/esp32/{slug}/",
+                url=f"{_upstream.base}/esp32/{slug}/",
                 image_url=img,
                 microcontroller=microcontroller,
             )
@@ -100,12 +120,12 @@ def _parse_esp32_boards_from_microcontroller(html: str, microcontroller: str) ->
 
 
 def _load_esp32_boards() -> list[EspBoard]:
-    root = _fetch(f"{ESPBOARDS_BASE}/esp32/")
+    root = _fetch(f"{_upstream.base}/esp32/")
     micros = sorted(set(_ESP32_MICRO_RE.findall(root)))
     boards_by_slug: dict[str, EspBoard] = {}
     for micro in micros:
         try:
-            html = _fetch(f"{ESPBOARDS_BASE}/esp32/microcontroller/{micro}/")
+            html = _fetch(f"{_upstream.base}/esp32/microcontroller/{micro}/")
         except Exception:
             continue
         for b in _parse_esp32_boards_from_microcontroller(html, microcontroller=micro):
@@ -115,13 +135,28 @@ def _load_esp32_boards() -> list[EspBoard]:
 
 
 def _load_esp8266_boards() -> list[EspBoard]:
-    html = _fetch(f"{ESPBOARDS_BASE}/esp8266/")
+    html = _fetch(f"{_upstream.base}/esp8266/")
     return sorted(_parse_esp8266_boards(html), key=lambda b: b.name.lower())
 
 
 _CACHE_TTL_S = 60 * 60 * 12  # 12h
 _cache: dict[str, tuple[float, list[EspBoard]]] = {}
 _details_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+# [hits, misses] per cache, for /metrics.
+_cache_counts: dict[str, list[int]] = {"catalog": [0, 0], "details": [0, 0]}
+
+
+class _SharedSlot:
+    """Optional cross-process second level behind the in-memory caches (see `use_shared_cache`)."""
+
+    cache: SharedCache | None = None
+
+
+_shared = _SharedSlot()
+
+
+def use_shared_cache(cache: SharedCache | None) -> None:
+    _shared.cache = cache
 
 
 def _strip_tags(html: str) -> str:
@@ -270,6 +305,30 @@ def _tokens(s: str) -> set[str]:
     return {t for t in _NON_ALNUM_RE.sub(" ", (s or "").lower()).split() if t}
 
 
+def cache_stats() -> dict[str, tuple[int, int, int]]:
+    """(hits, misses, entries) for the board catalog and board details caches."""
+    return {
+        "catalog": (*_cache_counts["catalog"], len(_cache)),
+        "details": (*_cache_counts["details"], len(_details_cache)),
+    }
+
+
+def cache_memory() -> dict[str, tuple[int, int]]:
+    """(entries, bytes in memory) for the board catalog and board details caches."""
+    return {
+        "catalog": (len(_cache), deep_sizeof(_cache)),
+        "details": (len(_details_cache), deep_sizeof(_details_cache)),
+    }
+
+
+def clear_caches() -> int:
+    """Empty the in-memory caches (the shared cache keeps its copies); returns how many entries were dropped."""
+    dropped = len(_cache) + len(_details_cache)
+    _cache.clear()
+    _details_cache.clear()
+    return dropped
+
+
 def get_board_catalog(target: str) -> list[dict[str, Any]]:
     target = target.strip().lower()
     if target not in {"esp32", "esp8266"}:
@@ -278,9 +337,18 @@ def get_board_catalog(target: str) -> list[dict[str, Any]]:
     now = time.time()
     cached = _cache.get(target)
     if cached and now - cached[0] < _CACHE_TTL_S:
+        _cache_counts["catalog"][0] += 1
         boards = cached[1]
     else:
-        boards = _load_esp32_boards() if target == "esp32" else _load_esp8266_boards()
+        _cache_counts["catalog"][1] += 1
+        shared = _shared.cache
+        raw = shared.get("espboards-catalog", target, max_age_s=_CACHE_TTL_S) if shared else None
+        if raw is not None:
+            boards = [EspBoard(**b) for b in json.loads(raw)]
+        else:
+            boards = _load_esp32_boards() if target == "esp32" else _load_esp8266_boards()
+            if shared is not None:
+                shared.put("espboards-catalog", target, json.dumps([asdict(b) for b in boards]).encode("utf-8"))
         _cache[target] = (now, boards)
 
     return [
@@ -308,16 +376,24 @@ def get_board_details(target: str, slug: str) -> dict[str, Any]:
     now = time.time()
     cached = _details_cache.get(cache_key)
     if cached and now - cached[0] < _CACHE_TTL_S:
+        _cache_counts["details"][0] += 1
         return cached[1]
-
-    url = f"{ESPBOARDS_BASE}/{target}/{slug}/"
+    _cache_counts["details"][1] += 1
+    shared = _shared.cache
+    raw = shared.get("espboards-details", cache_key, max_age_s=_CACHE_TTL_S) if shared else None
+    if raw is not None:
+        payload: dict[str, Any] = json.loads(raw)
+        _details_cache[cache_key] = (now, payload)
+        return payload
+
+    url = f"{_upstream.base}/{target}/{slug}/"
     html = _fetch(url)
     name = _extract_board_name(html, slug=slug)
     pinout = _extract_pinout_image_url(html)
     board_image = _extract_board_image_url(html)
     pins = _extract_pin_mappings(html, target=target)
 
-    payload: dict[str, Any] = {
+    payload = {
         "target": target,
         "slug": slug,
         "name": name,
@@ -335,4 +411,6 @@ def get_board_details(target: str, slug: str) -> dict[str, Any]:
         ],
     }
     _details_cache[cache_key] = (now, payload)
+    if shared is not None:
+        shared.put("espboards-details", cache_key, json.dumps(payload).encode("utf-8"))
     return payload
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import importlib
+import importlib.metadata
+import threading
+from collections.abc import Iterable
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-from .convert.voluptuous_to_ui import convert_config_schema_to_ui
+from .component_index import ComponentIndex, Manifest, load_component_index
+from .convert import CONVERTER_VERSION
+from .dependency_graph import DependencyGraph
+from .memory_report import attribute_import, record_payload
+from .metrics import ESPHOME_IMPORT_DURATION, SCHEMA_CONVERT_DURATION
+from .profiling import span
 
 
 @dataclass(frozen=True)
@@ -21,29 +31,81 @@ def _components_path() -> Path:
     return Path(list(components_pkg.__path__)[0])
 
 
+class _IndexCache:
+    """Where the component index is persisted between restarts (see `use_component_index_cache`)."""
+
+    path: Path | None = None
+    # ast.parse is not thread-safe on Python 3.11 ("AST constructor recursion
+    # depth mismatch"), so concurrent cold builds take turns.
+    lock = threading.Lock()
+
+
+_index_cache = _IndexCache()
+
+
+def use_component_index_cache(path: Path | None) -> None:
+    _index_cache.path = path
+    component_index.cache_clear()
+    _discover_all_components.cache_clear()
+    dependency_graph.cache_clear()
+
+
 @lru_cache(maxsize=1)
-def _platform_domains() -> set[str]:
+def component_index() -> ComponentIndex:
     """
-    Domain packages (sensor, switch, light, ...) declare IS_PLATFORM_COMPONENT = True.
-    We use this to identify valid YAML "domains" without importing every module.
+    (domain, platform) pairs and manifest metadata of every bundled component,
+    built by one walk of `esphome/components` without importing anything.
     """
-    domains: set[str] = set()
-    root = _components_path()
-    for entry in root.iterdir():
-        if not entry.is_dir():
-            continue
-        init_py = entry / "__init__.py"
-        if not init_py.exists():
-            continue
+    with _index_cache.lock, span("component_index"):
+        return load_component_index(_components_path(), version=esphome_version(), cache_path=_index_cache.path)
+
+
+@lru_cache(maxsize=1)
+def dependency_graph() -> DependencyGraph:
+    return DependencyGraph.from_index(component_index(), resolve=resolve_manifest)
+
+
+@lru_cache(maxsize=1024)
+def resolve_manifest(key: str) -> Manifest | None:
+    """
+    Manifest of a component (`i2c`) or platform (`sensor.dht`) as ESPHome's loader
+    sees it, for the few whose DEPENDENCIES / AUTO_LOAD are computed at import
+    time. `AUTO_LOAD()` functions are evaluated for the default target (esp32);
+    ones that need the user's config stay unresolved.
+    """
+    kind = "platform" if "." in key else "component"
+    try:
+        with ESPHOME_IMPORT_DURATION.time(kind=kind), span("esphome_import", component=key):
+            _ensure_core_initialized()
+            import esphome.loader as loader  # type: ignore
+
+            with attribute_import(key):
+                if kind == "platform":
+                    domain, platform = key.split(".", 1)
+                    manifest = loader.get_platform(domain, platform)
+                else:
+                    manifest = loader.get_component(key)
+    except Exception:
+        return None
+    if manifest is None:
+        return None
+    dynamic: list[str] = []
+    auto_load: Any = manifest.auto_load
+    if callable(auto_load):
         try:
-            text = init_py.read_text(encoding="utf-8", errors="ignore")
+            auto_load = auto_load()
         except Exception:
-            continue
-        if "IS_PLATFORM_COMPONENT" in text and "True" in text:
-            # Be conservative: require the exact assignment to avoid false positives.
-            if "IS_PLATFORM_COMPONENT = True" in text:
-                domains.add(entry.name)
-    return domains
+            auto_load = []
+            dynamic.append("AUTO_LOAD")
+    try:
+        return Manifest(
+            dependencies=tuple(manifest.dependencies),
+            auto_load=tuple(auto_load),
+            conflicts_with=tuple(manifest.conflicts_with),
+            dynamic=tuple(dynamic),
+        )
+    except TypeError:
+        return None
 
 
 def discover_components(limit_to: set[tuple[str, str]] | None = None) -> list[ComponentRef]:
@@ -58,32 +120,40 @@ def discover_components(limit_to: set[tuple[str, str]] | None = None) -> list[Co
 
 @lru_cache(maxsize=1)
 def _discover_all_components() -> list[ComponentRef]:
-    out: list[ComponentRef] = []
-    root = _components_path()
-    domains = _platform_domains()
-    for platform_dir in root.iterdir():
-        if not platform_dir.is_dir():
-            continue
-        if platform_dir.name.startswith("_"):
-            continue
-        for domain in domains:
-            if (platform_dir / domain / "__init__.py").exists() or (platform_dir / f"{domain}.py").exists():
-                out.append(ComponentRef(domain=domain, platform=platform_dir.name))
-    out.sort(key=lambda r: (r.domain, r.platform))
-    return out
+    return [ComponentRef(domain=domain, platform=platform) for domain, platform in component_index().pairs()]
+
+
+def _convert(config_schema: Any, *, domain: str, platform: str) -> dict[str, Any]:
+    # The converter pulls in voluptuous; load it with the first schema, not at startup.
+    from .convert.voluptuous_to_ui import convert_config_schema_to_ui
+
+    return convert_config_schema_to_ui(config_schema, domain=domain, platform=platform)
 
 
 @lru_cache(maxsize=4096)
 def load_component_ui_schema(domain: str, platform: str) -> dict[str, Any]:
-    import esphome.loader as loader  # type: ignore
+    payload = build_component_ui_schema(domain, platform)
+    record_payload(f"{domain}.{platform}", payload)
+    return payload
+
 
-    _ensure_core_initialized()
-    manifest = loader.get_platform(domain, platform)
-    mod = manifest.module
+def build_component_ui_schema(domain: str, platform: str) -> dict[str, Any]:
+    """Import and convert a platform schema, bypassing the in-memory cache."""
+    with ESPHOME_IMPORT_DURATION.time(kind="platform"), span("esphome_import", component=f"{domain}.{platform}"):
+        _ensure_core_initialized()
+        import esphome.loader as loader  # type: ignore
+
+        with attribute_import(f"{domain}.{platform}"):
+            manifest = loader.get_platform(domain, platform)
+            mod = manifest.module
     config_schema = getattr(mod, "CONFIG_SCHEMA", None) or getattr(manifest, "config_schema", None)
     if config_schema is None:
         raise KeyError("No CONFIG_SCHEMA found")
-    ui_schema = convert_config_schema_to_ui(config_schema, domain=domain, platform=platform)
+    with (
+        SCHEMA_CONVERT_DURATION.time(kind="platform"),
+        span("convert_config_schema_to_ui", component=f"{domain}.{platform}"),
+    ):
+        ui_schema = _convert(config_schema, domain=domain, platform=platform)
     return {
         "domain": domain,
         "platform": platform,
@@ -95,17 +165,27 @@ def load_component_ui_schema(domain: str, platform: str) -> dict[str, Any]:
 
 @lru_cache(maxsize=256)
 def load_core_component_ui_schema(name: str) -> dict[str, Any]:
-    import esphome.loader as loader  # type: ignore
-
-    _ensure_core_initialized()
     if name == "esphome":
         return load_esphome_root_ui_schema()
-    manifest = loader.get_component(name)
-    mod = manifest.module
+    payload = build_core_component_ui_schema(name)
+    record_payload(f"core:{name}", payload)
+    return payload
+
+
+def build_core_component_ui_schema(name: str) -> dict[str, Any]:
+    """Import and convert a component's own schema, bypassing the in-memory cache."""
+    with ESPHOME_IMPORT_DURATION.time(kind="component"), span("esphome_import", component=name):
+        _ensure_core_initialized()
+        import esphome.loader as loader  # type: ignore
+
+        with attribute_import(name):
+            manifest = loader.get_component(name)
+            mod = manifest.module
     config_schema = getattr(mod, "CONFIG_SCHEMA", None) or getattr(manifest, "config_schema", None)
     if config_schema is None:
         raise KeyError("No CONFIG_SCHEMA found")
-    ui_schema = convert_config_schema_to_ui(config_schema, domain=name, platform=name)
+    with SCHEMA_CONVERT_DURATION.time(kind="component"), span("convert_config_schema_to_ui", component=name):
+        ui_schema = _convert(config_schema, domain=name, platform=name)
     return {
         "name": name,
         "displayName": name,
@@ -116,19 +196,79 @@ def load_core_component_ui_schema(name: str) -> dict[str, Any]:
 
 @lru_cache(maxsize=1)
 def load_esphome_root_ui_schema() -> dict[str, Any]:
-    _ensure_core_initialized()
-    import esphome.core.config as core_config  # type: ignore
+    with ESPHOME_IMPORT_DURATION.time(kind="core"):
+        _ensure_core_initialized()
+        import esphome.core.config as core_config  # type: ignore
 
     config_schema = getattr(core_config, "CONFIG_SCHEMA", None)
     if config_schema is None:
         raise KeyError("No core CONFIG_SCHEMA found")
-    ui_schema = convert_config_schema_to_ui(config_schema, domain="esphome", platform="esphome")
-    return {
+    with SCHEMA_CONVERT_DURATION.time(kind="core"), span("convert_config_schema_to_ui", component="esphome"):
+        ui_schema = _convert(config_schema, domain="esphome", platform="esphome")
+    payload = {
         "name": "esphome",
         "displayName": "esphome",
         "docs": {"description": "Root ESPHome configuration (esphome: block)."},
         "schema": ui_schema,
     }
+    record_payload("core:esphome", payload)
+    return payload
+
+
+def schema_keys() -> list[str]:
+    """
+    Keys of every schema ESPHome provides, as used by the schema cache:
+    `domain.platform`, then `core:name` for components that are not only
+    platform providers (dht -> sensor.dht), and `core:esphome`.
+    """
+    idx = component_index()
+    providers = {platform for _, platform in idx.platforms}
+    keys = [f"{domain}.{platform}" for domain, platform in idx.pairs()]
+    keys += [f"core:{name}" for name in sorted(idx.components) if name not in providers]
+    if "core:esphome" not in keys:
+        keys.append("core:esphome")
+    return keys
+
+
+def build_schema_payload(key: str) -> dict[str, Any]:
+    """The schema payload for a key from `schema_keys`, converted without caching it in memory."""
+    if key == "core:esphome":
+        return load_esphome_root_ui_schema()
+    if key.startswith("core:"):
+        return build_core_component_ui_schema(key.removeprefix("core:"))
+    domain, _, platform = key.partition(".")
+    return build_component_ui_schema(domain, platform)
+
+
+@lru_cache(maxsize=1)
+def esphome_version() -> str | None:
+    try:
+        return importlib.metadata.version("esphome")
+    except Exception:
+        return None
+
+
+def schema_cache_token(allowlist: set[tuple[str, str]] | None) -> str:
+    """
+    Fingerprint of everything the schema endpoints depend on: the installed
+    ESPHome version, the component allowlist and the converter version.
+    """
+    h = hashlib.sha256()
+    h.update(f"{esphome_version()}\0{CONVERTER_VERSION}\0".encode())
+    h.update(repr(None if allowlist is None else sorted(allowlist)).encode())
+    return h.hexdigest()[:20]
+
+
+def warm_component_schemas(components: Iterable[tuple[str, str]]) -> int:
+    """Populate the schema cache for `components`; returns how many loaded successfully."""
+    loaded = 0
+    for domain, platform in sorted(components):
+        try:
+            load_component_ui_schema(domain, platform)
+            loaded += 1
+        except Exception:
+            continue
+    return loaded
 
 
 def _ensure_core_initialized(target_platform: str = "esp32") -> None:
@@ -136,7 +276,14 @@ def _ensure_core_initialized(target_platform: str = "esp32") -> None:
     Some modules access CORE at import time (e.g. to build hw interface lists).
     Initialize a minimal CORE so schema imports don't crash.
     """
+    with attribute_import("esphome.core"):
+        _init_core(target_platform)
+
+
+def _init_core(target_platform: str) -> None:
     try:
+        # Loaded here so that its import is charged to the core (see `attribute_import`).
+        importlib.import_module("esphome.loader")
         from esphome.const import (  # type: ignore
             KEY_CORE,
             KEY_NAME,
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+import yaml
+
+try:
+    _BaseLoader: type[yaml.SafeLoader] = yaml.CSafeLoader  # type: ignore[attr-defined]
+except AttributeError:  # PyYAML built without libyaml
+    _BaseLoader = yaml.SafeLoader
+
+# Target platform blocks; the first one present names the project's platform.
+PLATFORM_KEYS = ("esp32", "esp8266", "rp2040", "bk72xx", "rtl87xx", "ln882x", "libretiny", "nrf52", "host")
+
+# Top-level keys that configure the document itself rather than a component.
+_NON_COMPONENT_KEYS = {"substitutions", "packages", "<<"}
+
+_SUBST_RE = re.compile(r"\$\{([A-Za-z0-9_]+)\}|\$([A-Za-z0-9_]+)")
+
+
+class EspHomeTag(str):
+    """Placeholder for an ESPHome-specific tagged scalar (`!secret x`, `!lambda ...`, `!include f`)."""
+
+    tag: str = ""
+
+    def __new__(cls, tag: str, value: str) -> EspHomeTag:
+        obj = super().__new__(cls, value)
+        obj.tag = tag
+        return obj
+
+
+class _TolerantLoader(_BaseLoader):  # pylint: disable=too-many-ancestors
+    pass
+
+
+def _construct_tagged(loader: yaml.SafeLoader, tag_suffix: str, node: yaml.Node) -> Any:
+    tag = f"!{tag_suffix}"
+    if isinstance(node, yaml.ScalarNode):
+        return EspHomeTag(tag, str(loader.construct_scalar(node)))
+    if isinstance(node, yaml.SequenceNode):
+        return loader.construct_sequence(node, deep=True)
+    return loader.construct_mapping(node, deep=True)  # type: ignore[arg-type]
+
+
+_TolerantLoader.add_multi_constructor("!", _construct_tagged)
+
+
+def load_esphome_yaml(text: str) -> Any:
+    """
+    Parse ESPHome YAML without ESPHome: custom tags become `EspHomeTag` strings
+    (or plain lists/dicts for collection nodes) instead of failing the load.
+    Includes and secrets are not resolved.
+    """
+    return yaml.load(text or "", Loader=_TolerantLoader)  # noqa: S506 - safe loader subclass
+
+
+def _substitute(value: Any, substitutions: dict[str, Any]) -> Any:
+    if not isinstance(value, str) or "$" not in value or not substitutions:
+        return value
+
+    def _repl(m: re.Match[str]) -> str:
+        key = m.group(1) or m.group(2)
+        return str(substitutions.get(key, m.group(0)))
+
+    return _SUBST_RE.sub(_repl, value)
+
+
+# (domain, platform) for platform components (`sensor: [{platform: dht}]`), and
+# (name, None) for top-level core components (`wifi:`, `logger:`, ...).
+ComponentKey = tuple[str, str | None]
+
+
+@dataclass(frozen=True)
+class ProjectSummary:
+    device_name: str | None
+    friendly_name: str | None
+    platform: str | None
+    component_count: int
+    components: frozenset[ComponentKey] = field(default_factory=frozenset)
+
+
+def used_components(data: Any) -> frozenset[ComponentKey]:
+    """Components referenced by a parsed config; `packages`/`!include` contents are not followed."""
+    if not isinstance(data, dict):
+        return frozenset()
+    out: set[ComponentKey] = set()
+    for key, value in data.items():
+        if not isinstance(key, str) or key in _NON_COMPONENT_KEYS:
+            continue
+        items = value if isinstance(value, list) else [value]
+        platforms = {
+            str(item["platform"])
+            for item in items
+            if isinstance(item, dict) and isinstance(item.get("platform"), str) and item["platform"]
+        }
+        if platforms:
+            out.update((key, p) for p in platforms)
+        else:
+            out.add((key, None))
+    return frozenset(out)
+
+
+def summarize_config(data: Any) -> ProjectSummary:
+    if not isinstance(data, dict):
+        return ProjectSummary(device_name=None, friendly_name=None, platform=None, component_count=0)
+    substitutions = data.get("substitutions") if isinstance(data.get("substitutions"), dict) else {}
+    core = data.get("esphome") if isinstance(data.get("esphome"), dict) else {}
+    name = _substitute(core.get("name"), substitutions)
+    friendly = _substitute(core.get("friendly_name"), substitutions)
+    platform = next((k for k in PLATFORM_KEYS if k in data), None)
+    count = 0
+    for key, value in data.items():
+        if key in _NON_COMPONENT_KEYS or key == "esphome":
+            continue
+        count += len(value) if isinstance(value, list) else 1
+    return ProjectSummary(
+        device_name=str(name) if name is not None else None,
+        friendly_name=str(friendly) if friendly is not None else None,
+        platform=platform,
+        component_count=count,
+        components=used_components(data),
+    )
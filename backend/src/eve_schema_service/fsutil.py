@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes, *, mode: int | None = None, fsync: bool = False) -> os.stat_result:
+    """
+    Write `data` to `path` via a temp file in the same directory + rename, so
+    readers only ever see the old or the new content (never a torn file).
+
+    Returns the stat of the written file (taken before the rename, so it can't
+    describe a concurrent writer's replacement).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+        return st
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
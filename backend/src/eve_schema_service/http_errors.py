@@ -11,3 +11,11 @@ class BadRequest(EveError):
 
 class NotFound(EveError):
     pass
+
+
+class PreconditionFailed(EveError):
+    pass
+
+
+class Unauthorized(EveError):
+    pass
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mimetypes
+import re
+import threading
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .fsutil import write_atomic
+
+PROXY_PATH = "api/espboards/img"
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+_MAX_IMAGE_BYTES = 16 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class StoredImage:
+    path: Path
+    sha256: str
+    size: int
+    content_type: str
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _fetch_bytes(url: str, timeout_s: int = 20) -> tuple[bytes, str | None]:
+    req = urllib.request.Request(url)
+    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+        data = resp.read(_MAX_IMAGE_BYTES + 1)
+        if len(data) > _MAX_IMAGE_BYTES:
+            raise ValueError("Image too large")
+        return data, resp.headers.get_content_type()
+
+
+class ImageStore:
+    """
+    Content-addressed on-disk store for upstream board/pinout images.
+
+    Layout (under `root`):
+      objects/<aa>/<sha256>   image bytes, named by the hash of the content
+      refs/<aa>/<key>.json    {"url": ..., "sha256": ..., "contentType": ...}
+
+    Public keys are the sha256 of the upstream URL, so payload URLs can be
+    rewritten before the image has been fetched; the ref then points at the
+    content object (identical images served from several URLs share one object).
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._urls: dict[str, str] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _object_path(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / sha
+
+    def _ref_path(self, key: str) -> Path:
+        return self.root / "refs" / key[:2] / f"{key}.json"
+
+    def _read_ref(self, key: str) -> dict[str, Any] | None:
+        try:
+            ref = json.loads(self._ref_path(key).read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        return ref if isinstance(ref, dict) else None
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def register(self, url: str) -> str:
+        """Remember `url` so its key can be fetched lazily; returns the key."""
+        key = url_key(url)
+        if key not in self._urls:
+            self._urls[key] = url
+            if not self._ref_path(key).exists():
+                try:
+                    write_atomic(self._ref_path(key), json.dumps({"url": url}).encode("utf-8"))
+                except OSError:
+                    # Read-only/missing volume: the in-memory mapping still serves this process.
+                    pass
+        return key
+
+    def proxy_url(self, url: str | None) -> str | None:
+        if not url:
+            return url
+        return f"{PROXY_PATH}/{self.register(url)}"
+
+    def lookup(self, key: str) -> StoredImage | None:
+        """Stored image for `key` without fetching upstream."""
+        ref = self._read_ref(key)
+        sha = ref.get("sha256") if ref else None
+        if not isinstance(sha, str):
+            return None
+        path = self._object_path(sha)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        content_type = ref.get("contentType") if ref else None
+        return StoredImage(path=path, sha256=sha, size=size, content_type=content_type or "application/octet-stream")
+
+    def get(self, key: str) -> StoredImage | None:
+        """Stored image for `key`, fetching and storing it from upstream on a miss."""
+        if not _KEY_RE.match(key):
+            return None
+        hit = self.lookup(key)
+        if hit is not None:
+            return hit
+        with self._lock_for(key):
+            hit = self.lookup(key)
+            if hit is not None:
+                return hit
+            ref = self._read_ref(key) or {}
+            url = ref.get("url") or self._urls.get(key)
+            if not isinstance(url, str) or not url:
+                return None
+            data, content_type = _fetch_bytes(url)
+            if not content_type or content_type == "application/octet-stream":
+                content_type = mimetypes.guess_type(url)[0] or "application/octet-stream"
+            sha = hashlib.sha256(data).hexdigest()
+            obj = self._object_path(sha)
+            if not obj.exists():
+                write_atomic(obj, data)
+            write_atomic(
+                self._ref_path(key),
+                json.dumps({"url": url, "sha256": sha, "contentType": content_type}).encode("utf-8"),
+            )
+            return StoredImage(path=obj, sha256=sha, size=len(data), content_type=content_type)
+
+    def prefetch(self, urls: list[str | None]) -> int:
+        """Fill the store for `urls`; returns how many are now available locally."""
+        stored = 0
+        for url in urls:
+            if not url:
+                continue
+            try:
+                if self.get(self.register(url)) is not None:
+                    stored += 1
+            except Exception:
+                continue
+        return stored
+
+
+def rewrite_catalog_images(store: ImageStore, boards: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [{**b, "imageUrl": store.proxy_url(b.get("imageUrl"))} for b in boards]
+
+
+def rewrite_details_images(store: ImageStore, details: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **details,
+        "boardImageUrl": store.proxy_url(details.get("boardImageUrl")),
+        "pinoutImageUrl": store.proxy_url(details.get("pinoutImageUrl")),
+    }
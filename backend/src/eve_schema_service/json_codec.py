@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from pathlib import PurePath
+from typing import Any
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, set | frozenset):
+        return sorted(obj, key=str)
+    if isinstance(obj, PurePath):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # Same output options as Starlette's JSONResponse.
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class _Codec:
+    def __init__(self) -> None:
+        self.name = "stdlib"
+        self.dumps: Callable[[Any], bytes] = _stdlib_dumps
+        self.configure("auto")
+
+    def configure(self, preference: str) -> str:
+        """Select the encoder: "auto" (orjson when installed), "orjson" or "stdlib"."""
+        if preference not in {"auto", "orjson", "stdlib"}:
+            raise ValueError("JSON_ENCODER must be 'auto', 'orjson' or 'stdlib'")
+        self.name, self.dumps = "stdlib", _stdlib_dumps
+        if preference == "stdlib":
+            return self.name
+        try:
+            import orjson
+        except ImportError:
+            if preference == "orjson":
+                raise
+            return self.name
+
+        def _orjson_dumps(obj: Any) -> bytes:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+        self.name, self.dumps = "orjson", _orjson_dumps
+        return self.name
+
+
+_codec = _Codec()
+
+
+def configure(preference: str) -> str:
+    """Switch the process-wide JSON encoder; returns the name of the encoder in use."""
+    return _codec.configure(preference)
+
+
+def encoder_name() -> str:
+    return _codec.name
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize `obj` to compact UTF-8 JSON using the configured encoder."""
+    return _codec.dumps(obj)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+# Shared objects that are not owned by what is being measured.
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+_COMPONENT_FILE_RE = re.compile(r"[/\\]esphome[/\\]components[/\\]([^/\\]+)[/\\]")
+_PACKAGE_FILE_RE = re.compile(r"[/\\](?:site|dist)-packages[/\\]([^/\\]+)")
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size of this process (Linux), else None."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> int | None:
+    try:
+        import resource
+
+        # ru_maxrss is in KiB on Linux.
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Bytes of `obj` and everything it references (classes, modules and functions excluded), counted once."""
+    seen: set[int] = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIP_TYPES):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        stack.extend(gc.get_referents(o))
+    return total
+
+
+@dataclass(frozen=True)
+class ImportCost:
+    """
+    What the first import of a component or platform added to the process.
+    Modules it pulls in are charged to whichever import loads them first, and
+    allocations of other threads in the meantime are included.
+    """
+
+    key: str
+    seconds: float
+    modules: int
+    rss_bytes: int | None
+    # Python allocations, when tracemalloc is running.
+    traced_bytes: int | None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "seconds": round(self.seconds, 4),
+            "modules": self.modules,
+            "rssBytes": self.rss_bytes,
+            "tracedBytes": self.traced_bytes,
+        }
+
+    def weight(self) -> int:
+        return self.traced_bytes if self.traced_bytes is not None else self.rss_bytes or 0
+
+
+class _Ledger:
+    """Import costs and the size of every cached schema payload, measured as they are created."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.imports: dict[str, ImportCost] = {}
+        self.payloads: dict[str, int] = {}
+
+
+_ledger = _Ledger()
+
+
+def _traced() -> int | None:
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+
+@contextmanager
+def attribute_import(key: str) -> Iterator[None]:
+    """Charge what the block adds (modules, RSS, traced allocations) to `key`, the first time only."""
+    if key in _ledger.imports:
+        yield
+        return
+    modules, rss, traced = len(sys.modules), rss_bytes(), _traced()
+    start = time.perf_counter()
+    yield
+    rss_after, traced_after = rss_bytes(), _traced()
+    cost = ImportCost(
+        key=key,
+        seconds=time.perf_counter() - start,
+        modules=len(sys.modules) - modules,
+        rss_bytes=rss_after - rss if rss is not None and rss_after is not None else None,
+        traced_bytes=traced_after - traced if traced is not None and traced_after is not None else None,
+    )
+    with _ledger.lock:
+        _ledger.imports.setdefault(key, cost)
+
+
+def record_payload(key: str, payload: Any) -> None:
+    """Remember the in-memory size of a schema payload that is about to be cached under `key`."""
+    size = deep_sizeof(payload)
+    with _ledger.lock:
+        _ledger.payloads[key] = size
+
+
+def forget_payloads() -> None:
+    with _ledger.lock:
+        _ledger.payloads.clear()
+
+
+def payload_bytes(core: bool) -> tuple[int, int]:
+    """(entries, bytes) of the recorded `core:*` payloads, or of the platform payloads."""
+    with _ledger.lock:
+        sizes = [size for key, size in _ledger.payloads.items() if key.startswith("core:") == core]
+    return len(sizes), sum(sizes)
+
+
+def start_tracing(frames: int) -> bool:
+    """Start tracemalloc with `frames` frames per allocation (0 leaves it off)."""
+    if frames > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return tracemalloc.is_tracing()
+
+
+def _owner(filename: str) -> str | None:
+    if filename.startswith("<frozen importlib") or filename == tracemalloc.__file__:
+        # Import machinery (code objects of a module being loaded): look further up the stack.
+        return None
+    if m := _COMPONENT_FILE_RE.search(filename):
+        return f"esphome.components.{m.group(1)}"
+    if m := _PACKAGE_FILE_RE.search(filename):
+        return m.group(1).removesuffix(".py")
+    if "eve_schema_service" in filename:
+        return "eve_schema_service"
+    return "python"
+
+
+def _raw_traces() -> list[tuple[Any, int, tuple[tuple[str, int], ...], Any]]:
+    """(domain, size, frames from the allocation outwards, total frames) of every traced block."""
+    # Snapshot.statistics() builds Frame objects for every block and takes seconds
+    # on a process with ESPHome loaded; the raw tuples are an order of magnitude faster.
+    get_traces = getattr(tracemalloc, "_get_traces", None)
+    if get_traces is not None:
+        return list(get_traces())
+    return [
+        (None, t.size, tuple((f.filename, f.lineno) for f in reversed(t.traceback)), None)
+        for t in tracemalloc.take_snapshot().traces
+    ]
+
+
+def traced_by_owner(limit: int) -> list[dict[str, Any]]:
+    """
+    Live traced allocations grouped by the component or package whose code made
+    them. Allocations made while importing a module are charged to the code that
+    imported it when enough frames are traced (MEMORY_TRACE > 1).
+    """
+    if not tracemalloc.is_tracing():
+        return []
+    traces = _raw_traces()
+    # Blocks allocated at the same place share one frames tuple: sum per tuple
+    # first (everything allocated here is traced too, so keep the loop lean).
+    per_traceback: dict[int, list[Any]] = {}
+    for trace in traces:
+        entry = per_traceback.get(id(trace[2]))
+        if entry is None:
+            per_traceback[id(trace[2])] = [trace[2], trace[1], 1]
+        else:
+            entry[1] += trace[1]
+            entry[2] += 1
+    owners: dict[str, list[int]] = {}
+    for frames, size, count in per_traceback.values():
+        owner = next((o for o in (_owner(filename) for filename, _ in frames) if o is not None), "python")
+        totals = owners.setdefault(owner, [0, 0])
+        totals[0] += size
+        totals[1] += count
+    ranked = sorted(owners.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+    return [{"owner": owner, "bytes": size, "blocks": count} for owner, (size, count) in ranked]
+
+
+def process_usage() -> dict[str, Any]:
+    traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+    return {
+        "rssBytes": rss_bytes(),
+        "peakRssBytes": peak_rss_bytes(),
+        "modules": len(sys.modules),
+        "tracing": traced is not None,
+        "tracedBytes": traced[0] if traced is not None else None,
+        "tracedPeakBytes": traced[1] if traced is not None else None,
+    }
+
+
+def release_free_memory() -> bool:
+    """Collect garbage and ask glibc to return free heap pages to the OS (False where unavailable)."""
+    gc.collect()
+    name = ctypes.util.find_library("c")
+    if name is None:
+        return False
+    try:
+        return bool(ctypes.CDLL(name).malloc_trim(0))
+    except (OSError, AttributeError):
+        return False
+
+
+def build_report(caches: dict[str, tuple[int, int]], *, limit: int = 20) -> dict[str, Any]:
+    """Process usage, `caches` (name -> (entries, bytes)) and the top imports, payloads and allocation owners."""
+    with _ledger.lock:
+        imports = sorted(_ledger.imports.values(), key=ImportCost.weight, reverse=True)
+        payloads = sorted(_ledger.payloads.items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "process": process_usage(),
+        "caches": {name: {"entries": entries, "bytes": size} for name, (entries, size) in caches.items()},
+        "imports": {
+            "count": len(imports),
+            "rssBytes": sum(c.rss_bytes or 0 for c in imports),
+            "tracedBytes": sum(c.traced_bytes or 0 for c in imports) if tracemalloc.is_tracing() else None,
+            "top": [c.to_json() for c in imports[:limit]],
+        },
+        "payloads": {
+            "count": len(payloads),
+            "bytes": sum(size for _, size in payloads),
+            "top": [{"key": key, "bytes": size} for key, size in payloads[:limit]],
+        },
+        "tracedByOwner": traced_by_owner(limit),
+    }
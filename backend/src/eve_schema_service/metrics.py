@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Prometheus text exposition format 0.0.4, without the client library.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+MEMORY_BUCKETS = tuple(float(mb << 20) for mb in (32, 64, 128, 256, 512, 1024, 2048))
+
+LabelValues = tuple[str, ...]
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """(name, labels, value) of every sample, as rendered by the registry."""
+
+
+class _ScalarMetric(_Metric):
+    """One value per label set (counters and gauges)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key, strict=True)), value
+
+
+class Counter(_ScalarMetric):
+    kind = "counter"
+
+
+class Gauge(_ScalarMetric):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum.
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][idx] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(k, list(counts), total[0]) for k, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            labels = dict(zip(self.labelnames, key, strict=True))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, total
+
+
+# A collector returns (name, type, help, samples) families computed at scrape time.
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+Collector = Callable[[], Iterable[Family]]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.register(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in metric.samples()
+            )
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                # A broken collector must not take the whole scrape down.
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "eve_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("eve_http_requests_in_flight", "HTTP requests currently being served.")
+VALIDATION_DURATION = REGISTRY.histogram(
+    "eve_validation_duration_seconds",
+    "Duration of `esphome config` validation subprocesses by outcome.",
+    ("outcome",),
+    SLOW_BUCKETS,
+)
+VALIDATION_PEAK_RSS = REGISTRY.histogram(
+    "eve_validation_peak_rss_bytes", "Peak resident set size of validation subprocesses.", (), MEMORY_BUCKETS
+)
+VALIDATION_CPU = REGISTRY.histogram(
+    "eve_validation_cpu_seconds", "User plus system CPU time of validation subprocesses.", (), SLOW_BUCKETS
+)
+VALIDATION_LIMIT_EXCEEDED = REGISTRY.counter(
+    "eve_validation_limit_exceeded_total", "Validation subprocesses stopped by a resource limit.", ("limit",)
+)
+ESPHOME_IMPORT_DURATION = REGISTRY.histogram(
+    "eve_esphome_import_duration_seconds",
+    "Time spent importing ESPHome component modules (cache misses only).",
+    ("kind",),
+    SLOW_BUCKETS,
+)
+SCHEMA_CONVERT_DURATION = REGISTRY.histogram(
+    "eve_schema_convert_duration_seconds",
+    "Time spent converting a voluptuous schema to the UI schema (cache misses only).",
+    ("kind",),
+    SLOW_BUCKETS,
+)
+
+
+def _route_label(scope: Scope) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    return getattr(endpoint, "__name__", None) or type(endpoint).__name__
+
+
+class MetricsMiddleware:
+    """
+    Records request latency per route (labelled by endpoint name, so cardinality
+    stays bounded) and the number of in-flight requests. Server-Sent Event
+    streams are counted in flight but left out of the latency histogram.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = "500"
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                streaming = Headers(raw=message["headers"]).get("content-type", "").startswith("text/event-stream")
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            if not streaming:
+                HTTP_REQUEST_DURATION.observe(
+                    time.perf_counter() - start, method=scope["method"], route=_route_label(scope), status=status
+                )
+
+
+# (hits, misses, entries) for one cache.
+CacheStats = tuple[int, int, int]
+
+
+def lru_stats(fn: Callable[..., object]) -> Callable[[], CacheStats]:
+    def stats() -> CacheStats:
+        info = fn.cache_info()  # type: ignore[attr-defined]
+        return info.hits, info.misses, info.currsize
+
+    return stats
+
+
+def cache_collector(sources: dict[str, Callable[[], CacheStats]]) -> Collector:
+    """Collector exposing hit/miss/size statistics for the named caches."""
+
+    def collect() -> Iterator[Family]:
+        stats = {name: source() for name, source in sources.items()}
+        for idx, (name, kind, documentation) in enumerate(
+            (
+                ("eve_cache_hits_total", "counter", "Cache hits."),
+                ("eve_cache_misses_total", "counter", "Cache misses."),
+                ("eve_cache_entries", "gauge", "Entries currently cached."),
+            )
+        ):
+            yield name, kind, documentation, [({"cache": n}, float(v[idx])) for n, v in stats.items()]
+
+    return collect
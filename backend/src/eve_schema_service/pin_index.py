@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from array import array
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from .espboards import get_board_catalog, get_board_details
+
+# Normalized capability flags. Each flag is one bit in a pin's capability mask;
+# the patterns run over the lowercased header/value text of the espboards
+# "Pin Mappings" table (see `_extract_pin_mappings`).
+CAPABILITIES: dict[str, int] = {
+    "adc": 1 << 0,
+    "dac": 1 << 1,
+    "touch": 1 << 2,
+    "pwm": 1 << 3,
+    "i2c": 1 << 4,
+    "spi": 1 << 5,
+    "uart": 1 << 6,
+    "rtc": 1 << 7,
+    "strapping": 1 << 8,
+    "flash": 1 << 9,
+    "input_only": 1 << 10,
+    "usb": 1 << 11,
+    "jtag": 1 << 12,
+    "led": 1 << 13,
+}
+
+_CAPABILITY_PATTERNS: dict[str, re.Pattern[str]] = {
+    "adc": re.compile(r"\badc"),
+    "dac": re.compile(r"\bdac"),
+    "touch": re.compile(r"\btouch|\bt[0-9]+\b"),
+    "pwm": re.compile(r"\bpwm|\bledc"),
+    "i2c": re.compile(r"\bi2c|\bsda\b|\bscl\b"),
+    "spi": re.compile(r"\b[hvf]?spi|\bmosi\b|\bmiso\b|\bsclk\b"),
+    "uart": re.compile(r"\buart|\bu[0-9]?[rt]xd?\b|\b[rt]xd?[0-9]?\b"),
+    "rtc": re.compile(r"\brtc"),
+    "strapping": re.compile(r"strap|\bboot\b"),
+    "flash": re.compile(r"flash|psram"),
+    "input_only": re.compile(r"input[ _-]?only"),
+    "usb": re.compile(r"\busb|\bd[+-]"),
+    "jtag": re.compile(r"jtag|\bmt(?:ck|di|do|ms)\b"),
+    "led": re.compile(r"\bled\b|built[ -]?in led"),
+}
+
+# Table cells that only mark a header as applicable ("ADC: Yes") or not ("ADC: -").
+_YES_VALUES = {"yes", "y", "true", "x", "✓", "✔", "✅"}
+_NO_VALUES = {"no", "n", "false", "-", "–", "—", "✗", "✘", "❌", "n/a", "none"}
+
+_GPIO_VALUE_RE = re.compile(r"^GPIO([0-9]+)$")
+
+
+def pin_capabilities(pin: dict[str, Any]) -> int:
+    """Derive the normalized capability mask from a pin payload of `get_board_details`."""
+    parts: list[str] = []
+    meta = pin.get("meta")
+    if isinstance(meta, dict):
+        for header, value in meta.items():
+            v = str(value or "").strip().lower()
+            if not v or v in _NO_VALUES:
+                continue
+            parts.append(str(header).lower() if v in _YES_VALUES else f"{str(header).lower()} {v}")
+    elif pin.get("description"):
+        parts.append(str(pin["description"]).lower())
+    text = " ".join(parts)
+    mask = 0
+    for name, pattern in _CAPABILITY_PATTERNS.items():
+        if pattern.search(text):
+            mask |= CAPABILITIES[name]
+    return mask
+
+
+def capability_names(mask: int) -> list[str]:
+    return [name for name, bit in CAPABILITIES.items() if mask & bit]
+
+
+def parse_capabilities(raw: str | None) -> int:
+    mask = 0
+    for name in (raw or "").split(","):
+        name = name.strip().lower().replace("-", "_")
+        if not name:
+            continue
+        if name not in CAPABILITIES:
+            raise ValueError(f"Unknown pin capability: {name!r} (known: {', '.join(CAPABILITIES)})")
+        mask |= CAPABILITIES[name]
+    return mask
+
+
+@dataclass(frozen=True)
+class PinIndexBoard:
+    target: str
+    slug: str
+    name: str
+    microcontroller: str | None
+
+
+class PinIndex:
+    """
+    Columnar board × GPIO index.
+
+    Rows are (board, gpio, capability mask) triples stored in parallel arrays.
+    For every capability, target and microcontroller we additionally keep a row
+    bitmap (a Python int with bit i set when row i matches), so a query is a
+    handful of big-int AND/OR operations followed by a walk over the set bits.
+    """
+
+    def __init__(self, boards: list[PinIndexBoard], rows: Iterable[tuple[int, int, int]]) -> None:
+        self.boards = boards
+        self.row_board = array("I")
+        self.row_gpio = array("H")
+        self.row_flags = array("I")
+        # Grouped by board (stable, so GPIO order is kept): `query` relies on it.
+        for board_idx, gpio, flags in sorted(rows, key=lambda r: r[0]):
+            self.row_board.append(board_idx)
+            self.row_gpio.append(gpio)
+            self.row_flags.append(flags)
+
+        flag_bits: dict[str, int] = {name: 0 for name in CAPABILITIES}
+        target_bits: dict[str, int] = {}
+        micro_bits: dict[str, int] = {}
+        for i, (board_idx, flags) in enumerate(zip(self.row_board, self.row_flags, strict=True)):
+            bit = 1 << i
+            for name, cap in CAPABILITIES.items():
+                if flags & cap:
+                    flag_bits[name] |= bit
+            board = boards[board_idx]
+            target = board.target.strip().lower()
+            target_bits[target] = target_bits.get(target, 0) | bit
+            if board.microcontroller:
+                micro = _norm_micro(board.microcontroller)
+                micro_bits[micro] = micro_bits.get(micro, 0) | bit
+        self._flag_bits = flag_bits
+        self._target_bits = target_bits
+        self._micro_bits = micro_bits
+        self._all_rows = (1 << len(self.row_board)) - 1
+        self._words = -(-len(self.row_board) // 64)
+
+    @classmethod
+    def from_details(cls, details: Iterable[tuple[dict[str, Any], dict[str, Any]]]) -> PinIndex:
+        """Build from (catalog entry, board details payload) pairs."""
+        boards: list[PinIndexBoard] = []
+        rows: list[tuple[int, int, int]] = []
+        for entry, payload in details:
+            board_idx = len(boards)
+            boards.append(
+                PinIndexBoard(
+                    target=str(entry.get("target") or payload.get("target") or ""),
+                    slug=str(entry.get("slug") or payload.get("slug") or ""),
+                    name=str(entry.get("name") or payload.get("name") or ""),
+                    microcontroller=entry.get("microcontroller") or None,
+                )
+            )
+            seen: set[int] = set()
+            for pin in payload.get("pins") or []:
+                m = _GPIO_VALUE_RE.match(str(pin.get("value") or ""))
+                if not m:
+                    continue
+                gpio = int(m.group(1))
+                if gpio in seen or gpio > 0xFFFF:
+                    continue
+                seen.add(gpio)
+                rows.append((board_idx, gpio, pin_capabilities(pin)))
+        return cls(boards, rows)
+
+    def __len__(self) -> int:
+        return len(self.row_board)
+
+    def query(
+        self,
+        *,
+        has: int = 0,
+        exclude: int = 0,
+        target: str | None = None,
+        microcontroller: str | None = None,
+    ) -> list[tuple[PinIndexBoard, list[int]]]:
+        """Boards with at least one GPIO carrying all `has` flags and none of `exclude`."""
+        rows = self._all_rows
+        if target:
+            rows &= self._target_bits.get(target.strip().lower(), 0)
+        if microcontroller:
+            rows &= self._micro_bits.get(_norm_micro(microcontroller), 0)
+        for name, cap in CAPABILITIES.items():
+            if not rows:
+                break
+            if has & cap:
+                rows &= self._flag_bits[name]
+            elif exclude & cap:
+                rows &= ~self._flag_bits[name]
+
+        # Walk the set bits one 64-bit word at a time, so the cost is the number of
+        # matches plus rows / 64 (bit tricks on the whole bitmap cost a pass over
+        # all rows per match). Rows are stored board by board, so a board's GPIOs
+        # are consecutive. 800 boards x 40 pins: ~50 us for ~100 matches, ~2 ms
+        # for `has=adc` (~7000 matches).
+        out: list[tuple[PinIndexBoard, list[int]]] = []
+        if not rows:
+            return out
+        row_board, row_gpio = self.row_board, self.row_gpio
+        current, gpios = -1, []
+        for w, word in enumerate(array("Q", rows.to_bytes(self._words * 8, "little"))):
+            base = w * 64
+            while word:
+                low = word & -word
+                i = base + low.bit_length() - 1
+                word ^= low
+                if row_board[i] != current:
+                    current, gpios = row_board[i], []
+                    out.append((self.boards[current], gpios))
+                gpios.append(row_gpio[i])
+        return out
+
+    def board_pins(self, target: str, slug: str) -> list[tuple[int, int]]:
+        for board_idx, board in enumerate(self.boards):
+            if board.target == target and board.slug == slug:
+                return [
+                    (gpio, flags)
+                    for b, gpio, flags in zip(self.row_board, self.row_gpio, self.row_flags, strict=True)
+                    if b == board_idx
+                ]
+        return []
+
+
+def _norm_micro(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", s.strip().lower())
+
+
+_TARGETS = ("esp32", "esp8266")
+_HARVEST_WORKERS = 4
+
+
+class _PinIndexJob:
+    def __init__(self) -> None:
+        self.index: PinIndex | None = None
+        self.status: dict[str, Any] = {"state": "idle"}
+        self.lock = threading.Lock()
+        self.running = False
+
+    def claim(self) -> bool:
+        with self.lock:
+            if self.running:
+                return False
+            self.running = True
+            self.status = {"state": "building", "startedAt": datetime.now(UTC).isoformat(), "errors": 0}
+            return True
+
+    def record_error(self) -> None:
+        with self.lock:
+            self.status["errors"] = self.status.get("errors", 0) + 1
+
+
+_job = _PinIndexJob()
+
+
+def get_pin_index() -> PinIndex | None:
+    return _job.index
+
+
+def pin_index_status() -> dict[str, Any]:
+    out = dict(_job.status)
+    idx = _job.index
+    out["boards"] = len(idx.boards) if idx is not None else 0
+    out["rows"] = len(idx) if idx is not None else 0
+    return out
+
+
+BoardHook = Callable[[dict[str, Any], dict[str, Any]], None]
+
+
+def build_pin_index(on_board: BoardHook | None = None) -> PinIndex | None:
+    """
+    Harvest pin mappings for the whole board catalog and swap in a new index.
+
+    Board detail pages go through `get_board_details`, so they land in (and are
+    served from) the regular espboards details cache. `on_board` is called with
+    each (catalog entry, details payload) pair, e.g. to prefetch images.
+    Returns None when a build is already running.
+    """
+    if not _job.claim():
+        return None
+    started = time.time()
+    try:
+        entries: list[dict[str, Any]] = []
+        for target in _TARGETS:
+            try:
+                entries.extend(get_board_catalog(target))
+            except Exception:
+                _job.record_error()
+
+        def _details(entry: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]] | None:
+            try:
+                payload = get_board_details(entry["target"], entry["slug"])
+            except Exception:
+                _job.record_error()
+                return None
+            if on_board is not None:
+                try:
+                    on_board(entry, payload)
+                except Exception:
+                    _job.record_error()
+            return entry, payload
+
+        with ThreadPoolExecutor(max_workers=_HARVEST_WORKERS, thread_name_prefix="eve-pins") as pool:
+            harvested = [d for d in pool.map(_details, entries) if d is not None]
+
+        idx = PinIndex.from_details(harvested)
+        _job.index = idx
+        _job.status.update(
+            state="ready",
+            finishedAt=datetime.now(UTC).isoformat(),
+            durationS=round(time.time() - started, 3),
+        )
+        return idx
+    except Exception as e:
+        _job.status.update(state="failed", error=str(e), finishedAt=datetime.now(UTC).isoformat())
+        return None
+    finally:
+        _job.running = False
+
+
+def start_pin_index_build(on_board: BoardHook | None = None) -> bool:
+    """Kick off `build_pin_index` in a daemon thread; False if one is already running."""
+    if _job.running:
+        return False
+    threading.Thread(target=build_pin_index, args=(on_board,), name="eve-pin-index", daemon=True).start()
+    return True
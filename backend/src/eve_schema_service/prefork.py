@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import gc
+import os
+import signal
+import time
+from collections.abc import Callable
+from typing import Any
+
+import uvicorn
+
+_RESPAWN_BACKOFF_S = 1.0
+
+
+def serve_prefork(app: Any, *, host: str, port: int, workers: int, warm: Callable[[], None] | None = None) -> None:
+    """
+    Run `workers` uvicorn servers forked from this (warmed) process.
+
+    `uvicorn --workers` spawns fresh interpreters, so every worker imports ESPHome
+    and converts schemas on its own. Here the parent imports the app and runs
+    `warm` once, binds the listening socket, freezes the GC generations (so
+    refcount/GC bookkeeping does not touch the shared pages) and forks: the
+    children inherit the imported modules and warmed caches copy-on-write.
+    Crashed workers are re-forked from the same warm parent.
+    """
+    if warm is not None:
+        warm()
+    config = uvicorn.Config(app, host=host, port=port)
+    sock = config.bind_socket()
+    gc.collect()
+    gc.freeze()
+
+    children: set[int] = set()
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                uvicorn.Server(uvicorn.Config(app, host=host, port=port)).run(sockets=[sock])
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)  # pylint: disable=protected-access
+        children.add(pid)
+
+    def stop(signum: int, _frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                children.discard(pid)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    try:
+        while children:
+            try:
+                pid, _status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            children.discard(pid)
+            if not stopping:
+                time.sleep(_RESPAWN_BACKOFF_S)
+                spawn()
+    finally:
+        sock.close()
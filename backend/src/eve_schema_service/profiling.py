@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import hmac
+import io
+import json
+import marshal
+import pstats
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .fsutil import write_atomic
+from .http_errors import BadRequest, NotFound
+
+MODES = ("cprofile", "sample")
+PROFILE_HEADER = "x-eve-profile"
+TOKEN_HEADER = "x-eve-admin-token"
+
+_SAMPLE_INTERVAL_S = 0.005
+_MAX_WINDOW_S = 120.0
+
+
+@dataclass
+class _Capture:
+    spans: list[dict[str, Any]] = field(default_factory=list)
+
+
+_active: contextvars.ContextVar[_Capture | None] = contextvars.ContextVar("eve_profile_capture", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """
+    Record the wall time of a block in the profile being captured, if any.
+
+    Subprocess time (ESPHome validation) and time spent in worker threads do not
+    show up in cProfile output, so the hot paths mark themselves explicitly.
+    """
+    capture = _active.get()
+    if capture is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        capture.spans.append({"name": name, **attrs, "seconds": round(time.perf_counter() - start, 6)})
+
+
+def check_token(expected: str, headers: Headers) -> bool:
+    supplied = headers.get(TOKEN_HEADER) or ""
+    auth = headers.get("authorization") or ""
+    if not supplied and auth.lower().startswith("bearer "):
+        supplied = auth[7:].strip()
+    return bool(expected) and hmac.compare_digest(supplied.encode(), expected.encode())
+
+
+class _Sampler:
+    """Wall-clock stack sampler over all threads; output is folded stacks (`a;b;c count`)."""
+
+    def __init__(self, interval_s: float = _SAMPLE_INTERVAL_S) -> None:
+        self.interval_s = interval_s
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="eve-profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval_s):
+            for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if ident == own:
+                    continue
+                parts: list[str] = []
+                f: Any = frame
+                while f is not None:
+                    code = f.f_code
+                    parts.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    f = f.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                parts.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(parts))] += 1
+            self.samples += 1
+
+    def folded(self) -> bytes:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()).encode("utf-8")
+
+
+class ProfileStore:
+    """
+    Captured profiles on disk: `<id>.prof` (cProfile/pstats) or `<id>.folded`
+    (sampled stacks for flamegraph.pl / speedscope), plus `<id>.json` metadata.
+    Only the newest `keep` profiles are retained.
+    """
+
+    def __init__(self, root: Path, *, keep: int = 50) -> None:
+        self.root = root
+        self.keep = keep
+        # cProfile cannot nest, and overlapping samplers would double count.
+        self._busy = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        return self._busy.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._busy.release()
+
+    def save(self, mode: str, data: bytes, meta: dict[str, Any]) -> str:
+        self.root.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}"
+        suffix = ".prof" if mode == "cprofile" else ".folded"
+        write_atomic(self.root / f"{profile_id}{suffix}", data)
+        meta = {"id": profile_id, "mode": mode, "createdAt": time.time(), **meta}
+        write_atomic(self.root / f"{profile_id}.json", json.dumps(meta).encode("utf-8"))
+        self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        metas = sorted(self.root.glob("*.json"), key=lambda p: p.name, reverse=True)
+        for stale in metas[self.keep :]:
+            for path in self.root.glob(f"{stale.stem}.*"):
+                path.unlink(missing_ok=True)
+
+    def list(self) -> list[dict[str, Any]]:
+        if not self.root.exists():
+            return []
+        out = []
+        for path in sorted(self.root.glob("*.json"), key=lambda p: p.name, reverse=True):
+            try:
+                out.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return out
+
+    def path(self, profile_id: str) -> tuple[str, Path]:
+        if not profile_id or not all(c.isalnum() or c == "-" for c in profile_id):
+            raise NotFound("Profile not found.")
+        for mode, suffix in (("cprofile", ".prof"), ("sample", ".folded")):
+            p = self.root / f"{profile_id}{suffix}"
+            if p.exists():
+                return mode, p
+        raise NotFound("Profile not found.")
+
+    def pstats_text(self, profile_id: str, *, sort: str = "cumulative", limit: int = 60) -> str:
+        mode, path = self.path(profile_id)
+        if mode != "cprofile":
+            raise BadRequest("Text summaries are only available for cProfile captures.")
+        out = io.StringIO()
+        stats = pstats.Stats(str(path), stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def capture_window(self, seconds: float) -> str:
+        """Sample every thread for `seconds` (blocking) and store the result."""
+        if not 0 < seconds <= _MAX_WINDOW_S:
+            raise BadRequest(f"seconds must be in (0, {_MAX_WINDOW_S:g}].")
+        if not self.try_acquire():
+            raise BadRequest("Another profile is being captured.")
+        try:
+            sampler = _Sampler()
+            start = time.perf_counter()
+            sampler.start()
+            time.sleep(seconds)
+            sampler.stop()
+            return self.save(
+                "sample",
+                sampler.folded(),
+                {"target": "window", "seconds": round(time.perf_counter() - start, 3), "samples": sampler.samples},
+            )
+        finally:
+            self.release()
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request when it carries `X-Eve-Profile: cprofile|sample` (or
+    `?profile=...`) and a valid admin token. The response gets `X-Eve-Profile-Id`;
+    the capture is downloadable from `/api/admin/profiles/{id}`.
+
+    cProfile only sees the event loop thread; `sample` mode samples all threads
+    (including concurrent requests), which also covers work run in the threadpool.
+    """
+
+    def __init__(self, app: ASGIApp, *, store: ProfileStore, token: str) -> None:
+        self.app = app
+        self.store = store
+        self.token = token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        mode = headers.get(PROFILE_HEADER) or QueryParams(scope.get("query_string", b"")).get("profile")
+        if mode == "1":
+            mode = "cprofile"
+        if mode not in MODES or not check_token(self.token, headers):
+            await self.app(scope, receive, send)
+            return
+        if not self.store.try_acquire():
+            await self.app(scope, receive, self._with_header(send, "busy"))
+            return
+
+        capture = _Capture()
+        reset = _active.set(capture)
+        profiler = cProfile.Profile() if mode == "cprofile" else None
+        sampler = _Sampler() if mode == "sample" else None
+        profile_id = ""  # set once the capture is saved
+        start = time.perf_counter()
+        started: list[Message] = []
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Hold the start message until the body is done so the id can go in a header.
+                started.append(message)
+                return
+            if started and not message.get("more_body", False):
+                finish()
+                await send(self._tag(started.pop(), profile_id))
+            elif started:
+                await send(self._tag(started.pop(), "streaming"))
+            await send(message)
+
+        def finish() -> None:
+            nonlocal profile_id, profiler, sampler
+            if profiler is not None:
+                profiler.disable()
+                data = _marshal_stats(profiler)
+                profiler = None
+            elif sampler is not None:
+                sampler.stop()
+                data = sampler.folded()
+                sampler = None
+            else:
+                return
+            profile_id = self.store.save(
+                mode,
+                data,
+                {
+                    "target": "request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "seconds": round(time.perf_counter() - start, 6),
+                    "spans": capture.spans,
+                },
+            )
+
+        try:
+            if profiler is not None:
+                profiler.enable()
+            if sampler is not None:
+                sampler.start()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            try:
+                finish()
+            finally:
+                _active.reset(reset)
+                self.store.release()
+
+    @staticmethod
+    def _tag(message: Message, value: str) -> Message:
+        MutableHeaders(raw=message["headers"])["X-Eve-Profile-Id"] = value
+        return message
+
+    def _with_header(self, send: Send, value: str) -> Send:
+        async def wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._tag(message, value)
+            await send(message)
+
+        return wrapper
+
+
+def _marshal_stats(profiler: cProfile.Profile) -> bytes:
+    """The bytes `pstats.Stats.dump_stats` would write, without a temporary file."""
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)  # type: ignore[attr-defined]
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import tarfile
+import time
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+from typing import IO, TYPE_CHECKING, Any
+
+from .http_errors import BadRequest
+from .projects import _sanitize_name, list_projects, project_path, read_project, write_project_yaml
+
+if TYPE_CHECKING:
+    from .project_history import HistoryStore
+
+FORMATS = {"tar.gz": "application/gzip", "zip": "application/zip"}
+
+_PROJECT_SUFFIXES = (".yaml", ".yml")
+_MAX_MEMBER_BYTES = 8 * 1024 * 1024
+_MAX_TOTAL_BYTES = 256 * 1024 * 1024
+_MAX_MEMBERS = 10_000
+
+
+class _ChunkSink:
+    """Write-only file object collecting output between drains (lets tar/zip stream)."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        return None
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def iter_export(projects_dir: Path, fmt: str = "tar.gz") -> Iterator[bytes]:
+    """
+    Yield a tar.gz or zip archive of all projects, one project at a time, so the
+    archive is produced on the fly and never held in memory as a whole.
+    """
+    if fmt not in FORMATS:
+        raise BadRequest(f"Unsupported archive format; use one of: {', '.join(FORMATS)}.")
+    sink = _ChunkSink()
+    names = list_projects(projects_dir)
+    if fmt == "zip":
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:  # type: ignore[arg-type]
+            for filename, data, mtime in _iter_files(projects_dir, names):
+                info = zipfile.ZipInfo(filename, date_time=_zip_time(mtime))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                zf.writestr(info, data)
+                yield sink.drain()
+    else:
+        with tarfile.open(fileobj=sink, mode="w|gz") as tf:  # type: ignore[call-overload]
+            for filename, data, mtime in _iter_files(projects_dir, names):
+                info = tarfile.TarInfo(filename)
+                info.size = len(data)
+                info.mtime = int(mtime)
+                info.mode = 0o644
+                tf.addfile(info, _BytesReader(data))
+                yield sink.drain()
+    yield sink.drain()
+
+
+def _iter_files(projects_dir: Path, names: list[str]) -> Iterator[tuple[str, bytes, float]]:
+    for name in dict.fromkeys(names):
+        try:
+            proj = project_path(projects_dir, name)
+            text = read_project(projects_dir, name).yaml
+            mtime = proj.path.stat().st_mtime
+        except Exception:
+            # Vanished or unreadable between listing and reading; skip it.
+            continue
+        yield proj.path.name, text.encode("utf-8"), mtime
+
+
+def _zip_time(mtime: float) -> tuple[int, int, int, int, int, int]:
+    t = time.localtime(mtime)
+    return (max(t.tm_year, 1980), t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec)
+
+
+class _BytesReader:
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._data) if size < 0 else min(len(self._data), self._pos + size)
+        out = self._data[self._pos : end].tobytes()
+        self._pos = end
+        return out
+
+
+def _member_project_name(member_name: str) -> str:
+    path = PurePosixPath(member_name.replace("\\", "/"))
+    if path.is_absolute() or ".." in path.parts:
+        raise BadRequest("Unsafe path in archive.")
+    if path.suffix not in _PROJECT_SUFFIXES:
+        raise BadRequest("Not a .yaml/.yml file.")
+    return _sanitize_name(path.stem)
+
+
+def _iter_members(fileobj: IO[bytes]) -> Iterator[tuple[str, IO[bytes] | None, int]]:
+    """Yield (member name, reader or None for non-files, size) from a zip or tar(.gz/.bz2/.xz) stream."""
+    head = fileobj.read(4)
+    fileobj.seek(0)
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                with zf.open(info) as f:
+                    yield info.filename, f, info.file_size
+        return
+    try:
+        tf = tarfile.open(fileobj=fileobj, mode="r|*")  # pylint: disable=consider-using-with
+    except tarfile.TarError as e:
+        raise BadRequest("Archive must be a zip or (compressed) tar file.") from e
+    with tf:
+        for member in tf:
+            if member.isdir():
+                continue
+            yield member.name, tf.extractfile(member) if member.isfile() else None, member.size
+
+
+def import_archive(
+    projects_dir: Path,
+    fileobj: IO[bytes],
+    *,
+    overwrite: bool = True,
+    history: HistoryStore | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Extract projects from an uploaded archive member by member. Every name goes
+    through `_sanitize_name`, every write is atomic, and each member gets its own
+    result entry instead of failing the whole import.
+    """
+    results: list[dict[str, Any]] = []
+    total = 0
+    for count, (member_name, reader, size) in enumerate(_iter_members(fileobj), start=1):
+        if count > _MAX_MEMBERS:
+            results.append({"file": member_name, "status": "error", "detail": "Too many archive members."})
+            break
+        result: dict[str, Any] = {"file": member_name}
+        results.append(result)
+        try:
+            name = _member_project_name(member_name)
+            result["name"] = name
+            if reader is None:
+                raise BadRequest("Not a regular file.")
+            if size > _MAX_MEMBER_BYTES:
+                raise BadRequest("File too large.")
+            total += size
+            if total > _MAX_TOTAL_BYTES:
+                raise BadRequest("Archive too large.")
+            data = reader.read(_MAX_MEMBER_BYTES + 1)
+            if len(data) > _MAX_MEMBER_BYTES:
+                raise BadRequest("File too large.")
+            text = data.decode("utf-8")
+            if not overwrite and project_path(projects_dir, name).path.exists():
+                result["status"] = "skipped"
+                result["detail"] = "Project exists."
+                continue
+            result["etag"] = write_project_yaml(projects_dir, name, text, history=history)
+            result["status"] = "written"
+        except BadRequest as e:
+            result["status"] = "error"
+            result["detail"] = str(e)
+        except UnicodeDecodeError:
+            result["status"] = "error"
+            result["detail"] = "File is not valid UTF-8."
+        except OSError as e:
+            result["status"] = "error"
+            result["detail"] = f"Write failed: {e}"
+    return results
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import threading
+from collections.abc import AsyncIterator
+from typing import Any
+
+from .project_index import ProjectEntry
+
+_SUBSCRIBER_QUEUE = 256
+_KEEPALIVE_S = 15.0
+
+# How two consecutive changes of one project collapse into a single event.
+# Missing pairs mean "the later event wins"; None drops the project from the batch.
+_COALESCE: dict[tuple[str, str], str | None] = {
+    ("created", "modified"): "created",
+    ("created", "deleted"): None,
+    ("deleted", "created"): "modified",
+}
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[list[dict[str, Any]] | None] = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE)
+
+    def offer(self, item: list[dict[str, Any]] | None) -> None:
+        # Runs on the subscriber's event loop.
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog and ask the client to resync.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait([{"type": "resync"}])
+
+
+class ProjectChangeFeed:
+    """
+    Fan out project index changes to Server-Sent Events subscribers.
+
+    Changes arriving from the (single, shared) project watcher are coalesced per
+    project and flushed as one batch once no new change arrived for `debounce_s`,
+    so a burst of saves or a `git pull` yields one event per affected project.
+    """
+
+    def __init__(self, *, debounce_s: float = 0.25) -> None:
+        self.debounce_s = debounce_s
+        self._lock = threading.Lock()
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._timer: threading.Timer | None = None
+        self._subscribers: set[_Subscriber] = set()
+        self._ids = itertools.count(1)
+
+    def publish(self, kind: str, name: str, entry: ProjectEntry | None) -> None:
+        """`ProjectIndex` listener; safe to call from any thread."""
+        event = {"type": kind, "name": name, "etag": f'"{entry.sha256}"' if entry else None}
+        with self._lock:
+            prev = self._pending.get(name)
+            if prev is not None:
+                merged = _COALESCE.get((prev["type"], kind), kind)
+                if merged is None:
+                    del self._pending[name]
+                else:
+                    self._pending[name] = {**event, "type": merged}
+            else:
+                self._pending[name] = event
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_s, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            batch = list(self._pending.values())
+            self._pending.clear()
+            self._timer = None
+            subscribers = list(self._subscribers)
+        if not batch:
+            return
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, batch)
+            except RuntimeError:
+                # Event loop already closed.
+                continue
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, None)
+            except RuntimeError:
+                continue
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def stream(self) -> AsyncIterator[str]:
+        """SSE body for one subscriber: `event: project` frames plus keepalive comments."""
+        sub = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        try:
+            yield "retry: 3000\n: subscribed\n\n"
+            while True:
+                try:
+                    batch = await asyncio.wait_for(sub.queue.get(), timeout=_KEEPALIVE_S)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if batch is None:
+                    return
+                for event in batch:
+                    kind = "resync" if event.get("type") == "resync" else "project"
+                    yield f"id: {next(self._ids)}\nevent: {kind}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            with self._lock:
+                self._subscribers.discard(sub)
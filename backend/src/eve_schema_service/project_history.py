@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import difflib
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from .http_errors import NotFound
+
+# Content-defined chunking over lines: a chunk ends after a line whose hash hits
+# the boundary mask (~1 in 16 lines), or after _MAX_CHUNK_LINES. Boundaries only
+# depend on line contents, so a small edit changes one or two chunks and every
+# other chunk deduplicates against earlier revisions.
+_BOUNDARY_MASK = 0xF
+_MAX_CHUNK_LINES = 64
+_GC_THRESHOLD = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    digest BLOB NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    manifest BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS revisions_project ON revisions (project, id);
+"""
+
+
+@dataclass(frozen=True)
+class Revision:
+    id: int
+    project: str
+    created_at: float
+    sha256: str
+    size: int
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "createdAt": datetime.fromtimestamp(self.created_at, UTC).isoformat(),
+            "etag": f'"{self.sha256}"',
+            "size": self.size,
+        }
+
+
+def split_chunks(text: str) -> list[str]:
+    chunks: list[str] = []
+    cur: list[str] = []
+    for line in text.splitlines(keepends=True):
+        cur.append(line)
+        if (zlib.crc32(line.encode("utf-8")) & _BOUNDARY_MASK) == 0 or len(cur) >= _MAX_CHUNK_LINES:
+            chunks.append("".join(cur))
+            cur = []
+    if cur:
+        chunks.append("".join(cur))
+    return chunks
+
+
+def _encode_manifest(ids: list[int]) -> bytes:
+    """Zigzag varint deltas of chunk ids; runs of new/unchanged chunks compress to almost nothing."""
+    out = bytearray()
+    prev = 0
+    for cid in ids:
+        delta = cid - prev
+        prev = cid
+        z = (delta << 1) ^ (delta >> 63)
+        while True:
+            b = z & 0x7F
+            z >>= 7
+            if z:
+                out.append(b | 0x80)
+            else:
+                out.append(b)
+                break
+    return zlib.compress(bytes(out), 9)
+
+
+def _decode_manifest(blob: bytes) -> list[int]:
+    raw = zlib.decompress(blob)
+    ids: list[int] = []
+    prev = 0
+    z = 0
+    shift = 0
+    for b in raw:
+        z |= (b & 0x7F) << shift
+        if b & 0x80:
+            shift += 7
+            continue
+        prev += (z >> 1) ^ -(z & 1)
+        ids.append(prev)
+        z = 0
+        shift = 0
+    return ids
+
+
+class HistoryStore:
+    """
+    Compact, content-addressed revision history for project YAML.
+
+    Revisions are stored as manifests (delta-encoded chunk ids) over a shared,
+    zlib-compressed chunk table in one SQLite database. Retention keeps the newest
+    `keep` revisions per project (and optionally drops revisions older than
+    `max_age_s`); unreferenced chunks are garbage-collected in batches.
+    """
+
+    def __init__(self, path: Path, *, keep: int = 200, max_age_s: float | None = None) -> None:
+        self.path = path
+        self.keep = keep
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._pending_gc = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _chunk_id(self, db: sqlite3.Connection, chunk: str) -> int:
+        data = chunk.encode("utf-8")
+        digest = hashlib.sha256(data).digest()[:16]
+        row = db.execute("SELECT id FROM chunks WHERE digest = ?", (digest,)).fetchone()
+        if row:
+            return int(row[0])
+        cur = db.execute("INSERT INTO chunks (digest, data) VALUES (?, ?)", (digest, zlib.compress(data, 9)))
+        return int(cur.lastrowid or 0)
+
+    def record(self, project: str, text: str, *, now: float | None = None) -> Revision | None:
+        """Store `text` as the newest revision of `project`; None if it equals the latest one."""
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        created = time.time() if now is None else now
+        with self._lock:
+            db = self._db()
+            latest = db.execute(
+                "SELECT sha256 FROM revisions WHERE project = ? ORDER BY id DESC LIMIT 1", (project,)
+            ).fetchone()
+            if latest and latest[0] == sha:
+                return None
+            # IMMEDIATE: take the write lock before reading chunk ids, so a GC in
+            # another worker cannot delete a chunk this revision is about to reuse.
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                ids = [self._chunk_id(db, c) for c in split_chunks(text)]
+                cur = db.execute(
+                    "INSERT INTO revisions (project, created_at, sha256, size, manifest) VALUES (?, ?, ?, ?, ?)",
+                    (project, created, sha, len(data), _encode_manifest(ids)),
+                )
+                rev = Revision(
+                    id=int(cur.lastrowid or 0), project=project, created_at=created, sha256=sha, size=len(data)
+                )
+                self._pending_gc += self._prune(db, project, created)
+                if self._pending_gc >= _GC_THRESHOLD:
+                    self._gc(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return rev
+
+    def has_revisions(self, project: str) -> bool:
+        with self._lock:
+            row = self._db().execute("SELECT 1 FROM revisions WHERE project = ? LIMIT 1", (project,)).fetchone()
+        return row is not None
+
+    def revisions(self, project: str) -> list[Revision]:
+        with self._lock:
+            rows = (
+                self._db()
+                .execute(
+                    "SELECT id, created_at, sha256, size FROM revisions WHERE project = ? ORDER BY id DESC",
+                    (project,),
+                )
+                .fetchall()
+            )
+        return [Revision(id=r[0], project=project, created_at=r[1], sha256=r[2], size=r[3]) for r in rows]
+
+    def get(self, project: str, revision_id: int) -> str:
+        with self._lock:
+            db = self._db()
+            # One read transaction, so the manifest and its chunks come from the same snapshot.
+            db.execute("BEGIN")
+            try:
+                row = db.execute(
+                    "SELECT manifest FROM revisions WHERE project = ? AND id = ?", (project, revision_id)
+                ).fetchone()
+                if row is None:
+                    raise NotFound("Revision not found.")
+                ids = _decode_manifest(row[0])
+                unique = sorted(set(ids))
+                data: dict[int, bytes] = {}
+                for start in range(0, len(unique), 500):
+                    batch = unique[start : start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    data.update(
+                        db.execute(f"SELECT id, data FROM chunks WHERE id IN ({placeholders})", batch).fetchall()
+                    )
+            finally:
+                db.execute("COMMIT")
+        return "".join(zlib.decompress(data[i]).decode("utf-8") for i in ids)
+
+    def diff(self, project: str, from_id: int, to_id: int, *, context: int = 3) -> str:
+        a = self.get(project, from_id)
+        b = self.get(project, to_id)
+        return "".join(
+            difflib.unified_diff(
+                a.splitlines(keepends=True),
+                b.splitlines(keepends=True),
+                fromfile=f"{project}@{from_id}",
+                tofile=f"{project}@{to_id}",
+                n=context,
+            )
+        )
+
+    def _prune(self, db: sqlite3.Connection, project: str, now: float) -> int:
+        deleted = 0
+        if self.keep > 0:
+            deleted += db.execute(
+                "DELETE FROM revisions WHERE project = ? AND id NOT IN "
+                "(SELECT id FROM revisions WHERE project = ? ORDER BY id DESC LIMIT ?)",
+                (project, project, self.keep),
+            ).rowcount
+        if self.max_age_s:
+            # Never drop the newest revision by age alone.
+            deleted += db.execute(
+                "DELETE FROM revisions WHERE project = ? AND created_at < ? AND id <> "
+                "(SELECT MAX(id) FROM revisions WHERE project = ?)",
+                (project, now - self.max_age_s, project),
+            ).rowcount
+        return deleted
+
+    def _gc(self, db: sqlite3.Connection) -> int:
+        live: set[int] = set()
+        for (manifest,) in db.execute("SELECT manifest FROM revisions"):
+            live.update(_decode_manifest(manifest))
+        dead = [(r[0],) for r in db.execute("SELECT id FROM chunks") if r[0] not in live]
+        db.executemany("DELETE FROM chunks WHERE id = ?", dead)
+        self._pending_gc = 0
+        return len(dead)
+
+    def gc(self) -> int:
+        """Apply retention to every project and drop unreferenced chunks; returns chunks removed."""
+        with self._lock:
+            db = self._db()
+            now = time.time()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                for (project,) in db.execute("SELECT DISTINCT project FROM revisions").fetchall():
+                    self._prune(db, project, now)
+                removed = self._gc(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return removed
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            db = self._db()
+            revisions, logical = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM revisions").fetchone()
+            manifests = db.execute("SELECT COALESCE(SUM(LENGTH(manifest)), 0) FROM revisions").fetchone()[0]
+            chunks, chunk_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM chunks").fetchone()
+            latest = db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM revisions "
+                "WHERE id IN (SELECT MAX(id) FROM revisions GROUP BY project)"
+            ).fetchone()[0]
+        stored = chunk_bytes + manifests
+        return {
+            "revisions": revisions,
+            "chunks": chunks,
+            "logicalBytes": logical,
+            "storedBytes": stored,
+            "latestBytes": latest,
+            # Stored bytes relative to naive per-save copies, and to keeping only the latest versions.
+            "ratioVsCopies": round(stored / logical, 4) if logical else None,
+            "amplification": round(stored / latest, 4) if latest else None,
+        }
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from .component_usage import ComponentUsageIndex
+from .dir_watch import watch_directory
+from .esphome_yaml import ProjectSummary, load_esphome_yaml, summarize_config
+from .http_errors import BadRequest
+
+_EXTENSIONS = (".yaml", ".yml")
+
+# Directory mtimes have coarse (tick) granularity: a scan that ran within this window of
+# the last directory change may have missed a later change with the same mtime ("racy" scan).
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Called with (event type, project name, entry after the change or None when deleted).
+ChangeListener = Callable[[str, str, "ProjectEntry | None"], None]
+
+SORT_KEYS = ("name", "mtime", "size", "deviceName", "platform", "componentCount")
+
+
+@dataclass(frozen=True)
+class ProjectEntry:
+    name: str
+    filename: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    summary: ProjectSummary
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "file": self.filename,
+            "size": self.size,
+            "mtime": datetime.fromtimestamp(self.mtime_ns / 1e9, UTC).isoformat(),
+            "sha256": self.sha256,
+            "deviceName": self.summary.device_name,
+            "friendlyName": self.summary.friendly_name,
+            "platform": self.summary.platform,
+            "componentCount": self.summary.component_count,
+        }
+
+
+def _summarize(data: bytes) -> ProjectSummary:
+    try:
+        return summarize_config(load_esphome_yaml(data.decode("utf-8", errors="replace")))
+    except Exception:
+        return summarize_config(None)
+
+
+def _sort_value(entry: ProjectEntry, key: str) -> Any:
+    if key == "mtime":
+        return entry.mtime_ns
+    if key == "size":
+        return entry.size
+    if key == "deviceName":
+        return (entry.summary.device_name or "").lower()
+    if key == "platform":
+        return entry.summary.platform or ""
+    if key == "componentCount":
+        return entry.summary.component_count
+    return entry.name.lower()
+
+
+class ProjectIndex:
+    """
+    In-memory index of the projects directory.
+
+    Entries keep size/mtime, a content hash and a parsed summary; a file is only
+    re-read when its (size, mtime) changes. `refresh()` is cheap when nothing was
+    added or removed (one stat of the directory), and a watcher thread (inotify,
+    plus periodic rescans) picks up edits made by other tools. Content changes
+    are reported to listeners as created/modified/deleted events.
+    """
+
+    def __init__(self, projects_dir: Path) -> None:
+        self.projects_dir = projects_dir
+        self._entries: dict[str, ProjectEntry] = {}
+        self.usage = ComponentUsageIndex()
+        self._dir_mtime_ns: int | None = None
+        self._scanned_ns = 0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._listeners: list[ChangeListener] = []
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        self._listeners.append(listener)
+
+    def _load_entry(self, name: str, path: Path, st: os.stat_result) -> ProjectEntry:
+        cached = self._entries.get(name)
+        if cached and cached.filename == path.name and (cached.size, cached.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return cached
+        data = path.read_bytes()
+        return ProjectEntry(
+            name=name,
+            filename=path.name,
+            size=len(data),
+            mtime_ns=st.st_mtime_ns,
+            sha256=hashlib.sha256(data).hexdigest(),
+            summary=_summarize(data),
+        )
+
+    def refresh(self, *, force: bool = False) -> None:
+        """Rescan the directory when its mtime changed (or always with `force`)."""
+        with self._lock:
+            try:
+                dir_mtime = self.projects_dir.stat().st_mtime_ns
+            except OSError:
+                self._replace_entries({})
+                self._dir_mtime_ns = None
+                return
+            if not force and dir_mtime == self._dir_mtime_ns and self._scanned_ns - dir_mtime > _RACY_WINDOW_NS:
+                return
+            scanned_ns = time.time_ns()
+            found: dict[str, ProjectEntry] = {}
+            with os.scandir(self.projects_dir) as it:
+                for de in sorted(it, key=lambda e: e.name):
+                    stem, ext = os.path.splitext(de.name)
+                    if ext not in _EXTENSIONS or not de.is_file():
+                        continue
+                    # Mirror `project_path`: a .yaml file wins over a .yml one with the same stem.
+                    if stem in found and ext == ".yml":
+                        continue
+                    try:
+                        found[stem] = self._load_entry(stem, Path(de.path), de.stat())
+                    except OSError:
+                        continue
+            self._replace_entries(found)
+            self._dir_mtime_ns = dir_mtime
+            self._scanned_ns = scanned_ns
+
+    def update(self, name: str) -> ProjectEntry | None:
+        """Re-stat a single project (e.g. right after the service wrote it)."""
+        with self._lock:
+            for ext in _EXTENSIONS:
+                path = self.projects_dir / f"{name}{ext}"
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entry = self._load_entry(name, path, st)
+                self._replace_entries({**self._entries, name: entry})
+                return entry
+            self._replace_entries({k: v for k, v in self._entries.items() if k != name})
+            return None
+
+    def _replace_entries(self, entries: dict[str, ProjectEntry]) -> None:
+        old = self._entries
+        changes: list[tuple[str, str, ProjectEntry | None]] = []
+        for name in sorted(old.keys() | entries.keys()):
+            before, after = old.get(name), entries.get(name)
+            if before is after:
+                continue
+            self.usage.apply(
+                name,
+                before.summary.components if before else (),
+                after.summary.components if after else (),
+            )
+            if before is None:
+                changes.append(("created", name, after))
+            elif after is None:
+                changes.append(("deleted", name, None))
+            elif before.sha256 != after.sha256:
+                changes.append(("modified", name, after))
+        self._entries = entries
+        for kind, name, entry in changes:
+            for listener in self._listeners:
+                try:
+                    listener(kind, name, entry)
+                except Exception:
+                    continue
+
+    def get(self, name: str) -> ProjectEntry | None:
+        self.refresh()
+        return self._entries.get(name)
+
+    def entries(self) -> list[ProjectEntry]:
+        self.refresh()
+        return list(self._entries.values())
+
+    def page(
+        self,
+        *,
+        offset: int = 0,
+        limit: int | None = None,
+        sort: str = "name",
+        order: str = "asc",
+    ) -> tuple[int, list[ProjectEntry]]:
+        if sort not in SORT_KEYS:
+            raise BadRequest(f"Invalid sort key; use one of: {', '.join(SORT_KEYS)}.")
+        if order not in {"asc", "desc"}:
+            raise BadRequest("Invalid order; use 'asc' or 'desc'.")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise BadRequest("offset/limit must be non-negative.")
+        items = sorted(self.entries(), key=lambda e: (_sort_value(e, sort), e.name), reverse=order == "desc")
+        end = None if limit is None else offset + limit
+        return len(items), items[offset:end]
+
+    def _on_changed_files(self, filenames: set[str]) -> None:
+        for stem in sorted({os.path.splitext(f)[0] for f in filenames if os.path.splitext(f)[1] in _EXTENSIONS}):
+            self.update(stem)
+
+    def start_watching(self, interval_s: float) -> None:
+        """Watch the directory in a background thread; full rescans every `interval_s` (0 = never)."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def _rescan() -> None:
+            self.refresh(force=True)
+
+        def _run() -> None:
+            while not self._stop.is_set():
+                try:
+                    watch_directory(
+                        self.projects_dir,
+                        self._on_changed_files,
+                        _rescan,
+                        interval_s=interval_s if interval_s > 0 else None,
+                        stop=self._stop,
+                    )
+                    return
+                except Exception:
+                    # e.g. the directory vanished; retry after a pause.
+                    self._stop.wait(max(interval_s, 1.0))
+
+        self._watcher = threading.Thread(target=_run, name="eve-project-index", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=2)
+        self._watcher = None
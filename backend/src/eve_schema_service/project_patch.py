@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from .http_errors import BadRequest
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass(frozen=True)
+class LineEdit:
+    """Replace base lines [start, end) (0-based, half-open) with `text`."""
+
+    start: int
+    end: int
+    text: str
+
+
+def parse_line_edits(raw: Any) -> list[LineEdit]:
+    if not isinstance(raw, list):
+        raise BadRequest("edits must be a list.")
+    edits: list[LineEdit] = []
+    for item in raw:
+        if not isinstance(item, dict):
+            raise BadRequest("Each edit must be an object with start, end and text.")
+        start, end, text = item.get("start"), item.get("end"), item.get("text", "")
+        if not isinstance(start, int) or not isinstance(end, int) or not isinstance(text, str):
+            raise BadRequest("Edit start/end must be integers and text a string.")
+        edits.append(LineEdit(start=start, end=end, text=text))
+    return edits
+
+
+def apply_line_edits(base: str, edits: list[LineEdit]) -> str:
+    """
+    Apply non-overlapping line-range edits. All ranges refer to the base text,
+    so clients can send them in any order.
+    """
+    lines = base.splitlines(keepends=True)
+    ordered = sorted(edits, key=lambda e: (e.start, e.end))
+    prev_end = 0
+    for e in ordered:
+        if e.start < 0 or e.end < e.start or e.end > len(lines):
+            raise BadRequest(f"Edit range [{e.start}, {e.end}) is outside the document ({len(lines)} lines).")
+        if e.start < prev_end:
+            raise BadRequest("Edits must not overlap.")
+        prev_end = e.end
+    newline = "\r\n" if "\r\n" in base else "\n"
+    for e in reversed(ordered):
+        text = e.text
+        # Replacement text is whole lines: don't glue its last line onto the line after it.
+        if text and e.end < len(lines) and not text.endswith(("\n", "\r")):
+            text += newline
+        # Nor onto an unterminated last line it is inserted after.
+        if text and e.start == len(lines) and lines and not lines[-1].endswith(("\n", "\r")):
+            lines[-1] += newline
+        lines[e.start : e.end] = text.splitlines(keepends=True)
+    return "".join(lines)
+
+
+def apply_unified_diff(base: str, diff: str) -> str:
+    """
+    Apply a unified diff (as produced by `diff -u` / `difflib.unified_diff`).
+    Context and removed lines must match the base exactly; no fuzz is applied.
+    """
+    lines = base.splitlines(keepends=True)
+    out: list[str] = []
+    pos = 0
+    diff_lines = diff.splitlines(keepends=True)
+    i = 0
+    saw_hunk = False
+    while i < len(diff_lines):
+        m = _HUNK_RE.match(diff_lines[i])
+        if not m:
+            # File headers (---/+++) and any preamble before the first hunk.
+            i += 1
+            continue
+        saw_hunk = True
+        old_start = int(m.group(1))
+        old_left = int(m.group(2)) if m.group(2) is not None else 1
+        new_left = int(m.group(4)) if m.group(4) is not None else 1
+        # For pure insertions (`-N,0`) the hunk goes after line N.
+        hunk_pos = old_start if old_left == 0 else old_start - 1
+        if hunk_pos < pos or hunk_pos > len(lines):
+            raise BadRequest("Diff hunks are out of order or outside the document.")
+        out.extend(lines[pos:hunk_pos])
+        pos = hunk_pos
+        i += 1
+        while old_left > 0 or new_left > 0:
+            if i >= len(diff_lines):
+                raise BadRequest("Diff hunk is truncated.")
+            line = diff_lines[i]
+            tag, content = line[:1], line[1:]
+            if line in {"\n", "\r\n"}:
+                # Some tools strip the leading space of empty context lines.
+                tag, content = " ", line
+            if i + 1 < len(diff_lines) and diff_lines[i + 1].startswith("\\"):
+                # "\ No newline at end of file" applies to this line.
+                content = content.rstrip("\r\n")
+                i += 1
+            if tag in {" ", "-"}:
+                if pos >= len(lines) or lines[pos] != content:
+                    raise BadRequest(f"Diff does not apply at line {pos + 1}.")
+                pos += 1
+                old_left -= 1
+            if tag in {" ", "+"}:
+                out.append(content)
+                new_left -= 1
+            elif tag != "-":
+                raise BadRequest(f"Invalid diff line: {line[:40]!r}")
+            i += 1
+    if not saw_hunk:
+        raise BadRequest("Diff contains no hunks.")
+    out.extend(lines[pos:])
+    return "".join(out)
@@ -1,13 +1,47 @@
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .http_errors import BadRequest, NotFound
+from .fsutil import write_atomic
+from .http_errors import BadRequest, NotFound, PreconditionFailed
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within one process.
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .project_history import HistoryStore
 
 _SAFE_NAME_RE = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9_.-]{0,63}$")
 
+# Content hashes keyed by path and validated by (inode, size, mtime), so ETag
+# checks for unchanged files cost one stat() instead of a read + hash.
+_etag_cache: dict[Path, tuple[tuple[int, int, int], str]] = {}
+_write_locks: dict[Path, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
+
+class _LockFiles:
+    """Where per-project lock files live, so writes are serialized across worker processes too."""
+
+    dir: Path | None = None
+
+
+_lock_files = _LockFiles()
+
+
+def use_write_lock_dir(path: Path | None) -> None:
+    _lock_files.dir = path
+
 
 @dataclass(frozen=True)
 class Project:
@@ -15,6 +49,12 @@ class Project:
     path: Path
 
 
+@dataclass(frozen=True)
+class ProjectContent:
+    yaml: str
+    etag: str
+
+
 def _sanitize_name(name: str) -> str:
     name = (name or "").strip()
     if not _SAFE_NAME_RE.match(name):
@@ -41,14 +81,126 @@ def list_projects(projects_dir: Path) -> list[str]:
     return names
 
 
-def read_project_yaml(projects_dir: Path, name: str) -> str:
+def content_etag(data: bytes) -> str:
+    """Strong ETag for a project body."""
+    return f'"{hashlib.sha256(data).hexdigest()}"'
+
+
+def _stat_key(st: os.stat_result) -> tuple[int, int, int]:
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def etag_matches(header: str | None, etag: str | None, *, weak: bool = False) -> bool:
+    """
+    Evaluate an ETag list against the current ETag (None = missing). `If-Match`
+    uses the default strong comparison, where weak validators never match;
+    `If-None-Match` passes `weak=True` (RFC 9110, section 8.8.3.2).
+    """
+    if header is None or etag is None:
+        return False
+    candidates = {t.strip() for t in header.split(",")}
+    if "*" in candidates:
+        return True
+    if weak:
+        return etag.removeprefix("W/") in {t.removeprefix("W/") for t in candidates}
+    return not etag.startswith("W/") and etag in candidates
+
+
+def project_etag(projects_dir: Path, name: str) -> str | None:
+    """Current ETag of a project (None when it does not exist), hashing only on a cache miss."""
     proj = project_path(projects_dir, name)
-    if not proj.path.exists():
-        raise NotFound("Project not found.")
-    return proj.path.read_text(encoding="utf-8")
+    try:
+        st = proj.path.stat()
+    except FileNotFoundError:
+        return None
+    cached = _etag_cache.get(proj.path)
+    if cached and cached[0] == _stat_key(st):
+        return cached[1]
+    return read_project(projects_dir, name).etag
+
+
+def read_project(projects_dir: Path, name: str) -> ProjectContent:
+    proj = project_path(projects_dir, name)
+    try:
+        with proj.path.open("rb") as f:
+            data = f.read()
+            # fstat the open file: with atomic (rename-based) writers this describes
+            # exactly the bytes we read, so the cache can't pair a stale hash with a newer stat.
+            st = os.fstat(f.fileno())
+    except FileNotFoundError as e:
+        raise NotFound("Project not found.") from e
+    etag = content_etag(data)
+    _etag_cache[proj.path] = (_stat_key(st), etag)
+    return ProjectContent(yaml=data.decode("utf-8"), etag=etag)
+
+
+def read_project_yaml(projects_dir: Path, name: str) -> str:
+    return read_project(projects_dir, name).yaml
+
+
+def _thread_lock(path: Path) -> threading.Lock:
+    with _write_locks_guard:
+        return _write_locks.setdefault(path, threading.Lock())
+
+
+@contextmanager
+def _write_lock(proj: Project) -> Iterator[None]:
+    """
+    Hold a project's write lock: a thread lock within this process plus, with a
+    lock directory configured, an flock() on its lock file for other workers.
+    """
+    with _thread_lock(proj.path):
+        if _lock_files.dir is None or fcntl is None:
+            yield
+            return
+        _lock_files.dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(_lock_files.dir / f"{proj.name}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the descriptor releases the flock.
+            os.close(fd)
+
 
+def write_project_yaml(
+    projects_dir: Path,
+    name: str,
+    yaml_text: str,
+    *,
+    if_match: str | None = None,
+    history: HistoryStore | None = None,
+) -> str:
+    """
+    Atomically replace a project's YAML and return its new ETag.
 
-def write_project_yaml(projects_dir: Path, name: str, yaml_text: str) -> None:
+    With `if_match` (an `If-Match` header value) the write only happens when the
+    current ETag matches; otherwise `PreconditionFailed` is raised. With `history`
+    the new content is recorded as a revision (and, for a project without history
+    yet, the content it replaces as well).
+    """
     proj = project_path(projects_dir, name)
     projects_dir.mkdir(parents=True, exist_ok=True)
-    proj.path.write_text(yaml_text or "", encoding="utf-8")
+    data = (yaml_text or "").encode("utf-8")
+    with _write_lock(proj):
+        if if_match is not None and not etag_matches(if_match, project_etag(projects_dir, name)):
+            raise PreconditionFailed("Project was modified since it was loaded.")
+        try:
+            mode: int | None = proj.path.stat().st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o644
+        previous: tuple[str, float] | None = None
+        if history is not None and proj.path.exists() and not history.has_revisions(proj.name):
+            previous = (proj.path.read_text(encoding="utf-8"), proj.path.stat().st_mtime)
+        st = write_atomic(proj.path, data, mode=mode)
+        etag = content_etag(data)
+        _etag_cache[proj.path] = (_stat_key(st), etag)
+        if history is not None:
+            try:
+                if previous is not None:
+                    history.record(proj.name, previous[0], now=previous[1])
+                history.record(proj.name, yaml_text or "")
+            except Exception:
+                # History is best-effort; the save itself already succeeded.
+                pass
+        return etag
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.responses import JSONResponse as _StarletteJSONResponse
+
+from .json_codec import dumps
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class JSONResponse(_StarletteJSONResponse):
+    """Drop-in `JSONResponse` rendering through `json_codec` (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    raw = request.headers.get("if-none-match")
+    if not raw:
+        return False
+    candidates = {t.strip().removeprefix("W/") for t in raw.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def ranged_file_response(
+    request: Request,
+    path: Path,
+    *,
+    size: int,
+    media_type: str,
+    etag: str,
+    cache_control: str = IMMUTABLE_CACHE_CONTROL,
+) -> Response:
+    """
+    Serve `path` honoring `If-None-Match` and a single `Range: bytes=...` request.
+
+    Multi-range requests are answered with the full body (allowed by RFC 9110).
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    m = _RANGE_RE.match(range_header.strip()) if range_header else None
+    if m and (not if_range or if_range.strip() == etag) and (m.group(1) or m.group(2)):
+        if m.group(1):
+            start = int(m.group(1))
+            end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+        else:
+            start = max(size - int(m.group(2)), 0)
+            end = size - 1
+        if start >= size or start > end:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        with path.open("rb") as f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+        return Response(
+            body,
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+        )
+
+    return FileResponse(str(path), media_type=media_type, headers=headers)
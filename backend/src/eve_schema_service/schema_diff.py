@@ -0,0 +1,542 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import re
+import sys
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from .esphome_yaml import load_esphome_yaml
+from .fsutil import write_atomic
+from .http_errors import BadRequest, NotFound
+from .projects import list_projects, read_project_yaml
+
+BUNDLE_FORMAT = 1
+_MAX_DEPTH = 32
+# Presentation hints and converter diagnostics; changes there don't affect configs.
+_IGNORED_KEYS = frozenset({"ui", "reason", "docs"})
+_CHILD_KEYS = frozenset({"properties", "options", "items"})
+
+
+@dataclass(frozen=True)
+class SchemaNode:
+    """
+    A UI schema node with a Merkle digest over its structural content: equal
+    digests mean equal subtrees, so the diff never descends into them.
+    """
+
+    digest: str
+    attrs: dict[str, Any]
+    properties: dict[str, SchemaNode] = field(default_factory=dict)
+    variants: tuple[SchemaNode, ...] = ()
+    items: SchemaNode | None = None
+
+    @property
+    def type(self) -> Any:
+        return self.attrs.get("type")
+
+
+def hash_schema(node: Any, depth: int = 0) -> SchemaNode:
+    if not isinstance(node, dict) or depth > _MAX_DEPTH:
+        attrs = {"value": node}
+        return SchemaNode(_digest([attrs]), attrs)
+    attrs = {k: v for k, v in node.items() if k not in _IGNORED_KEYS and k not in _CHILD_KEYS}
+    if isinstance(attrs.get("required"), list):
+        attrs["required"] = sorted(attrs["required"])
+    props = node.get("properties")
+    properties = {str(k): hash_schema(v, depth + 1) for k, v in props.items()} if isinstance(props, dict) else {}
+    options = node.get("options")
+    variants: tuple[SchemaNode, ...] = ()
+    if node.get("type") == "enum" and isinstance(options, list):
+        attrs["options"] = sorted({str(o.get("value")) for o in options if isinstance(o, dict)})
+    elif isinstance(options, list):
+        variants = tuple(hash_schema(o, depth + 1) for o in options)
+    items = hash_schema(node["items"], depth + 1) if "items" in node else None
+    digest = _digest(
+        [
+            attrs,
+            sorted((k, p.digest) for k, p in properties.items()),
+            [v.digest for v in variants],
+            items.digest if items is not None else None,
+        ]
+    )
+    return SchemaNode(digest, attrs, properties, variants, items)
+
+
+def _digest(parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+@dataclass(frozen=True)
+class OptionChange:
+    """
+    One structural change at an option path (`filters.offset`; "" is the
+    component itself). `kind` is added, removed, type, required, default, enum
+    or changed.
+    """
+
+    path: str
+    kind: str
+    old: Any = None
+    new: Any = None
+
+    def to_json(self) -> dict[str, Any]:
+        return {"path": self.path, "kind": self.kind, "old": self.old, "new": self.new}
+
+
+def _join(prefix: str, key: str) -> str:
+    return f"{prefix}.{key}" if prefix else key
+
+
+def diff_nodes(old: SchemaNode, new: SchemaNode, prefix: str = "") -> list[OptionChange]:
+    if old.digest == new.digest:
+        return []
+    if old.type != new.type:
+        # Everything below changes with the type; report it once.
+        return [OptionChange(prefix, "type", old.type, new.type)]
+    out: list[OptionChange] = []
+    old_required, new_required = set(old.attrs.get("required", ())), set(new.attrs.get("required", ()))
+    for key in sorted(new_required - old_required):
+        if key in old.properties:
+            out.append(OptionChange(_join(prefix, key), "required", False, True))
+    for key in sorted(old_required - new_required):
+        if key in new.properties:
+            out.append(OptionChange(_join(prefix, key), "required", True, False))
+    if old.type == "enum" and old.attrs.get("options") != new.attrs.get("options"):
+        old_values, new_values = set(old.attrs.get("options", ())), set(new.attrs.get("options", ()))
+        out.append(OptionChange(prefix, "enum", sorted(old_values - new_values), sorted(new_values - old_values)))
+    if old.attrs.get("default") != new.attrs.get("default"):
+        out.append(OptionChange(prefix, "default", old.attrs.get("default"), new.attrs.get("default")))
+    other = {k for k in old.attrs.keys() | new.attrs.keys() if k not in ("type", "required", "options", "default")}
+    changed = sorted(k for k in other if old.attrs.get(k) != new.attrs.get(k))
+    if changed:
+        out.append(
+            OptionChange(
+                prefix, "changed", {k: old.attrs.get(k) for k in changed}, {k: new.attrs.get(k) for k in changed}
+            )
+        )
+    for key in sorted(old.properties.keys() | new.properties.keys()):
+        path = _join(prefix, key)
+        if key not in new.properties:
+            out.append(OptionChange(path, "removed", old.properties[key].type, None))
+        elif key not in old.properties:
+            out.append(
+                OptionChange(path, "added", None, {"type": new.properties[key].type, "required": key in new_required})
+            )
+        else:
+            out += diff_nodes(old.properties[key], new.properties[key], path)
+    if len(old.variants) != len(new.variants):
+        out.append(OptionChange(prefix, "changed", {"variants": len(old.variants)}, {"variants": len(new.variants)}))
+    for old_variant, new_variant in zip(old.variants, new.variants, strict=False):
+        out += diff_nodes(old_variant, new_variant, prefix)
+    if old.items is not None and new.items is not None:
+        out += diff_nodes(old.items, new.items, prefix)
+    elif old.items is not new.items:
+        out.append(OptionChange(prefix, "changed", {"items": old.items is not None}, {"items": new.items is not None}))
+    return out
+
+
+@dataclass
+class SchemaBundle:
+    """
+    The converted UI schema (`convert_config_schema_to_ui` output) of every
+    component of one ESPHome version, keyed like the schema cache
+    (`domain.platform`, `core:name`), plus each schema's root digest.
+    `complete` is False for bundles read from a schema cache, which only holds
+    what was requested; keys missing from those are not reported as removed.
+    """
+
+    esphome_version: str | None
+    converter_version: int
+    schemas: dict[str, Any]
+    complete: bool = True
+    created_at: str = ""
+    hashes: dict[str, str] = field(default_factory=dict)
+    _trees: dict[str, SchemaNode] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        for key in self.schemas:
+            if key not in self.hashes:
+                self.hashes[key] = self.tree(key).digest
+
+    def tree(self, key: str) -> SchemaNode:
+        node = self._trees.get(key)
+        if node is None:
+            node = self._trees[key] = hash_schema(self.schemas[key])
+        return node
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "format": BUNDLE_FORMAT,
+            "esphomeVersion": self.esphome_version,
+            "converterVersion": self.converter_version,
+            "complete": self.complete,
+            "createdAt": self.created_at,
+            "hashes": dict(sorted(self.hashes.items())),
+            "schemas": dict(sorted(self.schemas.items())),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> SchemaBundle:
+        if data.get("format") != BUNDLE_FORMAT:
+            raise ValueError("Unsupported schema bundle format.")
+        return cls(
+            esphome_version=data.get("esphomeVersion"),
+            converter_version=int(data.get("converterVersion", 0)),
+            schemas=dict(data["schemas"]),
+            complete=bool(data.get("complete", True)),
+            created_at=str(data.get("createdAt", "")),
+            hashes=dict(data.get("hashes", {})),
+        )
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "esphomeVersion": self.esphome_version,
+            "converterVersion": self.converter_version,
+            "complete": self.complete,
+            "createdAt": self.created_at,
+            "schemas": len(self.schemas),
+        }
+
+
+def build_bundle(
+    keys: Iterable[str],
+    load: Callable[[str], dict[str, Any] | None],
+    *,
+    esphome_version: str | None,
+    converter_version: int,
+) -> SchemaBundle:
+    """Bundle the `schema` of every payload `load(key)` returns (None or an exception skips the key)."""
+    schemas: dict[str, Any] = {}
+    for key in keys:
+        try:
+            payload = load(key)
+        except Exception:
+            continue
+        if isinstance(payload, dict) and "schema" in payload:
+            schemas[key] = payload["schema"]
+    return SchemaBundle(
+        esphome_version=esphome_version,
+        converter_version=converter_version,
+        schemas=schemas,
+        created_at=datetime.now(UTC).isoformat(),
+    )
+
+
+def write_bundle(path: Path, bundle: SchemaBundle) -> None:
+    data = json.dumps(bundle.to_json(), separators=(",", ":")).encode("utf-8")
+    write_atomic(path, gzip.compress(data, 6) if path.suffix == ".gz" else data)
+
+
+def read_bundle(path: Path, *, cache_token: str | None = None) -> SchemaBundle:
+    """
+    Load a bundle written by `write_bundle`, or build a partial one from a
+    shared schema cache (`*.sqlite3`), using its newest token unless
+    `cache_token` is given.
+    """
+    if path.suffix in (".sqlite3", ".sqlite", ".db"):
+        from .shared_cache import SharedCache
+
+        cache = SharedCache(path)
+        try:
+            token = cache_token or cache.latest_token("schema")
+            entries = cache.items("schema", token=token) if token else []
+        finally:
+            cache.close()
+        schemas: dict[str, Any] = {}
+        for key, body in entries:
+            payload = json.loads(body)
+            if isinstance(payload, dict) and "schema" in payload:
+                schemas[key] = payload["schema"]
+        return SchemaBundle(
+            esphome_version=None, converter_version=0, schemas=schemas, complete=False, created_at=f"cache:{token}"
+        )
+    raw = path.read_bytes()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    return SchemaBundle.from_json(json.loads(raw))
+
+
+@dataclass(frozen=True)
+class ComponentDiff:
+    key: str
+    status: str  # added | removed | changed
+    changes: tuple[OptionChange, ...] = ()
+
+    def to_json(self) -> dict[str, Any]:
+        return {"key": self.key, "status": self.status, "changes": [c.to_json() for c in self.changes]}
+
+
+@dataclass(frozen=True)
+class SchemaDiff:
+    old: dict[str, Any]
+    new: dict[str, Any]
+    components: tuple[ComponentDiff, ...]
+    unchanged: int
+    # Present in only one side where the other side is a partial (cache) bundle.
+    not_compared: tuple[str, ...] = ()
+
+    def get(self, key: str) -> ComponentDiff | None:
+        return next((c for c in self.components if c.key == key), None)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "old": self.old,
+            "new": self.new,
+            "unchanged": self.unchanged,
+            "changed": len(self.components),
+            "notCompared": list(self.not_compared),
+            "components": [c.to_json() for c in self.components],
+        }
+
+
+def diff_bundles(old: SchemaBundle, new: SchemaBundle) -> SchemaDiff:
+    components: list[ComponentDiff] = []
+    unchanged = 0
+    not_compared: list[str] = []
+    for key in sorted(old.schemas.keys() | new.schemas.keys()):
+        if key in old.schemas and key in new.schemas:
+            if old.hashes[key] == new.hashes[key]:
+                unchanged += 1
+                continue
+            changes = diff_nodes(old.tree(key), new.tree(key))
+            if changes:
+                components.append(ComponentDiff(key, "changed", tuple(changes)))
+            else:
+                unchanged += 1
+        elif key in old.schemas:
+            if new.complete:
+                components.append(ComponentDiff(key, "removed"))
+            else:
+                not_compared.append(key)
+        elif old.complete:
+            components.append(ComponentDiff(key, "added"))
+        else:
+            not_compared.append(key)
+    return SchemaDiff(old.summary(), new.summary(), tuple(components), unchanged, tuple(not_compared))
+
+
+def _collect_paths(value: Any, prefix: str, out: dict[str, set[str]], depth: int = 0) -> None:
+    if depth > _MAX_DEPTH:
+        return
+    if isinstance(value, dict):
+        for key, child in value.items():
+            path = _join(prefix, str(key))
+            out.setdefault(path, set())
+            _collect_paths(child, path, out, depth + 1)
+    elif isinstance(value, list):
+        # List items share their option's path, as in the UI schema (`items`).
+        for child in value:
+            _collect_paths(child, prefix, out, depth + 1)
+    elif prefix and value is not None:
+        out.setdefault(prefix, set()).add(str(value))
+
+
+def config_option_usage(data: Any) -> dict[str, dict[str, set[str]]]:
+    """Schema key (`sensor.dht`, `core:wifi`) -> option paths set in a parsed config -> scalar values."""
+    usage: dict[str, dict[str, set[str]]] = {}
+    if not isinstance(data, dict):
+        return usage
+    for name, value in data.items():
+        if not isinstance(name, str) or name in ("substitutions", "packages", "<<"):
+            continue
+        items = value if isinstance(value, list) else [value]
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("platform"), str):
+                key = f"{name}.{item['platform']}"
+            else:
+                key = f"core:{name}"
+            _collect_paths(item, "", usage.setdefault(key, {}))
+    return usage
+
+
+def _parent(path: str) -> str:
+    return path.rsplit(".", 1)[0] if "." in path else ""
+
+
+def _impact(change: OptionChange, used: dict[str, set[str]]) -> str | None:
+    """Why a config using a component with option paths `used` is affected by `change`, if it is."""
+    is_used = change.path in used or any(p.startswith(change.path + ".") for p in used) if change.path else True
+    parent_used = not _parent(change.path) or _parent(change.path) in used
+    if change.kind in ("removed", "type", "changed"):
+        return f"uses `{change.path}`" if is_used and change.path else "uses the component" if is_used else None
+    if change.kind == "enum":
+        removed = set(change.old or ()) & used.get(change.path, set())
+        return f"uses removed value(s) {', '.join(sorted(removed))} of `{change.path}`" if removed else None
+    if change.kind in ("required", "added"):
+        newly_required = change.new is True or (isinstance(change.new, dict) and change.new.get("required"))
+        if newly_required and parent_used and change.path not in used:
+            return f"does not set the now required `{change.path}`"
+        return None
+    if change.kind == "default" and change.path and parent_used and change.path not in used:
+        return f"relies on the default of `{change.path}` ({change.old!r} -> {change.new!r})"
+    return None
+
+
+def affected_configs(diff: SchemaDiff, configs: dict[str, str]) -> list[dict[str, Any]]:
+    """
+    Projects (name -> YAML) whose configs are affected by `diff`: they use a
+    removed component, set a removed/retyped option or a removed enum value,
+    lack a newly required option or rely on a changed default.
+    """
+    by_key = {c.key: c for c in diff.components}
+    out: list[dict[str, Any]] = []
+    for name in sorted(configs):
+        try:
+            usage = config_option_usage(load_esphome_yaml(configs[name]))
+        except Exception:
+            continue
+        impacts: list[dict[str, Any]] = []
+        for key in sorted(usage.keys() & by_key.keys()):
+            component = by_key[key]
+            if component.status == "removed":
+                impacts.append({"component": key, "path": "", "kind": "removed", "reason": "component was removed"})
+                continue
+            for change in component.changes:
+                reason = _impact(change, usage[key])
+                if reason is not None:
+                    impacts.append({"component": key, "path": change.path, "kind": change.kind, "reason": reason})
+        if impacts:
+            out.append({"project": name, "impacts": impacts})
+    return out
+
+
+def read_configs(projects_dir: Path) -> dict[str, str]:
+    """Every project's YAML, by name."""
+    out: dict[str, str] = {}
+    for name in list_projects(projects_dir):
+        try:
+            out[name] = read_project_yaml(projects_dir, name)
+        except (OSError, UnicodeDecodeError, NotFound):
+            continue
+    return out
+
+
+_BUNDLE_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._+-]{0,63}$")
+
+
+class SchemaBundleStore:
+    """
+    Schema bundles on disk, one `<esphome version>.json.gz` each. Loaded
+    bundles and computed diffs are kept in memory until the files change.
+    """
+
+    def __init__(self, root: Path, *, keep_diffs: int = 8) -> None:
+        self.root = root
+        self.keep_diffs = keep_diffs
+        self._lock = threading.Lock()
+        # Converting every schema takes a while; never run two snapshots at once.
+        self._busy = threading.Lock()
+        self._bundles: dict[str, tuple[int, SchemaBundle]] = {}
+        self._diffs: dict[tuple[str, int, str, int], SchemaDiff] = {}
+
+    def path(self, version: str) -> Path:
+        if not _BUNDLE_NAME_RE.match(version):
+            raise BadRequest("Invalid ESPHome version.")
+        return self.root / f"{version}.json.gz"
+
+    def versions(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name.removesuffix(".json.gz") for p in self.root.glob("*.json.gz"))
+
+    def _stamp(self, version: str) -> int:
+        try:
+            return self.path(version).stat().st_mtime_ns
+        except FileNotFoundError as e:
+            raise NotFound(f"No schema bundle for ESPHome {version}.") from e
+
+    def get(self, version: str) -> SchemaBundle:
+        stamp = self._stamp(version)
+        with self._lock:
+            cached = self._bundles.get(version)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        bundle = read_bundle(self.path(version))
+        with self._lock:
+            self._bundles[version] = (stamp, bundle)
+        return bundle
+
+    def put(self, version: str, bundle: SchemaBundle) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_bundle(self.path(version), bundle)
+
+    def _try_acquire(self) -> bool:
+        return self._busy.acquire(blocking=False)
+
+    def snapshot(self, version: str, build: Callable[[], SchemaBundle]) -> SchemaBundle:
+        """Build (blocking) and store the bundle of `version`."""
+        path = self.path(version)
+        if not self._try_acquire():
+            raise BadRequest("A schema snapshot is already being built.")
+        try:
+            bundle = build()
+            self.put(version, bundle)
+        finally:
+            self._busy.release()
+        with self._lock:
+            self._bundles[version] = (path.stat().st_mtime_ns, bundle)
+        return bundle
+
+    def list(self) -> list[dict[str, Any]]:
+        out = []
+        for version in self.versions():
+            try:
+                out.append({"version": version, **self.get(version).summary()})
+            except (OSError, ValueError, KeyError, NotFound):
+                continue
+        return out
+
+    def diff(self, old: str, new: str) -> SchemaDiff:
+        key = (old, self._stamp(old), new, self._stamp(new))
+        with self._lock:
+            cached = self._diffs.get(key)
+        if cached is not None:
+            return cached
+        result = diff_bundles(self.get(old), self.get(new))
+        with self._lock:
+            self._diffs[key] = result
+            while len(self._diffs) > self.keep_diffs:
+                self._diffs.pop(next(iter(self._diffs)))
+        return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m eve_schema_service.schema_diff")
+    sub = parser.add_subparsers(dest="command", required=True)
+    snap = sub.add_parser("snapshot", help="convert every schema of the installed ESPHome into a bundle")
+    snap.add_argument("output", type=Path, help="bundle path (.json or .json.gz)")
+    cmp_ = sub.add_parser("diff", help="diff two bundles or shared schema caches (*.sqlite3)")
+    cmp_.add_argument("old", type=Path)
+    cmp_.add_argument("new", type=Path)
+    cmp_.add_argument("--projects", type=Path, help="list the configs in this directory that are affected")
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        from .convert import CONVERTER_VERSION
+        from .esphome_introspect import build_schema_payload, esphome_version, schema_keys
+
+        bundle = build_bundle(
+            schema_keys(), build_schema_payload, esphome_version=esphome_version(), converter_version=CONVERTER_VERSION
+        )
+        write_bundle(args.output, bundle)
+        print(json.dumps(bundle.summary()))
+        return
+    diff = diff_bundles(read_bundle(args.old), read_bundle(args.new))
+    out = diff.to_json()
+    if args.projects is not None:
+        out["affected"] = affected_configs(diff, read_configs(args.projects))
+    json.dump(out, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
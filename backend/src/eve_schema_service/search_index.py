@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import re
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+# Field weights: a name hit outranks an option key, which outranks an enum value
+# or a word from the docs.
+WEIGHTS = {"name": 10.0, "option": 5.0, "enum": 2.0, "docs": 1.0}
+_PART_FACTOR = 0.5  # "interval" matching `update_interval` counts half
+_PREFIX_FACTOR = 0.5  # the last query term also matches token prefixes
+_MAX_PREFIX_TOKENS = 64
+_MAX_DEPTH = 32
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TERM_SPLIT_RE = re.compile(r"[\s,;]+")
+_STOPWORDS = frozenset("a an and are as at be by for from in is it of on or the this to with".split())
+
+
+@dataclass(frozen=True)
+class SearchMatch:
+    term: str
+    field: str
+    value: str
+
+    def to_json(self) -> dict[str, str]:
+        return {"term": self.term, "field": self.field, "value": self.value}
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    key: str
+    score: float
+    matches: tuple[SearchMatch, ...]
+
+    def to_json(self) -> dict[str, Any]:
+        out: dict[str, Any] = document_ref(self.key)
+        out["score"] = round(self.score, 3)
+        out["matches"] = [m.to_json() for m in self.matches]
+        return out
+
+
+def document_ref(key: str) -> dict[str, Any]:
+    """`sensor.dht` -> a platform, `core:wifi` -> a component (see `/api/core-schema`)."""
+    if key.startswith("core:"):
+        return {"kind": "component", "name": key[5:]}
+    domain, _, platform = key.partition(".")
+    return {"kind": "platform", "domain": domain, "platform": platform}
+
+
+@dataclass
+class _Document:
+    names: list[str] = field(default_factory=list)
+    description: str | None = None
+    options: list[str] = field(default_factory=list)
+    enums: list[str] = field(default_factory=list)
+    has_schema: bool = False
+    # The schema could not be converted, so the document will never have options.
+    unavailable: bool = False
+
+
+def _names(key: str) -> list[str]:
+    ref = document_ref(key)
+    return [ref["name"]] if ref["kind"] == "component" else [key, ref["domain"], ref["platform"]]
+
+
+def _option_paths(node: Any, prefix: str = "", depth: int = 0) -> Iterator[tuple[str, str | None]]:
+    """(option path, None) for every property and (path, value) for every enum value of a UI schema."""
+    if not isinstance(node, dict) or depth > _MAX_DEPTH:
+        return
+    props = node.get("properties")
+    if isinstance(props, dict):
+        for key, child in props.items():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            yield path, None
+            yield from _option_paths(child, path, depth + 1)
+    options = node.get("options")
+    if node.get("type") == "enum" and isinstance(options, list):
+        for opt in options:
+            if isinstance(opt, dict) and opt.get("value") is not None:
+                yield prefix, str(opt["value"])
+    elif isinstance(options, list):
+        for opt in options:
+            yield from _option_paths(opt, prefix, depth + 1)
+    yield from _option_paths(node.get("items"), prefix, depth + 1)
+
+
+def _tokens(value: str) -> list[tuple[str, float]]:
+    """The whole (lowercased) value plus its alphanumeric parts, the latter at a discount."""
+    whole = value.strip().lower()
+    if not whole:
+        return []
+    out = [(whole, 1.0)]
+    parts = _WORD_RE.findall(whole)
+    if len(parts) > 1 or (parts and parts[0] != whole):
+        out += [(p, _PART_FACTOR) for p in parts if p not in _STOPWORDS]
+    return out
+
+
+class SearchIndex:
+    """
+    Inverted index over component names, docs, option keys and enum values.
+
+    Documents are keyed like the schema cache (`domain.platform`, `core:name`).
+    Names and docstrings come from the component index; options and enum values
+    are added whenever a converted schema becomes available, replacing the
+    document's previous postings. Lookups are dictionary hits plus a bisect over
+    the sorted vocabulary for the prefix of the last term.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._docs: dict[str, _Document] = {}
+        # token -> document key -> (weight, field, matched value)
+        self._postings: dict[str, dict[str, tuple[float, str, str]]] = {}
+        self._doc_tokens: dict[str, set[str]] = {}
+        self._vocabulary: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "withSchema": sum(1 for d in self._docs.values() if d.has_schema),
+                "unavailable": sum(1 for d in self._docs.values() if d.unavailable),
+                "tokens": len(self._postings),
+            }
+
+    def complete(self) -> bool:
+        """Whether option and enum search covers every document (each has a schema or has none to offer)."""
+        with self._lock:
+            return all(d.has_schema or d.unavailable for d in self._docs.values())
+
+    def has_schema(self, key: str) -> bool:
+        doc = self._docs.get(key)
+        return doc is not None and doc.has_schema
+
+    def add_component(self, key: str, *, description: str | None = None) -> None:
+        """Index a document's names (derived from `key`) and, if known, its docstring."""
+        with self._lock:
+            doc = self._docs.setdefault(key, _Document(names=_names(key)))
+            if description and not doc.description:
+                doc.description = description
+            self._reindex(key, doc)
+
+    def mark_unavailable(self, key: str) -> None:
+        """Record that `key`'s schema cannot be converted, so its options will not be indexed."""
+        with self._lock:
+            doc = self._docs.get(key)
+            if doc is not None and not doc.has_schema:
+                doc.unavailable = True
+
+    def add_schema(self, key: str, payload: dict[str, Any]) -> None:
+        """Index the options and enum values of a converted schema (`/api/schema` payload)."""
+        options: list[str] = []
+        enums: list[str] = []
+        for path, enum_value in _option_paths(payload.get("schema")):
+            if enum_value is None:
+                options.append(path)
+            else:
+                enums.append(enum_value)
+        docs = payload.get("docs")
+        description = docs.get("description") if isinstance(docs, dict) else None
+        with self._lock:
+            doc = self._docs.setdefault(key, _Document(names=_names(key)))
+            doc.options, doc.enums, doc.has_schema, doc.unavailable = options, enums, True, False
+            if isinstance(description, str) and description.strip():
+                doc.description = description.strip()
+            self._reindex(key, doc)
+
+    def add_schema_json(self, key: str, body: bytes) -> None:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return
+        if isinstance(payload, dict):
+            self.add_schema(key, payload)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._docs.pop(key, None)
+            self._unindex(key)
+
+    def _unindex(self, key: str) -> None:
+        for token in self._doc_tokens.pop(key, ()):
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self._postings[token]
+                    self._vocabulary = None
+
+    def _reindex(self, key: str, doc: _Document) -> None:
+        self._unindex(key)
+        entries: list[tuple[str, str]] = [("name", n) for n in doc.names]
+        entries += [("option", p.rsplit(".", 1)[-1]) for p in doc.options]
+        entries += [("enum", v) for v in doc.enums]
+        if doc.description:
+            entries += [("docs", w) for w in _WORD_RE.findall(doc.description.lower()) if w not in _STOPWORDS]
+        # Report the shallowest path for an option key found at several depths.
+        labels: dict[tuple[str, str], str] = {}
+        for path in sorted(doc.options, key=lambda p: p.count(".")):
+            labels.setdefault(("option", path.rsplit(".", 1)[-1]), path)
+        best: dict[str, tuple[float, str, str]] = {}
+        for field_name, value in entries:
+            for token, factor in _tokens(value):
+                weight = WEIGHTS[field_name] * factor
+                if token not in best or best[token][0] < weight:
+                    best[token] = (weight, field_name, labels.get((field_name, value), value))
+        for token, hit in best.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                self._vocabulary = None
+            posting[key] = hit
+        self._doc_tokens[key] = set(best)
+
+    def _prefixed(self, term: str) -> list[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocab = self._vocabulary
+        out: list[str] = []
+        i = bisect.bisect_left(vocab, term)
+        while i < len(vocab) and vocab[i].startswith(term) and len(out) < _MAX_PREFIX_TOKENS:
+            if vocab[i] != term:
+                out.append(vocab[i])
+            i += 1
+        return out
+
+    def search(
+        self, query: str, *, limit: int = 20, include: Callable[[str], bool] | None = None
+    ) -> tuple[int, list[SearchHit]]:
+        """
+        Documents matching every term of `query` (whitespace/comma separated),
+        best first, as (total matches, first `limit` hits). Each term matches a
+        token exactly; the last one also matches token prefixes (type-ahead).
+        """
+        terms = [t for t in _TERM_SPLIT_RE.split(query.strip().lower()) if t]
+        if not terms:
+            return 0, []
+        scores: dict[str, float] = {}
+        # Per term: document key -> the token that scored best for it.
+        matched: list[dict[str, str]] = []
+        with self._lock:
+            n_docs = max(len(self._docs), 1)
+            for i, term in enumerate(terms):
+                tokens = [(term, 1.0)]
+                if i == len(terms) - 1:
+                    tokens += [(t, _PREFIX_FACTOR) for t in self._prefixed(term)]
+                term_best: dict[str, tuple[float, str]] = {}
+                exact = self._postings.get(term)
+                # A rare completion must not outrank the common word that was typed in full.
+                max_idf = math.log(1.0 + n_docs / len(exact)) if exact else math.inf
+                for token, factor in tokens:
+                    posting = self._postings.get(token)
+                    if not posting:
+                        continue
+                    scale = factor * min(math.log(1.0 + n_docs / len(posting)), max_idf)
+                    # After the first term only the surviving candidates need a lookup.
+                    hits = posting.items() if i == 0 else ((k, posting[k]) for k in scores if k in posting)
+                    for key, (weight, _, _) in hits:
+                        score = weight * scale
+                        prev = term_best.get(key)
+                        if prev is None or prev[0] < score:
+                            term_best[key] = (score, token)
+                scores = {k: scores.get(k, 0.0) + s for k, (s, _) in term_best.items()}
+                if not scores:
+                    return 0, []
+                matched.append({k: token for k, (_, token) in term_best.items()})
+            ranked = [k for k in scores if include is None or include(k)]
+            ranked.sort(key=lambda k: (-scores[k], k))
+            hits_out = [
+                SearchHit(
+                    k,
+                    scores[k],
+                    tuple(
+                        SearchMatch(term, *self._postings[m[k]][k][1:]) for term, m in zip(terms, matched, strict=False)
+                    ),
+                )
+                for k in ranked[: max(limit, 0)]
+            ]
+        return len(ranked), hits_out
@@ -1,73 +1,334 @@
 from __future__ import annotations
 
-import importlib.metadata
+import hashlib
+import json
+import tempfile
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response, StreamingResponse
 from starlette.routing import Mount, Route
-from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from .config import load_settings
+from . import admin, espboards, json_codec
+from .compression import CompressedBodyCache, CompressionMiddleware
+from .config import Settings, load_settings
+from .convert import CONVERTER_VERSION
 from .espboards import get_board_catalog, get_board_details
-from .esphome_introspect import discover_components, load_component_ui_schema, load_core_component_ui_schema
-from .http_errors import BadRequest, NotFound
-from .projects import list_projects, read_project_yaml, write_project_yaml
-from .validate import validate_with_esphome_cli
+from .esphome_introspect import (
+    build_component_ui_schema,
+    build_core_component_ui_schema,
+    build_schema_payload,
+    component_index,
+    dependency_graph,
+    discover_components,
+    esphome_version,
+    load_component_ui_schema,
+    load_core_component_ui_schema,
+    load_esphome_root_ui_schema,
+    schema_cache_token,
+    schema_keys,
+    use_component_index_cache,
+    warm_component_schemas,
+)
+from .http_errors import BadRequest, NotFound, PreconditionFailed, Unauthorized
+from .image_store import ImageStore, rewrite_catalog_images, rewrite_details_images
+from .memory_report import (
+    start_tracing,
+)
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import REGISTRY, MetricsMiddleware, cache_collector, lru_stats
+from .pin_index import (
+    capability_names,
+    get_pin_index,
+    parse_capabilities,
+    pin_index_status,
+    start_pin_index_build,
+)
+from .profiling import ProfileStore, ProfilingMiddleware
+from .project_events import ProjectChangeFeed
+from .project_index import ProjectIndex
+from .project_patch import apply_line_edits, apply_unified_diff, parse_line_edits
+from .projects import (
+    etag_matches,
+    project_etag,
+    project_path,
+    read_project,
+    use_write_lock_dir,
+    write_project_yaml,
+)
+from .responses import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    JSONResponse,
+    if_none_match,
+    ranged_file_response,
+)
+from .schema_diff import SchemaBundle, SchemaBundleStore, affected_configs, build_bundle, read_configs
+from .search_index import SearchIndex
+from .validate import ValidationLimits, validate_with_esphome_cli
 
-settings = load_settings()
+if TYPE_CHECKING:
+    from .project_history import HistoryStore
+    from .shared_cache import SharedCache
 
 
-async def meta(_: Request) -> JSONResponse:
-    try:
-        esphome_version = importlib.metadata.version("esphome")
-    except Exception:
-        esphome_version = None
+class _Service:
+    """
+    Settings and the stores built from them. Nothing here runs at import time
+    (uvicorn's reloader re-imports the app on every change): the lifespan calls
+    `ensure()`, and so does the first request when lifespan events are disabled.
+    """
+
+    settings: Settings
+    schema_token: str
+    image_store: ImageStore | None
+    project_index: ProjectIndex
+    shared_cache: SharedCache | None
+    profiles: ProfileStore | None
+    history: HistoryStore | None
+    validation_limits: ValidationLimits
+    schema_bundles: SchemaBundleStore
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.configured = False
+
+    def ensure(self) -> _Service:
+        if not self.configured:
+            with self._lock:
+                if not self.configured:
+                    self.configure(load_settings())
+        return self
+
+    def configure(self, settings: Settings) -> None:
+        self.settings = settings
+        json_codec.configure(settings.json_encoder)
+        # Before anything imports ESPHome, so imports can be attributed (see /api/admin/memory).
+        start_tracing(settings.memory_trace_frames)
+        self.schema_token = schema_cache_token(settings.allowlist)
+        self.image_store = ImageStore(settings.cache_dir / "images") if settings.image_proxy else None
+        self.project_index = ProjectIndex(settings.projects_dir)
+        self.project_index.add_listener(project_events.publish)
+        self.shared_cache = None
+        if settings.shared_cache:
+            from .shared_cache import SharedCache
+
+            self.shared_cache = SharedCache(settings.cache_dir / "shared-cache.sqlite3")
+            _cache_sources["shared"] = self.shared_cache.counts
+        espboards.use_shared_cache(self.shared_cache)
+        espboards.use_base_url(settings.espboards_url)
+        self.validation_limits = ValidationLimits(
+            memory_mb=settings.validate_max_memory_mb,
+            cpu_s=settings.validate_max_cpu_s,
+            open_files=settings.validate_max_open_files,
+            file_mb=settings.validate_max_file_mb,
+            nice=settings.validate_nice,
+            tmp_dir=settings.validate_tmp_dir,
+        )
+        use_component_index_cache(settings.cache_dir / "component-index.json")
+        use_write_lock_dir(settings.cache_dir / "project-locks")
+        self.schema_bundles = SchemaBundleStore(settings.cache_dir / "schema-bundles")
+        # Profiling needs both PROFILING=1 and an ADMIN_TOKEN.
+        self.profiles = (
+            ProfileStore(settings.cache_dir / "profiles") if settings.profiling and settings.admin_token else None
+        )
+        admin.configure_admin(token=settings.admin_token, profiles=self.profiles)
+        self.history = None
+        if settings.history_enabled:
+            from .project_history import HistoryStore
+
+            self.history = HistoryStore(
+                settings.cache_dir / "history.sqlite3",
+                keep=settings.history_keep,
+                max_age_s=settings.history_max_age_days * 86400 or None,
+            )
+        self.configured = True
+
+    def middleware(self, inner: ASGIApp) -> ASGIApp:
+        """Wrap `inner` in the settings-dependent middleware (innermost first)."""
+        if self.settings.compress_min_size > 0:
+            inner = CompressionMiddleware(
+                inner,
+                minimum_size=self.settings.compress_min_size,
+                cache_prefixes=(
+                    "/api/schema/",
+                    "/api/core-schema/",
+                    "/api/components",
+                    "/api/dependencies",
+                    "/api/espboards/",
+                ),
+                cache=compressed_bodies,
+            )
+        inner = CORSMiddleware(
+            inner,
+            allow_origins=self.settings.cors_origins,
+            allow_credentials=False,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+        if self.profiles is not None:
+            inner = ProfilingMiddleware(inner, store=self.profiles, token=self.settings.admin_token)
+        if self.settings.metrics:
+            inner = MetricsMiddleware(inner)
+        return inner
+
+
+svc = _Service()
+project_events = ProjectChangeFeed()
+compressed_bodies = CompressedBodyCache(32 * 1024 * 1024)
+search = SearchIndex()
+
+
+class _SearchBuild:
+    """Whether `_build_search_index` already ran in this process or in the pre-fork parent."""
+
+    done = False
+
+
+_search_build = _SearchBuild()
+admin.use_caches(compressed_bodies=compressed_bodies, search=search)
+_cache_sources: dict[str, Callable[[], tuple[int, int, int]]] = {
+    "component_schema": lru_stats(load_component_ui_schema),
+    "core_schema": lru_stats(load_core_component_ui_schema),
+    "root_schema": lru_stats(load_esphome_root_ui_schema),
+    "espboards_catalog": lambda: espboards.cache_stats()["catalog"],
+    "espboards_details": lambda: espboards.cache_stats()["details"],
+    "compressed_bodies": lambda: (compressed_bodies.hits, compressed_bodies.misses, len(compressed_bodies)),
+}
+REGISTRY.add_collector(cache_collector(_cache_sources))
 
+
+class _ServiceMiddleware:
+    """Runs every request through the middleware `_Service.middleware` builds from the settings."""
+
+    def __init__(self, app: ASGIApp) -> None:  # pylint: disable=redefined-outer-name
+        self.app = app
+        self._stack: ASGIApp | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self.app(scope, receive, send)
+            return
+        if self._stack is None:
+            self._stack = svc.ensure().middleware(self.app)
+        await self._stack(scope, receive, send)
+
+
+class _Frontend:
+    """The built frontend (STATIC_DIR), served at `/` when configured."""
+
+    def __init__(self) -> None:
+        self._files: ASGIApp | None = None
+        self._resolved = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._resolved:
+            static_dir = svc.ensure().settings.static_dir
+            if static_dir is not None and static_dir.exists():
+                from .static_assets import PrecompressedStaticFiles
+
+                self._files = PrecompressedStaticFiles(directory=str(static_dir), html=True)
+            self._resolved = True
+        if self._files is None:
+            raise HTTPException(status_code=404)
+        await self._files(scope, receive, send)
+
+
+def _schema_cache_headers(request: Request, etag: str) -> dict[str, str]:
+    # Clients that pin `?v=<schemaVersion>` (from /api/meta) may cache forever: a
+    # new ESPHome version or allowlist changes the token and thereby the URL.
+    pinned = request.query_params.get("v") == svc.schema_token
+    return {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL if pinned else REVALIDATE_CACHE_CONTROL}
+
+
+def _shared_schema_json(key: str, load: Callable[[], Any]) -> bytes:
+    """
+    Serialized schema from the cross-worker cache, converting (and publishing) it
+    on a miss. Schemas not yet in the search index are added to it.
+    """
+    body = svc.shared_cache.get("schema", key, token=svc.schema_token) if svc.shared_cache is not None else None
+    if body is None:
+        body = json_codec.dumps(load())
+        if svc.shared_cache is not None:
+            svc.shared_cache.put("schema", key, body, token=svc.schema_token)
+    if not search.has_schema(key):
+        search.add_schema_json(key, body)
+    return body
+
+
+async def meta(_: Request) -> JSONResponse:
     return JSONResponse(
         {
             "version": "0.1",
             "generatedAt": datetime.now(UTC).isoformat(),
-            "esphomeVersion": esphome_version,
+            "esphomeVersion": esphome_version(),
+            "schemaVersion": svc.schema_token,
         }
     )
 
 
-async def components(request: Request) -> JSONResponse:
+async def components(request: Request) -> Response:
     all_raw = request.query_params.get("all", "0")
-    allow_all = all_raw == "1" or settings.allowlist is None
-    allowlist = None if allow_all else settings.allowlist
+    allow_all = all_raw == "1" or svc.settings.allowlist is None
+    allowlist = None if allow_all else svc.settings.allowlist
+    variant = "all" if allow_all else "allowlist"
+    if request.query_params.get("used") == "1":
+        svc.project_index.refresh()
+        used = svc.project_index.usage.platform_components()
+        allowlist = used if allowlist is None else used & allowlist
+        variant += "-used-" + hashlib.sha256(repr(sorted(used)).encode()).hexdigest()[:12]
+    headers = _schema_cache_headers(request, f'"{svc.schema_token}-{variant}"')
+    if if_none_match(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
     comps = discover_components(limit_to=allowlist)
     return JSONResponse(
         {
             "allowlistMode": 0 if allow_all else 1,
             "components": [{"domain": c.domain, "platform": c.platform} for c in comps],
-        }
+        },
+        headers=headers,
     )
 
 
-async def schema(request: Request) -> JSONResponse:
+async def schema(request: Request) -> Response:
     domain = request.path_params["domain"]
     platform = request.path_params["platform"]
-    if settings.allowlist is not None and (domain, platform) not in settings.allowlist:
+    if svc.settings.allowlist is not None and (domain, platform) not in svc.settings.allowlist:
         return JSONResponse(
             {"detail": "Component not available (not in allowlist)."},
             status_code=404,
         )
+    headers = _schema_cache_headers(request, f'"{svc.schema_token}"')
+    if if_none_match(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
     try:
-        return JSONResponse(load_component_ui_schema(domain, platform))
+        body = _shared_schema_json(f"{domain}.{platform}", lambda: load_component_ui_schema(domain, platform))
+        return Response(body, media_type="application/json", headers=headers)
     except KeyError as e:
         return JSONResponse({"detail": str(e)}, status_code=404)
     except Exception as e:
         return JSONResponse({"detail": f"Failed to load schema: {e}"}, status_code=400)
 
 
-async def core_schema(request: Request) -> JSONResponse:
+async def core_schema(request: Request) -> Response:
     name = request.path_params["name"]
+    headers = _schema_cache_headers(request, f'"{svc.schema_token}"')
+    if if_none_match(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
     try:
-        return JSONResponse(load_core_component_ui_schema(name))
+        body = _shared_schema_json(f"core:{name}", lambda: load_core_component_ui_schema(name))
+        return Response(body, media_type="application/json", headers=headers)
     except KeyError as e:
         return JSONResponse({"detail": str(e)}, status_code=404)
     except Exception as e:
@@ -77,7 +338,10 @@ async def core_schema(request: Request) -> JSONResponse:
 async def espboards_catalog(request: Request) -> JSONResponse:
     target = request.path_params["target"]
     try:
-        return JSONResponse({"target": target, "boards": get_board_catalog(target)})
+        boards = get_board_catalog(target)
+        if svc.image_store is not None:
+            boards = rewrite_catalog_images(svc.image_store, boards)
+        return JSONResponse({"target": target, "boards": boards})
     except Exception as e:
         return JSONResponse({"detail": f"Failed to load board catalog: {e}"}, status_code=400)
 
@@ -86,23 +350,127 @@ async def espboards_board(request: Request) -> JSONResponse:
     target = request.path_params["target"]
     slug = request.path_params["slug"]
     try:
-        return JSONResponse(get_board_details(target, slug))
+        details = get_board_details(target, slug)
+        if svc.image_store is not None:
+            details = rewrite_details_images(svc.image_store, details)
+        return JSONResponse(details)
     except Exception as e:
         return JSONResponse({"detail": f"Failed to load board details: {e}"}, status_code=400)
 
 
-async def projects(_: Request) -> JSONResponse:
-    return JSONResponse({"projects": list_projects(settings.projects_dir)})
+async def espboards_image(request: Request) -> Response:
+    key = request.path_params["key"]
+    if svc.image_store is None:
+        return JSONResponse({"detail": "Image proxy disabled."}, status_code=404)
+    try:
+        img = await run_in_threadpool(svc.image_store.get, key)
+    except Exception as e:
+        return JSONResponse({"detail": f"Failed to fetch image: {e}"}, status_code=502)
+    if img is None:
+        return JSONResponse({"detail": "Image not found."}, status_code=404)
+    return ranged_file_response(request, img.path, size=img.size, media_type=img.content_type, etag=f'"{img.sha256}"')
+
+
+def _prefetch_board_images(entry: dict[str, Any], details: dict[str, Any]) -> None:
+    if svc.image_store is not None:
+        svc.image_store.prefetch([entry.get("imageUrl"), details.get("boardImageUrl"), details.get("pinoutImageUrl")])
 
 
-async def project_get(request: Request) -> JSONResponse:
+async def pins_query(request: Request) -> JSONResponse:
+    try:
+        has = parse_capabilities(request.query_params.get("has"))
+        exclude = parse_capabilities(request.query_params.get("exclude"))
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    idx = get_pin_index()
+    if idx is None:
+        return JSONResponse({"detail": "Pin index not built yet.", "status": pin_index_status()}, status_code=503)
+    started = time.perf_counter()
+    matches = idx.query(
+        has=has,
+        exclude=exclude,
+        target=request.query_params.get("target"),
+        microcontroller=request.query_params.get("microcontroller"),
+    )
+    took_us = (time.perf_counter() - started) * 1e6
+    return JSONResponse(
+        {
+            "has": capability_names(has),
+            "exclude": capability_names(exclude),
+            "tookUs": round(took_us, 1),
+            "boards": [
+                {
+                    "target": b.target,
+                    "slug": b.slug,
+                    "name": b.name,
+                    "microcontroller": b.microcontroller,
+                    "gpios": [f"GPIO{g}" for g in gpios],
+                }
+                for b, gpios in matches
+            ],
+        }
+    )
+
+
+async def pins_status(_: Request) -> JSONResponse:
+    return JSONResponse(pin_index_status())
+
+
+async def pins_rebuild(_: Request) -> JSONResponse:
+    started = start_pin_index_build(on_board=_prefetch_board_images)
+    return JSONResponse({"started": started, "status": pin_index_status()}, status_code=202)
+
+
+def _int_param(request: Request, name: str) -> int | None:
+    raw = request.query_params.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        return int(raw)
+    except ValueError as e:
+        raise BadRequest(f"{name} must be an integer.") from e
+
+
+async def projects(request: Request) -> JSONResponse:
+    try:
+        offset = _int_param(request, "offset") or 0
+        limit = _int_param(request, "limit")
+        total, page = svc.project_index.page(
+            offset=offset,
+            limit=limit,
+            sort=request.query_params.get("sort", "name"),
+            order=request.query_params.get("order", "asc"),
+        )
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse(
+        {
+            "projects": [e.name for e in page],
+            "items": [e.to_json() for e in page],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
+    )
+
+
+async def project_get(request: Request) -> Response:
     name = request.path_params["name"]
+    condition = request.headers.get("if-none-match")
     try:
-        return JSONResponse({"name": name, "yaml": read_project_yaml(settings.projects_dir, name)})
+        if condition is not None:
+            etag = project_etag(svc.settings.projects_dir, name)
+            if etag is not None and etag_matches(condition, etag, weak=True):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        proj = read_project(svc.settings.projects_dir, name)
     except NotFound as e:
         return JSONResponse({"detail": str(e)}, status_code=404)
     except BadRequest as e:
         return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse(
+        {"name": name, "yaml": proj.yaml, "etag": proj.etag},
+        headers={"ETag": proj.etag, "Cache-Control": "no-cache"},
+    )
 
 
 async def project_put(request: Request) -> JSONResponse:
@@ -110,17 +478,416 @@ async def project_put(request: Request) -> JSONResponse:
     body = await request.json()
     yaml_text = str(body.get("yaml", ""))
     try:
-        write_project_yaml(settings.projects_dir, name, yaml_text)
+        etag = write_project_yaml(
+            svc.settings.projects_dir, name, yaml_text, if_match=request.headers.get("if-match"), history=svc.history
+        )
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    except PreconditionFailed as e:
+        current = project_etag(svc.settings.projects_dir, name)
+        return JSONResponse(
+            {"detail": str(e), "etag": current},
+            status_code=412,
+            headers={"ETag": current} if current else None,
+        )
+    svc.project_index.update(name.strip())
+    return JSONResponse({"ok": True, "etag": etag}, headers={"ETag": etag})
+
+
+async def project_patch(request: Request) -> JSONResponse:
+    """
+    Apply a delta against a base revision: `{"baseEtag", "edits": [{start, end, text}]}`
+    (0-based half-open line ranges) or `{"baseEtag", "diff": "<unified diff>"}`.
+    The base may also be given as `If-Match`; a stale base is rejected with 412.
+    """
+    name = request.path_params["name"]
+    body = await request.json()
+    if not isinstance(body, dict):
+        return JSONResponse({"detail": "Body must be a JSON object."}, status_code=400)
+    base_etag = body.get("baseEtag") or request.headers.get("if-match")
+    if not isinstance(base_etag, str) or not base_etag.strip():
+        return JSONResponse({"detail": "baseEtag (or If-Match) is required."}, status_code=428)
+    if not base_etag.startswith(('"', "W/")):
+        base_etag = f'"{base_etag}"'
+    try:
+        base = read_project(svc.settings.projects_dir, name)
+        if not etag_matches(base_etag, base.etag):
+            raise PreconditionFailed("Project was modified since it was loaded.")
+        if "diff" in body:
+            new_text = apply_unified_diff(base.yaml, str(body["diff"]))
+        else:
+            new_text = apply_line_edits(base.yaml, parse_line_edits(body.get("edits")))
+        etag = write_project_yaml(svc.settings.projects_dir, name, new_text, if_match=base.etag, history=svc.history)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    except PreconditionFailed as e:
+        current = project_etag(svc.settings.projects_dir, name)
+        return JSONResponse(
+            {"detail": str(e), "etag": current},
+            status_code=412,
+            headers={"ETag": current} if current else None,
+        )
+    svc.project_index.update(name.strip())
+    return JSONResponse({"ok": True, "etag": etag}, headers={"ETag": etag})
+
+
+def _build_search_index() -> None:
+    """
+    Index every component's names and docstring (from the component index), then
+    the schemas other workers or earlier runs left in the shared cache; with
+    SEARCH_INDEX_ALL=1, convert the remaining schemas as well. Under prefork this
+    runs once in the parent and the workers inherit the index.
+    """
+    try:
+        idx = component_index()
+    except Exception:
+        return
+    for (domain, platform), manifest in idx.platforms.items():
+        search.add_component(f"{domain}.{platform}", description=manifest.description)
+    providers = {platform for _, platform in idx.platforms}
+    for name, manifest in idx.components.items():
+        # Components that only host platforms (dht -> sensor.dht) have no schema of their own.
+        if name not in providers:
+            search.add_component(f"core:{name}", description=manifest.description)
+    if svc.shared_cache is not None:
+        for key, body in svc.shared_cache.items("schema", token=svc.schema_token):
+            search.add_schema_json(key, body)
+    if svc.settings.search_index_all:
+        for domain, platform in idx.pairs():
+            key = f"{domain}.{platform}"
+            if not search.has_schema(key):
+                try:
+                    _shared_schema_json(key, lambda d=domain, p=platform: build_component_ui_schema(d, p))
+                except Exception:
+                    search.mark_unavailable(key)
+        for name in sorted(idx.components):
+            key = f"core:{name}"
+            if name not in providers and not search.has_schema(key):
+                try:
+                    _shared_schema_json(key, lambda n=name: build_core_component_ui_schema(n))
+                except Exception:
+                    search.mark_unavailable(key)
+    _search_build.done = True
+
+
+async def search_components(request: Request) -> JSONResponse:
+    query = request.query_params.get("q", "")
+    if not query.strip():
+        return JSONResponse({"detail": "q is required."}, status_code=400)
+    try:
+        limit = min(_int_param(request, "limit") or 20, 200)
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    allowlist = None if request.query_params.get("all") == "1" else svc.settings.allowlist
+    domain = request.query_params.get("domain")
+
+    def include(key: str) -> bool:
+        if key.startswith("core:"):
+            return domain is None
+        if domain is not None and not key.startswith(f"{domain}."):
+            return False
+        return allowlist is None or tuple(key.split(".", 1)) in allowlist
+
+    started = time.perf_counter()
+    total, hits = search.search(query, limit=limit, include=include)
+    took_us = (time.perf_counter() - started) * 1e6
+    return JSONResponse(
+        {
+            "query": query,
+            "total": total,
+            "tookUs": round(took_us, 1),
+            # False while option/enum postings cover only the schemas converted so far.
+            "complete": search.complete(),
+            "index": search.stats(),
+            "results": [h.to_json() for h in hits],
+        }
+    )
+
+
+def _dependency_key(raw: str) -> str:
+    # `sensor:dht` (as in the usage report) and `sensor.dht` both name a platform.
+    return raw.strip().replace(":", ".", 1)
+
+
+def _dependencies_body(keys: list[str], *, with_schemas: bool, allow_all: bool) -> bytes:
+    graph = dependency_graph()
+    closure = graph.closure(keys)
+    body = json_codec.dumps({"graph": closure.to_json(graph)})
+    if not with_schemas:
+        return body
+    parts: list[bytes] = []
+    for key in closure.reached:
+        if "." in key:
+            domain, platform = key.split(".", 1)
+            if not allow_all and (domain, platform) not in svc.settings.allowlist:
+                continue
+            cache_key, load = key, partial(load_component_ui_schema, domain, platform)
+        else:
+            cache_key, load = f"core:{key}", partial(load_core_component_ui_schema, key)
+        try:
+            schema_body = _shared_schema_json(cache_key, load)
+        except Exception:
+            # Components that only host platforms (dht) have no schema of their own.
+            schema_body = b"null"
+        parts.append(json_codec.dumps(key) + b":" + schema_body)
+    # Splice the cached schema bodies in rather than parsing and re-serializing them.
+    return body[:-1] + b',"schemas":{' + b",".join(parts) + b"}}"
+
+
+async def dependencies(request: Request) -> Response:
+    """
+    Without `components`: the whole dependency graph. With
+    `components=sensor.dht,wifi`: their transitive closure (DEPENDENCIES,
+    AUTO_LOAD and each platform's domain), conflicts among it and, unless
+    `schemas=0`, the UI schema of every component in it.
+    """
+    raw = request.query_params.get("components")
+    with_schemas = request.query_params.get("schemas", "1") != "0"
+    allow_all = request.query_params.get("all") == "1" or svc.settings.allowlist is None
+    keys = [_dependency_key(k) for k in (raw or "").split(",") if k.strip()]
+    variant = hashlib.sha256(repr((keys, with_schemas, allow_all)).encode()).hexdigest()[:12]
+    headers = _schema_cache_headers(request, f'"{svc.schema_token}-deps-{variant}"')
+    if if_none_match(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if not keys:
+        graph = await run_in_threadpool(dependency_graph)
+        return JSONResponse(graph.to_json(), headers=headers)
+    body = await run_in_threadpool(_dependencies_body, keys, with_schemas=with_schemas, allow_all=allow_all)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def usage(request: Request) -> JSONResponse:
+    svc.project_index.refresh()
+    return JSONResponse(
+        svc.project_index.usage.to_json(
+            domain=request.query_params.get("domain"),
+            platform=request.query_params.get("platform"),
+        )
+    )
+
+
+def _warm_used_schemas() -> None:
+    svc.project_index.refresh()
+    used = svc.project_index.usage.platform_components()
+    if svc.settings.allowlist is not None:
+        used &= svc.settings.allowlist
+    warm_component_schemas(used)
+
+
+def prefork_warm() -> None:
+    """
+    Import ESPHome and convert the root schema plus the schemas projects use, once,
+    in the pre-fork parent so every worker starts with them (see `prefork`).
+    """
+    svc.ensure()
+    discover_components(limit_to=svc.settings.allowlist)
+    try:
+        load_esphome_root_ui_schema()
+    except Exception:
+        pass
+    _warm_used_schemas()
+    if svc.settings.search_index_all:
+        # Convert every schema here rather than once per worker.
+        _build_search_index()
+
+
+async def projects_export(request: Request) -> Response:
+    from .project_archive import FORMATS, iter_export
+
+    fmt = request.query_params.get("format", "tar.gz")
+    if fmt not in FORMATS:
+        return JSONResponse({"detail": f"format must be one of: {', '.join(FORMATS)}"}, status_code=400)
+    filename = f"eve-projects-{datetime.now(UTC).strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        iter_export(svc.settings.projects_dir, fmt),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def projects_import(request: Request) -> JSONResponse:
+    from .project_archive import import_archive
+
+    overwrite = request.query_params.get("overwrite", "1") == "1"
+    limit = svc.settings.import_max_mb * 1024 * 1024
+    too_large = JSONResponse({"detail": f"Archive exceeds {svc.settings.import_max_mb} MB."}, status_code=413)
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        return too_large
+    # Spool the upload (memory up to 1 MiB, then disk) and extract it member by member.
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                return too_large
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            results = await run_in_threadpool(
+                import_archive, svc.settings.projects_dir, spool, overwrite=overwrite, history=svc.history
+            )
+        except BadRequest as e:
+            return JSONResponse({"detail": str(e)}, status_code=400)
+    svc.project_index.refresh(force=True)
+    written = sum(1 for r in results if r.get("status") == "written")
+    failed = sum(1 for r in results if r.get("status") == "error")
+    return JSONResponse({"written": written, "failed": failed, "results": results})
+
+
+async def project_events_stream(_: Request) -> Response:
+    return StreamingResponse(
+        project_events.stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx / HA ingress) so events arrive immediately.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _history_or_404() -> HistoryStore:
+    if svc.history is None:
+        raise NotFound("Project history is disabled.")
+    return svc.history
+
+
+async def project_history(request: Request) -> JSONResponse:
+    name = request.path_params["name"]
+    try:
+        revisions = _history_or_404().revisions(project_path(svc.settings.projects_dir, name).name)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse({"name": name, "revisions": [r.to_json() for r in revisions]})
+
+
+async def project_revision(request: Request) -> JSONResponse:
+    name = request.path_params["name"]
+    revision = request.path_params["revision"]
+    try:
+        text = _history_or_404().get(project_path(svc.settings.projects_dir, name).name, revision)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
     except BadRequest as e:
         return JSONResponse({"detail": str(e)}, status_code=400)
-    return JSONResponse({"ok": True})
+    return JSONResponse({"name": name, "revision": revision, "yaml": text})
+
+
+async def project_revision_diff(request: Request) -> JSONResponse:
+    name = request.path_params["name"]
+    try:
+        from_id = _int_param(request, "from")
+        to_id = _int_param(request, "to")
+        if from_id is None or to_id is None:
+            raise BadRequest("from and to revision ids are required.")
+        diff = _history_or_404().diff(project_path(svc.settings.projects_dir, name).name, from_id, to_id)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse({"name": name, "from": from_id, "to": to_id, "diff": diff})
+
+
+async def history_stats(_: Request) -> JSONResponse:
+    try:
+        return JSONResponse(_history_or_404().stats())
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+
+
+async def history_gc(_: Request) -> JSONResponse:
+    try:
+        store = _history_or_404()
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    removed = await run_in_threadpool(store.gc)
+    return JSONResponse({"removedChunks": removed, "stats": store.stats()})
+
+
+async def metrics(_: Request) -> Response:
+    if not svc.settings.metrics:
+        return JSONResponse({"detail": "Metrics are disabled."}, status_code=404)
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE, headers={"Cache-Control": "no-store"})
+
+
+def _snapshot_bundle() -> SchemaBundle:
+    # Through the shared cache: schemas other workers already converted are reused.
+    # Converted without the in-memory caches, which would otherwise keep every schema.
+    return build_bundle(
+        schema_keys(),
+        lambda key: json.loads(_shared_schema_json(key, partial(build_schema_payload, key))),
+        esphome_version=esphome_version(),
+        converter_version=CONVERTER_VERSION,
+    )
+
+
+async def schema_bundles(_: Request) -> JSONResponse:
+    bundles = await run_in_threadpool(svc.schema_bundles.list)
+    return JSONResponse({"current": esphome_version(), "bundles": bundles})
+
+
+async def schema_bundle_snapshot(request: Request) -> JSONResponse:
+    """Convert every schema of the installed ESPHome and store them as its bundle (admin only)."""
+    try:
+        admin.require_admin(request)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    except Unauthorized as e:
+        return JSONResponse({"detail": str(e)}, status_code=401)
+    version = esphome_version()
+    if version is None:
+        return JSONResponse({"detail": "ESPHome is not installed."}, status_code=404)
+    try:
+        bundle = await run_in_threadpool(svc.schema_bundles.snapshot, version, _snapshot_bundle)
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return JSONResponse({"version": version, **bundle.summary()}, status_code=201)
+
+
+async def schema_diff(request: Request) -> JSONResponse:
+    """
+    Structural diff of the UI schemas of two stored bundles (`from`, and `to`
+    defaulting to the installed ESPHome), with the projects it affects unless
+    `projects=0`.
+    """
+    old = request.query_params.get("from")
+    new = request.query_params.get("to") or esphome_version()
+    if not old or not new:
+        return JSONResponse({"detail": "from is required."}, status_code=400)
+    try:
+        diff = await run_in_threadpool(svc.schema_bundles.diff, old, new)
+    except BadRequest as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    except NotFound as e:
+        return JSONResponse({"detail": str(e)}, status_code=404)
+    out = {"from": old, "to": new, **diff.to_json()}
+    if request.query_params.get("projects") != "0":
+        configs = await run_in_threadpool(read_configs, svc.settings.projects_dir)
+        out["affected"] = await run_in_threadpool(affected_configs, diff, configs)
+    return JSONResponse(out)
 
 
 async def validate(request: Request) -> JSONResponse:
     body = await request.json()
     yaml_text = str(body.get("yaml", ""))
-    res = validate_with_esphome_cli(yaml_text)
-    return JSONResponse({"ok": res.ok, "stdout": res.stdout, "stderr": res.stderr, "returncode": res.returncode})
+    res = await run_in_threadpool(validate_with_esphome_cli, yaml_text, limits=svc.validation_limits)
+    return JSONResponse(
+        {
+            "ok": res.ok,
+            "stdout": res.stdout,
+            "stderr": res.stderr,
+            "returncode": res.returncode,
+            "resources": {
+                "wallSeconds": round(res.wall_seconds, 3),
+                "cpuSeconds": None if res.cpu_seconds is None else round(res.cpu_seconds, 3),
+                "peakRssBytes": res.peak_rss_bytes,
+                "limitExceeded": res.limit_exceeded,
+                "limits": svc.validation_limits.to_json(),
+            },
+        }
+    )
 
 
 routes = [
@@ -128,22 +895,77 @@ routes = [
     Route("/api/components", components, methods=["GET"]),
     Route("/api/schema/{domain:str}/{platform:str}", schema, methods=["GET"]),
     Route("/api/core-schema/{name:str}", core_schema, methods=["GET"]),
+    Route("/api/espboards/img/{key:str}", espboards_image, methods=["GET"]),
     Route("/api/espboards/{target:str}", espboards_catalog, methods=["GET"]),
     Route("/api/espboards/{target:str}/{slug:str}", espboards_board, methods=["GET"]),
+    Route("/api/pins", pins_query, methods=["GET"]),
+    Route("/api/pins/status", pins_status, methods=["GET"]),
+    Route("/api/pins/rebuild", pins_rebuild, methods=["POST"]),
     Route("/api/projects", projects, methods=["GET"]),
     Route("/api/projects/{name:str}", project_get, methods=["GET"]),
     Route("/api/projects/{name:str}", project_put, methods=["PUT"]),
+    Route("/api/projects/{name:str}", project_patch, methods=["PATCH"]),
+    Route("/api/projects/{name:str}/history", project_history, methods=["GET"]),
+    Route("/api/projects/{name:str}/history/diff", project_revision_diff, methods=["GET"]),
+    Route("/api/projects/{name:str}/history/{revision:int}", project_revision, methods=["GET"]),
+    Route("/api/projects-archive", projects_export, methods=["GET"]),
+    Route("/api/projects-archive", projects_import, methods=["POST"]),
+    Route("/api/project-events", project_events_stream, methods=["GET"]),
+    Route("/api/usage", usage, methods=["GET"]),
+    Route("/api/search", search_components, methods=["GET"]),
+    Route("/api/dependencies", dependencies, methods=["GET"]),
+    Route("/api/schema-bundles", schema_bundles, methods=["GET"]),
+    Route("/api/schema-bundles", schema_bundle_snapshot, methods=["POST"]),
+    Route("/api/schema-diff", schema_diff, methods=["GET"]),
+    Route("/api/history/stats", history_stats, methods=["GET"]),
+    Route("/api/history/gc", history_gc, methods=["POST"]),
     Route("/api/validate", validate, methods=["POST"]),
+    Route("/metrics", metrics, methods=["GET"]),
+    Route("/api/admin/memory", admin.memory, methods=["GET"]),
+    Route("/api/admin/memory/drop-caches", admin.memory_drop_caches, methods=["POST"]),
+    Route("/api/admin/profiles", admin.profiles_list, methods=["GET"]),
+    Route("/api/admin/profiles", admin.profiles_capture, methods=["POST"]),
+    Route("/api/admin/profiles/{profile_id:str}", admin.profile_download, methods=["GET"]),
+    Mount("/", app=_Frontend(), name="static"),
 ]
 
-if settings.static_dir is not None and settings.static_dir.exists():
-    routes.append(Mount("/", app=StaticFiles(directory=str(settings.static_dir), html=True), name="static"))
 
-app = Starlette(routes=routes)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(_: Starlette) -> AsyncIterator[None]:
+    settings = svc.ensure().settings
+    try:
+        settings.projects_dir.mkdir(parents=True, exist_ok=True)
+    except Exception:
+        # If the directory is not writable/mapped, endpoints will surface errors.
+        pass
+    if svc.shared_cache is not None:
+        try:
+            svc.shared_cache.prune("schema", token=svc.schema_token)
+        except Exception:
+            pass
+    if settings.pin_index_on_startup:
+        start_pin_index_build(on_board=_prefetch_board_images)
+    svc.project_index.start_watching(settings.projects_poll_interval_s)
+    if settings.static_precompress and settings.static_dir is not None and settings.static_dir.exists():
+        from .static_assets import precompress_directory
+
+        threading.Thread(
+            target=precompress_directory, args=(settings.static_dir,), name="eve-static-precompress", daemon=True
+        ).start()
+    if not _search_build.done:
+        threading.Thread(target=_build_search_index, name="eve-search-index", daemon=True).start()
+    if settings.warm_used_schemas:
+        threading.Thread(target=_warm_used_schemas, name="eve-schema-warmup", daemon=True).start()
+    try:
+        yield
+    finally:
+        svc.project_index.stop_watching()
+        project_events.close()
+        if svc.history is not None:
+            svc.history.close()
+        if svc.shared_cache is not None:
+            svc.shared_cache.close()
+
+
+app = Starlette(routes=routes, lifespan=lifespan)
+app.add_middleware(_ServiceMiddleware)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    token TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+
+class SharedCache:
+    """
+    Cross-process cache for derived data (converted schemas as JSON, board data).
+
+    One SQLite database in WAL mode: readers never block each other or the writer,
+    so every uvicorn worker (and the next process after a restart) reads what any
+    of them computed. Entries are valid for one `token` (e.g. the schema cache
+    token) and/or a maximum age. Connections are opened lazily per process, so
+    the object can be created before forking workers.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._pid = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Let readers map the database instead of copying pages into the page cache.
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def get(self, namespace: str, key: str, *, token: str = "", max_age_s: float | None = None) -> bytes | None:
+        try:
+            with self._lock:
+                row = (
+                    self._db()
+                    .execute(
+                        "SELECT token, created_at, value FROM entries WHERE namespace = ? AND key = ?",
+                        (namespace, key),
+                    )
+                    .fetchone()
+                )
+        except sqlite3.Error:
+            row = None
+        if row is None or row[0] != token or (max_age_s is not None and time.time() - row[1] > max_age_s):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return bytes(row[2])
+
+    def put(self, namespace: str, key: str, value: bytes, *, token: str = "") -> None:
+        try:
+            with self._lock:
+                self._db().execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, token, created_at, value) VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, token, time.time(), value),
+                )
+        except sqlite3.Error:
+            # Best effort: a locked or read-only cache must not fail the request.
+            pass
+
+    def prune(self, namespace: str, *, token: str | None = None, max_age_s: float | None = None) -> int:
+        """Drop entries of `namespace` built for another token or older than `max_age_s`."""
+        removed = 0
+        with self._lock:
+            db = self._db()
+            if token is not None:
+                removed += db.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND token <> ?", (namespace, token)
+                ).rowcount
+            if max_age_s is not None:
+                removed += db.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND created_at < ?", (namespace, time.time() - max_age_s)
+                ).rowcount
+        return removed
+
+    def items(self, namespace: str, *, token: str = "") -> list[tuple[str, bytes]]:
+        """All (key, value) pairs of `namespace` built for `token`."""
+        try:
+            with self._lock:
+                rows = (
+                    self._db()
+                    .execute("SELECT key, value FROM entries WHERE namespace = ? AND token = ?", (namespace, token))
+                    .fetchall()
+                )
+        except sqlite3.Error:
+            return []
+        return [(str(key), bytes(value)) for key, value in rows]
+
+    def latest_token(self, namespace: str) -> str | None:
+        """Token of the most recently written entry of `namespace`."""
+        try:
+            with self._lock:
+                row = (
+                    self._db()
+                    .execute(
+                        "SELECT token FROM entries WHERE namespace = ? ORDER BY created_at DESC LIMIT 1", (namespace,)
+                    )
+                    .fetchone()
+                )
+        except sqlite3.Error:
+            return None
+        return None if row is None else str(row[0])
+
+    def entry_count(self) -> int:
+        try:
+            with self._lock:
+                return int(self._db().execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+        except sqlite3.Error:
+            return 0
+
+    def counts(self) -> tuple[int, int, int]:
+        """(hits, misses, entries) of this process, as reported by /metrics."""
+        return self.hits, self.misses, self.entry_count()
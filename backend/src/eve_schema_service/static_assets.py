@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import re
+import sys
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+from .compression import brotli, negotiate_encoding
+from .fsutil import write_atomic
+from .responses import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+
+# Rollup output names carrying a content hash: `assets/chunk-[hash].js`, `assets/[name]-[hash][extname]`.
+_FINGERPRINTED_RE = re.compile(r"(?:^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+(?:\.map)?$")
+_PRECOMPRESS_SUFFIXES = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".ttf", ".eot", ".wasm"}
+_PRECOMPRESS_MIN_BYTES = 1024
+_SIBLINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def is_fingerprinted(path: str) -> bool:
+    return _FINGERPRINTED_RE.search(path.replace(os.sep, "/")) is not None
+
+
+def precompress_directory(root: Path) -> int:
+    """
+    Write `.br`/`.gz` siblings for compressible files under `root` that lack an
+    up-to-date one (siblings take the source mtime). Returns how many were written.
+    """
+    written = 0
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            src = Path(dirpath) / filename
+            if src.suffix not in _PRECOMPRESS_SUFFIXES:
+                continue
+            try:
+                st = src.stat()
+                if st.st_size < _PRECOMPRESS_MIN_BYTES:
+                    continue
+                data: bytes | None = None
+                for encoding, suffix in _SIBLINGS.items():
+                    if encoding == "br" and brotli is None:
+                        continue
+                    dst = src.with_name(src.name + suffix)
+                    if _sibling_fresh(dst, st):
+                        continue
+                    data = src.read_bytes() if data is None else data
+                    if encoding == "br":
+                        packed = brotli.compress(data, quality=11)
+                    else:
+                        packed = gzip.compress(data, compresslevel=9, mtime=0)
+                    if len(packed) >= len(data):
+                        continue
+                    write_atomic(dst, packed, mode=0o644)
+                    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+                    written += 1
+            except OSError:
+                # Read-only or vanished file: serve it uncompressed.
+                continue
+    return written
+
+
+def _sibling_fresh(sibling: Path, source: os.stat_result) -> bool:
+    try:
+        return sibling.stat().st_mtime_ns >= source.st_mtime_ns
+    except OSError:
+        return False
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    `StaticFiles` that serves `.br`/`.gz` siblings when the client accepts them,
+    marks fingerprinted build assets immutable and keeps everything else (index.html,
+    the `assets/app.js` entry) revalidated via ETag/Last-Modified.
+    """
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = os.fspath(full_path)
+        rel = os.path.relpath(path, self.directory) if self.directory is not None else path
+        cache_control = IMMUTABLE_CACHE_CONTROL if is_fingerprinted(rel) else REVALIDATE_CACHE_CONTROL
+        response: Response | None = None
+        if Path(path).suffix in _PRECOMPRESS_SUFFIXES:
+            accept = request_headers.get("accept-encoding")
+            preferred = negotiate_encoding(accept)
+            candidates = [preferred] if preferred else []
+            if preferred == "br" and negotiate_encoding(accept, brotli_available=False) == "gzip":
+                candidates.append("gzip")
+            for encoding in candidates:
+                sibling = path + _SIBLINGS[encoding]
+                try:
+                    sibling_stat = os.stat(sibling)
+                except OSError:
+                    continue
+                if sibling_stat.st_mtime_ns < stat_result.st_mtime_ns:
+                    continue
+                response = FileResponse(
+                    sibling,
+                    status_code=status_code,
+                    stat_result=sibling_stat,
+                    media_type=mimetypes.guess_type(path)[0] or "text/plain",
+                    headers={"Content-Encoding": encoding},
+                )
+                break
+            if response is None:
+                response = FileResponse(path, status_code=status_code, stat_result=stat_result)
+            response.headers.add_vary_header("Accept-Encoding")
+        else:
+            response = FileResponse(path, status_code=status_code, stat_result=stat_result)
+        response.headers["Cache-Control"] = cache_control
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    # Build-time use: `python -m eve_schema_service.static_assets <dist dir>`.
+    for arg in sys.argv[1:]:
+        print(f"{arg}: {precompress_directory(Path(arg))} precompressed files written")
@@ -1,10 +1,71 @@
 from __future__ import annotations
 
+import json
+import os
 import re
+import signal
 import subprocess
 import sys
 import tempfile
+import time
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .metrics import VALIDATION_CPU, VALIDATION_DURATION, VALIDATION_LIMIT_EXCEEDED, VALIDATION_PEAK_RSS
+from .profiling import span
+
+try:
+    import resource
+except ImportError:  # not POSIX: run without rlimits or usage reporting
+    resource = None  # type: ignore[assignment]
+
+
+@dataclass(frozen=True)
+class ValidationLimits:
+    """
+    Per-run limits of the `esphome config` subprocess (0 disables a limit).
+    `tmp_dir` is where the config is written and the process runs; by default
+    `/dev/shm`, a tmpfs that containers cap at 64 MB.
+    """
+
+    memory_mb: int = 1024  # address space (RLIMIT_AS)
+    cpu_s: int = 60  # CPU seconds (RLIMIT_CPU)
+    open_files: int = 256  # RLIMIT_NOFILE
+    file_mb: int = 64  # largest file the process may write (RLIMIT_FSIZE)
+    nice: int = 10  # added to the scheduling niceness
+    tmp_dir: Path | None = None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "memoryMb": self.memory_mb,
+            "cpuSeconds": self.cpu_s,
+            "openFiles": self.open_files,
+            "fileMb": self.file_mb,
+            "nice": self.nice,
+        }
+
+    def work_root(self) -> str | None:
+        if self.tmp_dir is not None:
+            return str(self.tmp_dir)
+        shm = "/dev/shm"
+        return shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else None
+
+    def command(self, *args: str) -> list[str]:
+        """`python -m esphome *args`, started through a launcher that applies the limits first."""
+        if resource is None:
+            return [sys.executable, "-m", "esphome", *args]
+        rlimits: list[tuple[str, int, int]] = []
+        if self.memory_mb > 0:
+            rlimits.append(("RLIMIT_AS", self.memory_mb << 20, self.memory_mb << 20))
+        if self.cpu_s > 0:
+            # SIGXCPU at the soft limit, SIGKILL one second later.
+            rlimits.append(("RLIMIT_CPU", self.cpu_s, self.cpu_s + 1))
+        if self.open_files > 0:
+            rlimits.append(("RLIMIT_NOFILE", self.open_files, self.open_files))
+        if self.file_mb > 0:
+            rlimits.append(("RLIMIT_FSIZE", self.file_mb << 20, self.file_mb << 20))
+        return [sys.executable, "-c", _LAUNCHER, json.dumps(rlimits), str(max(self.nice, 0)), *args]
 
 
 @dataclass(frozen=True)
@@ -13,13 +74,72 @@ class ValidationResult:
     stdout: str
     stderr: str
     returncode: int
+    wall_seconds: float = 0.0
+    cpu_seconds: float | None = None
+    peak_rss_bytes: int | None = None
+    # "timeout", "cpu", "memory" or "file_size" when a limit stopped the run.
+    limit_exceeded: str | None = None
 
 
 _SECRET_RE = re.compile(r"!secret\s+([A-Za-z0-9_.-]+)")
 
+# Applies the limits inside the child and then runs ESPHome like `python -m
+# esphome` would, instead of a preexec_fn (unsafe while the server runs threads).
+_LAUNCHER = """
+import json, os, resource, runpy, sys
+for name, soft, hard in json.loads(sys.argv[1]):
+    resource.setrlimit(getattr(resource, name), (soft, hard))
+if int(sys.argv[2]):
+    os.nice(int(sys.argv[2]))
+sys.argv = ["esphome", *sys.argv[3:]]
+runpy.run_module("esphome", run_name="__main__", alter_sys=True)
+"""
+
+
+def _wait(proc: subprocess.Popen[bytes], timeout_s: float) -> tuple[Any, bool]:
+    """Reap `proc` with its resource usage (None where wait4 is unavailable); kill it after `timeout_s`."""
+    if not hasattr(os, "wait4"):
+        try:
+            proc.wait(timeout=timeout_s)
+            return None, False
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            return None, True
+    deadline = time.monotonic() + timeout_s
+    delay = 0.005
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return usage, False
+        if time.monotonic() >= deadline:
+            # Not reaped yet, so the pid is still ours (Popen.kill would poll and reap it).
+            os.kill(proc.pid, signal.SIGKILL)
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return usage, True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
 
-def validate_with_esphome_cli(yaml_text: str, timeout_s: int = 30) -> ValidationResult:
-    with tempfile.TemporaryDirectory(prefix="eve-") as tmpdir:
+def _limit_exceeded(returncode: int, stderr: str, cpu_s: float | None, limits: ValidationLimits) -> str | None:
+    if returncode == -signal.SIGXCPU or (
+        returncode == -signal.SIGKILL and limits.cpu_s > 0 and cpu_s is not None and cpu_s >= limits.cpu_s
+    ):
+        return "cpu"
+    if returncode == -signal.SIGXFSZ or "File too large" in stderr:
+        return "file_size"
+    if limits.memory_mb > 0 and ("MemoryError" in stderr or "Cannot allocate memory" in stderr):
+        return "memory"
+    return None
+
+
+def validate_with_esphome_cli(
+    yaml_text: str, timeout_s: float = 30, limits: ValidationLimits | None = None
+) -> ValidationResult:
+    limits = limits or ValidationLimits()
+    with tempfile.TemporaryDirectory(prefix="eve-", dir=limits.work_root()) as tmpdir:
         config_path = f"{tmpdir}/config.yaml"
         with open(config_path, "w", encoding="utf-8") as f:
             f.write(yaml_text or "")
@@ -31,16 +151,47 @@ def validate_with_esphome_cli(yaml_text: str, timeout_s: int = 30) -> Validation
                 for k in secret_keys:
                     f.write(f'{k}: "__eve_dummy__"\n')
 
-        proc = subprocess.run(
-            [sys.executable, "-m", "esphome", "config", config_path],
-            text=True,
-            capture_output=True,
-            timeout=timeout_s,
-            check=False,
-        )
-        return ValidationResult(
-            ok=proc.returncode == 0,
-            stdout=proc.stdout,
-            stderr=proc.stderr,
-            returncode=proc.returncode,
-        )
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            with (
+                span("validate_with_esphome_cli"),
+                open(f"{tmpdir}/.stdout", "w+b") as out,
+                open(f"{tmpdir}/.stderr", "w+b") as err,
+            ):
+                # Output goes to files rather than pipes so the child can be reaped
+                # with wait4 (per-process peak RSS and CPU time) without a reader thread.
+                proc = subprocess.Popen(  # pylint: disable=consider-using-with
+                    limits.command("config", config_path), stdout=out, stderr=err, cwd=tmpdir
+                )
+                usage, timed_out = _wait(proc, timeout_s)
+                outcome = "timeout" if timed_out else "ok" if proc.returncode == 0 else "invalid"
+                out.seek(0)
+                err.seek(0)
+                stdout = out.read().decode("utf-8", errors="replace")
+                stderr = err.read().decode("utf-8", errors="replace")
+        finally:
+            wall_s = time.perf_counter() - start
+            VALIDATION_DURATION.observe(wall_s, outcome=outcome)
+
+    returncode = int(proc.returncode)
+    cpu_s = usage.ru_utime + usage.ru_stime if usage is not None else None
+    # ru_maxrss is in KiB on Linux.
+    peak_rss = int(usage.ru_maxrss) * 1024 if usage is not None else None
+    limit = "timeout" if timed_out else _limit_exceeded(returncode, stderr, cpu_s, limits)
+    if cpu_s is not None:
+        VALIDATION_CPU.observe(cpu_s)
+    if peak_rss is not None:
+        VALIDATION_PEAK_RSS.observe(peak_rss)
+    if limit is not None:
+        VALIDATION_LIMIT_EXCEEDED.inc(limit=limit)
+    return ValidationResult(
+        ok=returncode == 0,
+        stdout=stdout,
+        stderr=stderr,
+        returncode=returncode,
+        wall_seconds=wall_s,
+        cpu_seconds=cpu_s,
+        peak_rss_bytes=peak_rss,
+        limit_exceeded=limit,
+    )
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from eve_schema_service import component_index
+from eve_schema_service.component_index import Manifest, load_component_index
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _tree(tmp_path: Path) -> Path:
+    _write(tmp_path / "const.py", 'PLATFORM_ESP32 = "esp32"\n')
+    root = tmp_path / "components"
+    _write(root / "sensor" / "__init__.py", 'IS_PLATFORM_COMPONENT = True\nCODEOWNERS = ["@esphome/core"]\n')
+    _write(root / "switch" / "__init__.py", "IS_PLATFORM_COMPONENT = True\n")
+    _write(root / "i2c" / "__init__.py", "CODEOWNERS = ['@a']\n")
+    _write(
+        root / "dht" / "__init__.py",
+        "from esphome.const import PLATFORM_ESP32\nDEPENDENCIES = [PLATFORM_ESP32]\n\ndef AUTO_LOAD(config):\n    return []\n",
+    )
+    _write(root / "dht" / "sensor.py", 'DEPENDENCIES = ["i2c"]\nAUTO_LOAD: list[str] = ["sensor"]\n')
+    _write(root / "gpio" / "switch" / "__init__.py", "")
+    _write(root / "gpio" / "sensor" / "readme.txt", "not a package")
+    _write(root / "__pycache__" / "sensor.py", "")
+    return root
+
+
+def test_index_walks_tree_once_and_reads_manifests(tmp_path: Path) -> None:
+    index = component_index.build_component_index(_tree(tmp_path), version="2026.1.0")
+    assert index.domains == {"sensor", "switch"}
+    assert index.pairs() == [("sensor", "dht"), ("switch", "gpio")]
+    assert index.components["dht"] == Manifest(dependencies=("esp32",), dynamic=("AUTO_LOAD",))
+    assert index.components["sensor"].codeowners == ("@esphome/core",)
+    assert index.platforms[("sensor", "dht")] == Manifest(dependencies=("i2c",), auto_load=("sensor",))
+
+
+def test_index_is_persisted_and_invalidated_by_mtime(tmp_path: Path, monkeypatch) -> None:
+    root = _tree(tmp_path)
+    cache = tmp_path / "cache" / "component-index.json"
+    first = load_component_index(root, version="2026.1.0", cache_path=cache)
+    assert cache.exists()
+
+    def fail(*_args):
+        raise AssertionError("index should come from the cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(component_index, "_build", fail)
+        assert load_component_index(root, version="2026.1.0", cache_path=cache) == first
+
+    assert load_component_index(root, version="2026.2.0", cache_path=cache).fingerprint != first.fingerprint
+
+    _write(root / "gpio" / "sensor.py", "")
+    st = (root / "gpio").stat()
+    os.utime(root / "gpio", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert ("sensor", "gpio") in load_component_index(root, version="2026.2.0", cache_path=cache).pairs()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from eve_schema_service.compression import CompressionMiddleware, negotiate_encoding, strip_encoded_etags
+from eve_schema_service.json_codec import configure, dumps
+from eve_schema_service.metrics import REGISTRY, MetricsMiddleware
+from eve_schema_service.responses import JSONResponse, if_none_match
+
+
+def test_negotiate_encoding() -> None:
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("gzip, br", brotli_available=True) == "br"
+    assert negotiate_encoding("gzip, br", brotli_available=False) == "gzip"
+    assert negotiate_encoding("br;q=0.5, gzip", brotli_available=True) == "gzip"
+    assert negotiate_encoding("identity, gzip;q=0") is None
+
+
+def test_json_codecs_agree() -> None:
+    payload = {"b": [1, 2.5, None, True], "a": "ü", "s": frozenset({"y", "x"})}
+    try:
+        outputs = {configure(name): dumps(payload) for name in ("stdlib", "auto")}
+    finally:
+        configure("auto")
+    assert outputs["stdlib"] == b'{"b":[1,2.5,null,true],"a":"\xc3\xbc","s":["x","y"]}'
+    assert len(set(outputs.values())) == 1
+
+
+def test_compression_middleware_caches_bodies() -> None:
+    big = {"items": [{"key": f"value-{i}"} for i in range(500)]}
+
+    async def schema(_: Request) -> JSONResponse:
+        return JSONResponse(big)
+
+    async def small(_: Request) -> JSONResponse:
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[Route("/api/schema/x", schema), Route("/api/small", small)])
+    middleware = CompressionMiddleware(app, minimum_size=512, cache_prefixes=("/api/schema/",))
+    client = TestClient(middleware)
+
+    for _ in range(3):
+        res = client.get("/api/schema/x", headers={"Accept-Encoding": "gzip"})
+        assert res.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in res.headers["vary"].lower()
+        assert res.json() == big
+    assert middleware.cache.stats()["hits"] == 2
+    assert middleware.cache.stats()["entries"] == 1
+
+    res = client.get("/api/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+    res = client.get("/api/schema/x", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in res.headers
+
+
+def test_compressed_responses_get_their_own_etag() -> None:
+    big = {"items": [{"key": f"value-{i}"} for i in range(500)]}
+    seen: list[str | None] = []
+
+    async def schema(request: Request) -> Response:
+        seen.append(request.headers.get("if-none-match"))
+        if if_none_match(request, '"abc"'):
+            return Response(status_code=304, headers={"ETag": '"abc"'})
+        return JSONResponse(big, headers={"ETag": '"abc"'})
+
+    client = TestClient(CompressionMiddleware(Starlette(routes=[Route("/api/schema/x", schema)]), minimum_size=512))
+
+    gz = client.get("/api/schema/x", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/schema/x", headers={"Accept-Encoding": "identity"})
+    assert gz.headers["etag"] == '"abc-gzip"'
+    assert plain.headers["etag"] == '"abc"'
+    for res in (gz, plain):
+        assert "accept-encoding" in res.headers["vary"].lower()
+
+    res = client.get("/api/schema/x", headers={"Accept-Encoding": "gzip", "If-None-Match": '"abc-gzip"'})
+    assert res.status_code == 304
+    assert res.headers["etag"] == '"abc-gzip"'
+    assert "accept-encoding" in res.headers["vary"].lower()
+    assert seen[-1] == '"abc"'
+    res = client.get("/api/schema/x", headers={"Accept-Encoding": "gzip", "If-None-Match": '"abc"'})
+    assert res.status_code == 304
+    assert res.headers["etag"] == '"abc"'
+
+
+def test_strip_encoded_etags() -> None:
+    assert strip_encoded_etags('"a-gzip", W/"b-br", "c"') == ('"a", W/"b", "c"', {"gzip", "br"})
+    assert strip_encoded_etags("*") == ("*", set())
+
+
+def test_conditional_requests_keep_their_route_label() -> None:
+    async def conditional_schema(request: Request) -> Response:
+        if if_none_match(request, '"abc"'):
+            return Response(status_code=304, headers={"ETag": '"abc"'})
+        return JSONResponse({"items": list(range(500))}, headers={"ETag": '"abc"'})
+
+    inner = CompressionMiddleware(Starlette(routes=[Route("/api/schema/x", conditional_schema)]), minimum_size=512)
+    client = TestClient(MetricsMiddleware(inner))
+    headers = {"Accept-Encoding": "gzip"}
+    assert client.get("/api/schema/x", headers={**headers, "If-None-Match": '"abc-gzip"'}).status_code == 304
+    assert client.get("/api/schema/x", headers={**headers, "If-None-Match": '"other"'}).status_code == 200
+    text = REGISTRY.render()
+    for status in ("304", "200"):
+        assert f'route="conditional_schema",status="{status}"' in text
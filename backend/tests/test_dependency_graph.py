@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from eve_schema_service.component_index import ComponentIndex, Manifest
+from eve_schema_service.dependency_graph import DependencyGraph
+
+
+def _graph(resolve=None) -> DependencyGraph:
+    index = ComponentIndex(
+        fingerprint="x",
+        domains=frozenset({"sensor"}),
+        components={
+            "sensor": Manifest(),
+            "i2c": Manifest(),
+            "network": Manifest(auto_load=("mdns",)),
+            "mdns": Manifest(dependencies=("network",)),
+            "wifi": Manifest(auto_load=("network",)),
+            "ethernet": Manifest(auto_load=("network",), conflicts_with=("wifi",)),
+            "api": Manifest(dependencies=("network",), dynamic=("AUTO_LOAD",)),
+        },
+        platforms={("sensor", "bme280"): Manifest(dependencies=("i2c", "missing_bus"))},
+    )
+    return DependencyGraph.from_index(index, resolve=resolve)
+
+
+def test_closure_follows_domain_dependency_and_auto_load_edges() -> None:
+    closure = _graph().closure(["sensor.bme280", "wifi"])
+    assert list(closure.reached) == ["sensor.bme280", "wifi", "sensor", "i2c", "network", "mdns"]
+    assert closure.reached["sensor"] == [("domain", "sensor.bme280")]
+    assert closure.reached["network"] == [("auto_load", "wifi"), ("dependency", "mdns")]
+    assert closure.missing == ["missing_bus"]
+    assert closure.conflicts == []
+
+
+def test_closure_reports_conflicts_once() -> None:
+    closure = _graph().closure(["ethernet", "wifi", "ethernet"])
+    assert closure.requested == ["ethernet", "wifi"]
+    assert closure.conflicts == [("ethernet", "wifi")]
+
+
+def test_dynamic_manifests_are_resolved_lazily() -> None:
+    calls: list[str] = []
+
+    def resolve(key: str) -> Manifest | None:
+        calls.append(key)
+        return Manifest(dependencies=("network",), auto_load=("async_tcp",))
+
+    graph = _graph(resolve)
+    assert graph.nodes["api"].unresolved == ("AUTO_LOAD",)
+    graph.closure(["wifi"])
+    assert not calls
+    closure = graph.closure(["api"])
+    assert calls == ["api"]
+    assert "async_tcp" in closure.missing
+    assert graph.nodes["api"].unresolved == ()
+    graph.closure(["api"])
+    assert calls == ["api"]
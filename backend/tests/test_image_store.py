@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from eve_schema_service.image_store import ImageStore, url_key
+
+
+def test_image_store_dedupes_content(tmp_path: Path) -> None:
+    upstream = tmp_path / "upstream"
+    upstream.mkdir()
+    (upstream / "a.png").write_bytes(b"\x89PNG fake")
+    (upstream / "b.png").write_bytes(b"\x89PNG fake")
+    store = ImageStore(tmp_path / "images")
+
+    url_a = (upstream / "a.png").as_uri()
+    url_b = (upstream / "b.png").as_uri()
+    assert store.proxy_url(url_a) == f"api/espboards/img/{url_key(url_a)}"
+    assert store.lookup(url_key(url_a)) is None
+
+    img_a = store.get(store.register(url_a))
+    img_b = store.get(store.register(url_b))
+    assert img_a is not None and img_b is not None
+    assert img_a.path == img_b.path
+    assert img_a.content_type == "image/png"
+
+    # A fresh store (e.g. after a restart) serves from disk without the in-memory URL map.
+    assert ImageStore(tmp_path / "images").lookup(url_key(url_a)) == img_a
+    assert store.get("not-a-key") is None
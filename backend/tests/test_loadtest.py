@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from eve_schema_service import espboards
+
+BENCHMARKS = Path(__file__).resolve().parents[1] / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS))
+
+from fake_espboards import FakeEspboards  # noqa: E402
+
+
+def test_fake_espboards_serves_the_scraper(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(espboards, "_cache", {})
+    monkeypatch.setattr(espboards, "_details_cache", {})
+    monkeypatch.setattr(espboards._shared, "cache", None)
+    with FakeEspboards() as fake:
+        espboards.use_base_url(fake.url)
+        try:
+            catalog = espboards.get_board_catalog("esp32")
+            details = espboards.get_board_details("esp8266", "d1-mini")
+        finally:
+            espboards.use_base_url(espboards.ESPBOARDS_BASE)
+    assert len(catalog) == 12
+    assert {b["microcontroller"] for b in catalog} == {"esp32", "esp32s3", "esp32c3"}
+    assert catalog[0]["imageUrl"].startswith(fake.url + "/img/")
+    assert details["name"] == "WEMOS D1 Mini"
+    assert details["pinoutImageUrl"] == f"{fake.url}/img/d1-mini-pinout.png"
+    assert len(details["pins"]) == 23
+    assert details["pins"][0]["value"] == "GPIO0"
+    assert details["pins"][0]["meta"]["Function"] == "Boot"
+
+
+def test_loadtest_reports_per_endpoint_stats(tmp_path: Path) -> None:
+    report_path = tmp_path / "report.json"
+    subprocess.run(
+        [
+            sys.executable,
+            str(BENCHMARKS / "loadtest.py"),
+            "--users",
+            "2",
+            "--duration",
+            "2",
+            "--ramp-up",
+            "0",
+            "--think-ms",
+            "20",
+            "--mix",
+            "open=1,save=4,boards=1",
+            "--upstream-delay-ms",
+            "0",
+            "--output",
+            str(report_path),
+        ],
+        capture_output=True,
+        check=True,
+        timeout=180,
+    )
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["total"]["errors"] == 0
+    assert report["total"]["requests"] > 0
+    # Every session starts by opening its project.
+    opened = report["endpoints"]["GET /api/projects/{name}"]
+    assert opened["requests"] >= 2
+    assert set(opened["latencyMs"]) == {"p50", "p90", "p95", "p99", "mean", "max"}
+    assert report["endpoints"]["GET /api/schema/{domain}/{platform}"]["errorRate"] == 0
+    assert report["scenarios"]["open"]["failures"] == 0
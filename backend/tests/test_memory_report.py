@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+from eve_schema_service import memory_report
+from eve_schema_service.memory_report import (
+    attribute_import,
+    build_report,
+    deep_sizeof,
+    forget_payloads,
+    payload_bytes,
+    record_payload,
+    traced_by_owner,
+)
+
+
+def test_deep_sizeof_counts_shared_objects_once() -> None:
+    leaf = {"type": "string", "ui": {"origin": "x" * 1000}}
+    one = deep_sizeof({"a": leaf})
+    assert one > 1000
+    assert deep_sizeof({"a": leaf, "b": leaf}) < 2 * one
+    # Modules and classes are shared, not owned.
+    assert deep_sizeof([sys, dict]) == sys.getsizeof([sys, dict])
+
+
+def test_attribute_import_charges_the_first_import_only(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "eve_fake_component.py").write_text("DATA = [bytearray(4096) for _ in range(64)]\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(memory_report, "_ledger", memory_report._Ledger())
+    with attribute_import("sensor.fake"):
+        import eve_fake_component  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+    with attribute_import("sensor.fake"):
+        pass
+    monkeypatch.delitem(sys.modules, "eve_fake_component")
+
+    record_payload("sensor.fake", {"schema": {"type": "object"}})
+    record_payload("core:wifi", {"schema": {"type": "object", "properties": {}}})
+    report = build_report({"component_schema": (1, 10)}, limit=5)
+    (cost,) = report["imports"]["top"]
+    assert cost["key"] == "sensor.fake"
+    assert cost["modules"] >= 1
+    assert report["caches"] == {"component_schema": {"entries": 1, "bytes": 10}}
+    assert [p["key"] for p in report["payloads"]["top"]] == ["core:wifi", "sensor.fake"]
+    assert payload_bytes(core=True)[0] == 1
+    forget_payloads()
+    assert payload_bytes(core=False) == (0, 0)
+
+
+def test_traced_allocations_are_grouped_by_component() -> None:
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(4)
+    try:
+        source = "def build():\n    return [bytearray(1024) for _ in range(256)]\n"
+        namespace: dict = {}
+        exec(compile(source, "/x/esphome/components/fake_dht/sensor.py", "exec"), namespace)  # noqa: S102
+        kept = namespace["build"]()
+        owners = {o["owner"]: o for o in traced_by_owner(50)}
+        assert owners["esphome.components.fake_dht"]["bytes"] >= 256 * 1024
+        assert len(kept) == 256
+    finally:
+        if started:
+            tracemalloc.stop()
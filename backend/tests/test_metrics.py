@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from eve_schema_service.metrics import Registry, cache_collector, lru_stats
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = Registry()
+    hist = registry.histogram("t_duration_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+    counter = registry.counter("t_total", "Test counter.")
+    hist.observe(0.05, route="a")
+    hist.observe(0.1, route="a")
+    hist.observe(3.0, route="a")
+    counter.inc()
+
+    @lru_cache(maxsize=8)
+    def square(x: int) -> int:
+        return x * x
+
+    square(2)
+    square(2)
+    registry.add_collector(cache_collector({"square": lru_stats(square)}))
+
+    lines = registry.render().splitlines()
+    assert "# TYPE t_duration_seconds histogram" in lines
+    assert 't_duration_seconds_bucket{route="a",le="0.1"} 2' in lines
+    assert 't_duration_seconds_bucket{route="a",le="1"} 2' in lines
+    assert 't_duration_seconds_bucket{route="a",le="+Inf"} 3' in lines
+    assert 't_duration_seconds_count{route="a"} 3' in lines
+    assert "t_total 1" in lines
+    assert 'eve_cache_hits_total{cache="square"} 1' in lines
+    assert 'eve_cache_entries{cache="square"} 1' in lines
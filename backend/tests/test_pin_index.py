@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+
+from eve_schema_service.pin_index import CAPABILITIES, PinIndex, PinIndexBoard, parse_capabilities, pin_capabilities
+
+
+def _details(slug: str, micro: str, pins: dict[int, dict[str, str]]) -> tuple[dict, dict]:
+    entry = {"target": "esp32", "slug": slug, "name": slug.upper(), "microcontroller": micro}
+    payload = {"pins": [{"value": f"GPIO{g}", "label": str(g), "meta": meta} for g, meta in pins.items()]}
+    return entry, payload
+
+
+def test_pin_capabilities_normalizes_meta() -> None:
+    mask = pin_capabilities({"meta": {"ADC": "ADC1_CH3", "Touch": "Yes", "Notes": "Used by SPI flash"}})
+    assert mask & CAPABILITIES["adc"]
+    assert mask & CAPABILITIES["touch"]
+    assert mask & CAPABILITIES["flash"]
+    assert not pin_capabilities({"meta": {"ADC": "-"}}) & CAPABILITIES["adc"]
+
+
+def test_pin_index_query() -> None:
+    idx = PinIndex.from_details(
+        [
+            _details("s3-a", "esp32s3", {1: {"ADC": "ADC1_CH0"}, 26: {"ADC": "Yes", "Notes": "SPI flash"}}),
+            _details("s3-b", "esp32s3", {26: {"ADC": "Yes", "Notes": "PSRAM"}}),
+            _details("c3-a", "esp32c3", {2: {"ADC": "ADC1_CH2"}}),
+        ]
+    )
+    res = idx.query(has=parse_capabilities("adc"), exclude=parse_capabilities("flash"), microcontroller="esp32-s3")
+    assert [(b.slug, gpios) for b, gpios in res] == [("s3-a", [1])]
+    assert {b.slug for b, _ in idx.query(has=parse_capabilities("adc"))} == {"s3-a", "s3-b", "c3-a"}
+    assert not idx.query(target="esp8266")
+    assert [b.slug for b, _ in idx.query(target=" ESP32")] == ["s3-a", "s3-b", "c3-a"]
+
+
+def test_pin_index_query_cost_follows_matches() -> None:
+    # 800 boards x 40 pins; only pins 0-2 of every tenth board carry DAC + touch.
+    boards = [PinIndexBoard(" ESP32", f"b{b}", f"B{b}", "esp32") for b in range(800)]
+    dac_touch = CAPABILITIES["dac"] | CAPABILITIES["touch"]
+    rows = [(b, g, dac_touch if b % 10 == 0 and g < 3 else CAPABILITIES["adc"]) for b in range(800) for g in range(40)]
+    idx = PinIndex(boards, reversed(rows))
+    has = parse_capabilities("dac,touch")
+    res = idx.query(has=has, target="esp32")
+    assert len(res) == 80
+    assert res[0][0].slug == "b0"
+    assert sorted(res[0][1]) == [0, 1, 2]
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        idx.query(has=has, target="esp32")
+        best = min(best, time.perf_counter() - started)
+    # ~0.1 ms here; walking the whole bitmap once per match took tens of milliseconds.
+    assert best < 0.005
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import marshal
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from eve_schema_service.profiling import ProfileStore, ProfilingMiddleware, span
+
+
+def test_profiling_middleware_captures_single_request(tmp_path: Path) -> None:
+    async def slow(_: Request) -> PlainTextResponse:
+        with span("work", component="display.ili9xxx"):
+            total = sum(i * i for i in range(20_000))
+        return PlainTextResponse(str(total))
+
+    store = ProfileStore(tmp_path, keep=2)
+    app = ProfilingMiddleware(Starlette(routes=[Route("/slow", slow)]), store=store, token="sekret")
+    client = TestClient(app)
+
+    res = client.get("/slow", headers={"X-Eve-Profile": "cprofile"})
+    assert "x-eve-profile-id" not in res.headers  # no token, no profile
+
+    res = client.get("/slow?profile=1", headers={"Authorization": "Bearer sekret"})
+    profile_id = res.headers["x-eve-profile-id"]
+    mode, path = store.path(profile_id)
+    assert mode == "cprofile"
+    assert isinstance(marshal.loads(path.read_bytes()), dict)
+    assert "cumulative" in store.pstats_text(profile_id)
+
+    (meta,) = store.list()
+    assert meta["path"] == "/slow"
+    assert [s["name"] for s in meta["spans"]] == ["work"]
+    assert meta["spans"][0]["component"] == "display.ili9xxx"
+
+    for _ in range(3):
+        client.get("/slow", headers={"X-Eve-Profile": "sample", "X-Eve-Admin-Token": "sekret"})
+    assert len(store.list()) == 2
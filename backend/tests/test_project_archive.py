@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from eve_schema_service.project_archive import import_archive, iter_export
+from eve_schema_service.projects import list_projects, read_project_yaml, write_project_yaml
+
+
+@pytest.mark.parametrize("fmt", ["tar.gz", "zip"])
+def test_export_import_round_trip(tmp_path: Path, fmt: str) -> None:
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    write_project_yaml(src, "alpha", "esphome:\n  name: alpha\n")
+    write_project_yaml(src, "beta", "esphome:\n  name: beta\n")
+
+    archive = b"".join(iter_export(src, fmt))
+    results = import_archive(dst, io.BytesIO(archive))
+
+    assert [r["status"] for r in results] == ["written", "written"]
+    assert list_projects(dst) == ["alpha", "beta"]
+    assert read_project_yaml(dst, "beta") == "esphome:\n  name: beta\n"
+    assert [r["status"] for r in import_archive(dst, io.BytesIO(archive), overwrite=False)] == ["skipped", "skipped"]
+
+
+def test_import_rejects_unsafe_members(tmp_path: Path) -> None:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tf:
+        for name in ("../evil.yaml", "bad name!.yaml", "notes.txt", "ok.yml"):
+            info = tarfile.TarInfo(name)
+            info.size = 3
+            tf.addfile(info, io.BytesIO(b"a:\n"))
+    buf.seek(0)
+
+    results = import_archive(tmp_path, buf)
+    assert [r["status"] for r in results] == ["error", "error", "error", "written"]
+    assert list_projects(tmp_path) == ["ok"]
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+from eve_schema_service.project_events import ProjectChangeFeed
+from eve_schema_service.project_index import ProjectIndex
+from eve_schema_service.projects import write_project_yaml
+
+
+def test_project_index_listener_events(tmp_path: Path) -> None:
+    idx = ProjectIndex(tmp_path)
+    seen: list[tuple[str, str]] = []
+    idx.add_listener(lambda kind, name, _entry: seen.append((kind, name)))
+    idx.refresh()
+
+    write_project_yaml(tmp_path, "kitchen", "esphome:\n  name: kitchen\n")
+    idx.update("kitchen")
+    write_project_yaml(tmp_path, "kitchen", "esphome:\n  name: kitchen2\n")
+    idx.update("kitchen")
+    idx.update("kitchen")  # unchanged: no event
+    (tmp_path / "kitchen.yaml").unlink()
+    idx.update("kitchen")
+
+    assert seen == [("created", "kitchen"), ("modified", "kitchen"), ("deleted", "kitchen")]
+
+
+def test_change_feed_coalesces_and_streams() -> None:
+    async def scenario() -> list[str]:
+        feed = ProjectChangeFeed(debounce_s=0.01)
+        stream = feed.stream()
+        frames = [await anext(stream)]  # subscribe
+        feed.publish("created", "a", None)
+        feed.publish("deleted", "a", None)  # created+deleted cancels out
+        feed.publish("deleted", "b", None)
+        feed.publish("created", "b", None)  # deleted+created is a modification
+        frames.append(await asyncio.wait_for(anext(stream), timeout=2))
+        feed.close()
+        frames.extend([frame async for frame in stream])
+        return frames
+
+    frames = asyncio.run(scenario())
+    assert frames[0].startswith("retry:")
+    assert len(frames) == 2
+    data = json.loads(frames[1].split("data: ", 1)[1])
+    assert data == {"type": "modified", "name": "b", "etag": None}
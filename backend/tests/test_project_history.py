@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from eve_schema_service.http_errors import NotFound
+from eve_schema_service.project_history import HistoryStore
+from eve_schema_service.projects import write_project_yaml
+
+
+def test_history_records_revisions_behind_writes(tmp_path: Path) -> None:
+    projects = tmp_path / "projects"
+    projects.mkdir()
+    (projects / "demo.yaml").write_text("a: 0\n", encoding="utf-8")
+    store = HistoryStore(tmp_path / "history.sqlite3")
+
+    write_project_yaml(projects, "demo", "a: 1\nb: 2\n", history=store)
+    write_project_yaml(projects, "demo", "a: 1\nb: 2\n", history=store)  # unchanged: no new revision
+    write_project_yaml(projects, "demo", "a: 1\nb: 3\n", history=store)
+
+    revs = store.revisions("demo")
+    assert len(revs) == 3
+    assert store.get("demo", revs[-1].id) == "a: 0\n"
+    assert store.get("demo", revs[0].id) == "a: 1\nb: 3\n"
+    assert "-b: 2\n+b: 3\n" in store.diff("demo", revs[1].id, revs[0].id)
+    with pytest.raises(NotFound):
+        store.get("other", revs[0].id)
+
+
+def test_history_retention_and_gc(tmp_path: Path) -> None:
+    store = HistoryStore(tmp_path / "history.sqlite3", keep=2)
+    body = "".join(f"line {i}\n" for i in range(200))
+    for i in range(5):
+        store.record("demo", body + f"tail {i}\n")
+    assert len(store.revisions("demo")) == 2
+    store.gc()
+    stats = store.stats()
+    assert stats["revisions"] == 2
+    # Shared chunks are stored once: far less than two full copies.
+    assert stats["storedBytes"] < stats["logicalBytes"] / 2
+
+
+def test_gc_in_one_worker_keeps_chunks_another_is_reusing(tmp_path: Path) -> None:
+    # Two stores on one database, as with WORKERS>1; keep=1 makes every save prune and GC often.
+    stores = [HistoryStore(tmp_path / "history.sqlite3", keep=1) for _ in range(2)]
+    body = "".join(f"line {i}\n" for i in range(50))
+    errors: list[BaseException] = []
+
+    def save(store: HistoryStore, project: str) -> None:
+        try:
+            for i in range(150):
+                rev = store.record(project, body + f"{project} {i % 3}\n")
+                if rev is not None:
+                    assert store.get(project, rev.id).startswith(body)
+        except BaseException as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(s, p)) for s, p in zip(stores, ("a", "b"), strict=True)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    for project in ("a", "b"):
+        (latest,) = stores[0].revisions(project)
+        assert stores[1].get(project, latest.id).startswith(body)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from eve_schema_service.project_index import ProjectIndex
+from eve_schema_service.projects import write_project_yaml
+
+_YAML = """\
+substitutions:
+  devname: kitchen
+esphome:
+  name: ${devname}-sensor
+esp32:
+  board: esp32dev
+wifi:
+  password: !secret wifi_password
+sensor:
+  - platform: dht
+    pin: GPIO4
+  - platform: template
+    lambda: !lambda return 1.0;
+"""
+
+
+def test_project_index_summary_and_paging(tmp_path: Path) -> None:
+    idx = ProjectIndex(tmp_path)
+    assert idx.page() == (0, [])
+
+    write_project_yaml(tmp_path, "kitchen", _YAML)
+    write_project_yaml(tmp_path, "attic", "esphome:\n  name: attic\nesp8266:\n  board: d1_mini\n")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    total, page = idx.page(sort="componentCount", order="desc", limit=1)
+    assert total == 2
+    entry = page[0]
+    assert entry.name == "kitchen"
+    assert entry.summary.device_name == "kitchen-sensor"
+    assert entry.summary.platform == "esp32"
+    assert entry.summary.component_count == 4
+
+    assert [e.name for e in idx.page(offset=1)[1]] == ["kitchen"]
+
+    (tmp_path / "attic.yaml").unlink()
+    assert [e.name for e in idx.entries()] == ["kitchen"]
+
+
+def test_component_usage_tracks_changes(tmp_path: Path) -> None:
+    idx = ProjectIndex(tmp_path)
+    write_project_yaml(tmp_path, "kitchen", _YAML)
+    write_project_yaml(tmp_path, "hall", "wifi: {}\nsensor:\n  - platform: dht\n")
+    idx.refresh()
+    assert idx.usage.projects_for("sensor", "dht") == ["hall", "kitchen"]
+    assert idx.usage.projects_for("wifi") == ["hall", "kitchen"]
+    assert ("sensor", "template") in idx.usage.platform_components()
+
+    write_project_yaml(tmp_path, "hall", "sensor:\n  - platform: bme280_i2c\n")
+    idx.update("hall")
+    assert idx.usage.projects_for("sensor", "dht") == ["kitchen"]
+    assert idx.usage.projects_for("sensor", "bme280_i2c") == ["hall"]
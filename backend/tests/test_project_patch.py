@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import difflib
+
+import pytest
+
+from eve_schema_service.http_errors import BadRequest
+from eve_schema_service.project_patch import LineEdit, apply_line_edits, apply_unified_diff
+
+_BASE = "esphome:\n  name: a\nwifi:\n  ssid: x\nlogger:\n"
+
+
+def test_apply_line_edits() -> None:
+    edits = [LineEdit(start=4, end=5, text="logger:\n  level: DEBUG\n"), LineEdit(start=1, end=2, text="  name: b\n")]
+    assert apply_line_edits(_BASE, edits) == "esphome:\n  name: b\nwifi:\n  ssid: x\nlogger:\n  level: DEBUG\n"
+    with pytest.raises(BadRequest):
+        apply_line_edits(_BASE, [LineEdit(0, 2, ""), LineEdit(1, 3, "")])
+
+
+def test_apply_line_edits_terminates_replacement_lines() -> None:
+    assert apply_line_edits("a\nb\nc\n", [LineEdit(0, 1, "X")]) == "X\nb\nc\n"
+    assert apply_line_edits("a\nb\nc\n", [LineEdit(1, 1, "X")]) == "a\nX\nb\nc\n"
+    assert apply_line_edits("a\r\nb\r\n", [LineEdit(0, 1, "X")]) == "X\r\nb\r\n"
+    # At the end of the document the text is kept as sent, with or without a final newline.
+    assert apply_line_edits("a\nb\n", [LineEdit(1, 2, "X")]) == "a\nX"
+    assert apply_line_edits("a\nb\n", [LineEdit(0, 1, "")]) == "b\n"
+    # Inserting after an unterminated last line ends that line first.
+    assert apply_line_edits("a: 1", [LineEdit(1, 1, "b: 2\n")]) == "a: 1\nb: 2\n"
+    assert apply_line_edits("a: 1\nb: 2", [LineEdit(2, 2, "c: 3")]) == "a: 1\nb: 2\nc: 3"
+
+
+def test_apply_unified_diff_round_trips_difflib() -> None:
+    new = "esphome:\n  name: b\nwifi:\n  ssid: x\n  password: y\nlogger:\napi:\n"
+    diff = "".join(difflib.unified_diff(_BASE.splitlines(True), new.splitlines(True), "a", "b", n=1))
+    assert apply_unified_diff(_BASE, diff) == new
+    with pytest.raises(BadRequest):
+        apply_unified_diff(new, diff)
@@ -1,8 +1,23 @@
 from __future__ import annotations
 
+import fcntl
+import os
+import threading
 from pathlib import Path
 
-from eve_schema_service.projects import list_projects, read_project_yaml, write_project_yaml
+import pytest
+
+from eve_schema_service.fsutil import write_atomic
+from eve_schema_service.http_errors import PreconditionFailed
+from eve_schema_service.projects import (
+    etag_matches,
+    list_projects,
+    project_etag,
+    read_project,
+    read_project_yaml,
+    use_write_lock_dir,
+    write_project_yaml,
+)
 
 
 def test_projects_round_trip(tmp_path: Path) -> None:
@@ -10,3 +25,55 @@ def test_projects_round_trip(tmp_path: Path) -> None:
     write_project_yaml(tmp_path, "demo", "a: 1\n")
     assert list_projects(tmp_path) == ["demo"]
     assert read_project_yaml(tmp_path, "demo") == "a: 1\n"
+
+
+def test_project_etags_and_if_match(tmp_path: Path) -> None:
+    assert project_etag(tmp_path, "demo") is None
+    etag = write_project_yaml(tmp_path, "demo", "a: 1\n")
+    assert read_project(tmp_path, "demo").etag == etag == project_etag(tmp_path, "demo")
+
+    new_etag = write_project_yaml(tmp_path, "demo", "a: 2\n", if_match=etag)
+    assert new_etag != etag
+    with pytest.raises(PreconditionFailed):
+        write_project_yaml(tmp_path, "demo", "a: 3\n", if_match=etag)
+    assert read_project_yaml(tmp_path, "demo") == "a: 2\n"
+    # If-Match compares strongly: a weak validator never matches.
+    with pytest.raises(PreconditionFailed):
+        write_project_yaml(tmp_path, "demo", "a: 3\n", if_match=f"W/{new_etag}")
+    assert etag_matches(f"W/{new_etag}", new_etag, weak=True)
+    assert not etag_matches(f"W/{new_etag}", new_etag)
+    assert etag_matches("*", new_etag)
+    # No temp files are left behind next to the project.
+    assert [p.name for p in tmp_path.iterdir()] == ["demo.yaml"]
+
+
+def test_writes_wait_for_the_lock_file_of_other_workers(tmp_path: Path) -> None:
+    projects, locks = tmp_path / "projects", tmp_path / "locks"
+    etag = write_project_yaml(projects, "demo", "a: 1\n")
+    use_write_lock_dir(locks)
+    try:
+        # Another worker holding the project's lock file (flock is per open file, not per process).
+        locks.mkdir()
+        fd = os.open(locks / "demo.lock", os.O_RDWR | os.O_CREAT)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        errors: list[Exception] = []
+
+        def save() -> None:
+            try:
+                write_project_yaml(projects, "demo", "a: 2\n", if_match=etag)
+            except PreconditionFailed as e:
+                errors.append(e)
+
+        writer = threading.Thread(target=save)
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive()
+        # The other worker's save lands while it holds the lock...
+        write_atomic(projects / "demo.yaml", b"a: 3\n")
+        os.close(fd)
+        writer.join(5)
+        # ...so ours must see the new ETag and fail instead of overwriting it.
+        assert len(errors) == 1
+        assert read_project_yaml(projects, "demo") == "a: 3\n"
+    finally:
+        use_write_lock_dir(None)
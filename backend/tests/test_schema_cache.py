@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from eve_schema_service.esphome_introspect import schema_cache_token
+
+
+def test_schema_cache_token_tracks_allowlist() -> None:
+    base = schema_cache_token(None)
+    assert base == schema_cache_token(None)
+    assert schema_cache_token({("sensor", "dht")}) != base
+    assert schema_cache_token({("sensor", "dht"), ("switch", "gpio")}) == schema_cache_token(
+        {("switch", "gpio"), ("sensor", "dht")}
+    )
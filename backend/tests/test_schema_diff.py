@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import copy
+
+import pytest
+
+from eve_schema_service import json_codec
+from eve_schema_service.http_errors import BadRequest
+from eve_schema_service.schema_diff import (
+    SchemaBundle,
+    SchemaBundleStore,
+    affected_configs,
+    config_option_usage,
+    diff_bundles,
+    hash_schema,
+    read_bundle,
+    write_bundle,
+)
+from eve_schema_service.shared_cache import SharedCache
+
+DHT = {
+    "type": "object",
+    "required": ["pin"],
+    "properties": {
+        "pin": {"type": "pin", "capabilities": ["gpio"]},
+        "model": {
+            "type": "enum",
+            "default": "AUTO_DETECT",
+            "options": [{"value": "AUTO_DETECT"}, {"value": "DHT11"}, {"value": "DHT22"}],
+        },
+        "update_interval": {"type": "duration", "default": "60s"},
+        "temperature": {"type": "object", "properties": {"name": {"type": "string"}}},
+    },
+}
+WIFI = {"type": "object", "properties": {"ssid": {"type": "string"}, "fast_connect": {"type": "boolean"}}}
+GPIO = {"type": "object", "properties": {"pin": {"type": "pin"}}}
+
+
+def _bundle(complete: bool = True, **schemas) -> SchemaBundle:
+    return SchemaBundle(esphome_version="x", converter_version=1, schemas=schemas, complete=complete)
+
+
+def _new_dht() -> dict:
+    dht = copy.deepcopy(DHT)
+    dht["required"] = ["pin", "model"]
+    dht["properties"]["model"]["options"] = [{"value": "DHT22"}, {"value": "AUTO_DETECT"}]
+    dht["properties"]["update_interval"]["default"] = "30s"
+    dht["properties"]["temperature"]["properties"]["name"]["ui"] = {"group": "entity"}
+    return dht
+
+
+def test_hash_ignores_presentation_and_option_order() -> None:
+    reordered = copy.deepcopy(DHT)
+    reordered["properties"]["model"]["options"].reverse()
+    reordered["properties"]["pin"]["ui"] = {"origin": "x"}
+    reordered["reason"] = "Unsupported validator"
+    assert hash_schema(reordered).digest == hash_schema(DHT).digest
+    assert hash_schema(_new_dht()).digest != hash_schema(DHT).digest
+
+
+def test_diff_skips_equal_components_and_reports_option_changes() -> None:
+    old = _bundle(**{"sensor.dht": DHT, "core:wifi": WIFI, "binary_sensor.gpio": GPIO})
+    new = _bundle(**{"sensor.dht": _new_dht(), "core:wifi": copy.deepcopy(WIFI), "core:api": WIFI})
+    diff = diff_bundles(old, new)
+    assert diff.unchanged == 1
+    assert [(c.key, c.status) for c in diff.components] == [
+        ("binary_sensor.gpio", "removed"),
+        ("core:api", "added"),
+        ("sensor.dht", "changed"),
+    ]
+    changes = {(c.path, c.kind): (c.old, c.new) for c in diff.get("sensor.dht").changes}
+    assert changes == {
+        ("model", "required"): (False, True),
+        ("model", "enum"): (["DHT11"], []),
+        ("update_interval", "default"): ("60s", "30s"),
+    }
+
+
+def test_partial_bundles_do_not_report_missing_components() -> None:
+    diff = diff_bundles(_bundle(**{"sensor.dht": DHT}), _bundle(False, **{"core:wifi": WIFI}))
+    assert [c.key for c in diff.components] == ["core:wifi"]
+    assert diff.not_compared == ("sensor.dht",)
+
+
+def test_affected_configs_lists_projects_by_reason() -> None:
+    old = _bundle(**{"sensor.dht": DHT, "binary_sensor.gpio": GPIO})
+    new = _bundle(**{"sensor.dht": _new_dht()})
+    configs = {
+        "kitchen": "sensor:\n  - platform: dht\n    pin: GPIO4\n    model: DHT11\n    update_interval: 10s\n",
+        "hall": "binary_sensor:\n  - platform: gpio\n    pin: GPIO5\n",
+        "porch": "sensor:\n  - platform: dht\n    pin: GPIO4\n    model: DHT22\n",
+        "attic": "wifi:\n  ssid: x\n",
+    }
+    affected = {
+        a["project"]: {(i["path"], i["kind"]) for i in a["impacts"]}
+        for a in affected_configs(diff_bundles(old, new), configs)
+    }
+    assert affected == {
+        "kitchen": {("model", "enum")},
+        "hall": {("", "removed")},
+        "porch": {("update_interval", "default")},
+    }
+
+
+def test_config_option_usage_keys_and_paths() -> None:
+    usage = config_option_usage(
+        {"esphome": {"name": "x"}, "sensor": [{"platform": "dht", "temperature": {"filters": [{"offset": 1}]}}]}
+    )
+    assert usage["core:esphome"] == {"name": {"x"}}
+    assert usage["sensor.dht"]["temperature.filters.offset"] == {"1"}
+
+
+def test_bundle_round_trip_and_shared_cache_source(tmp_path) -> None:
+    bundle = _bundle(**{"sensor.dht": DHT})
+    write_bundle(tmp_path / "a.json.gz", bundle)
+    loaded = read_bundle(tmp_path / "a.json.gz")
+    assert loaded.schemas == bundle.schemas
+    assert loaded.hashes == bundle.hashes
+
+    cache = SharedCache(tmp_path / "cache.sqlite3")
+    cache.put("schema", "sensor.dht", json_codec.dumps({"schema": DHT}), token="old")
+    cache.put("schema", "core:wifi", json_codec.dumps({"schema": WIFI}), token="new")
+    cache.close()
+    from_cache = read_bundle(tmp_path / "cache.sqlite3")
+    assert list(from_cache.schemas) == ["core:wifi"]
+    assert not from_cache.complete
+
+
+def test_store_caches_diffs_and_validates_versions(tmp_path) -> None:
+    store = SchemaBundleStore(tmp_path)
+    store.snapshot("2024.1.0", lambda: _bundle(**{"sensor.dht": DHT}))
+    store.put("2024.2.0", _bundle(**{"sensor.dht": _new_dht()}))
+    assert store.versions() == ["2024.1.0", "2024.2.0"]
+    diff = store.diff("2024.1.0", "2024.2.0")
+    assert store.diff("2024.1.0", "2024.2.0") is diff
+    with pytest.raises(BadRequest):
+        store.path("../etc")
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from eve_schema_service.search_index import SearchIndex
+
+
+def _schema(description: str | None, **properties: dict) -> dict:
+    return {"docs": {"description": description}, "schema": {"type": "object", "properties": properties}}
+
+
+def _index() -> SearchIndex:
+    index = SearchIndex()
+    index.add_component("sensor.dht", description="DHT temperature and humidity sensors.")
+    index.add_component("sensor.adc")
+    index.add_component("core:wifi")
+    index.add_schema(
+        "sensor.dht",
+        _schema(
+            None,
+            update_interval={"type": "string"},
+            model={"type": "enum", "options": [{"value": "DHT22", "label": "DHT22"}, {"value": "AM2302"}]},
+            temperature={"type": "object", "properties": {"accuracy_decimals": {"type": "integer"}}},
+        ),
+    )
+    index.add_schema("sensor.adc", _schema(None, update_interval={"type": "string"}, attenuation={"type": "string"}))
+    index.add_schema(
+        "core:wifi",
+        _schema(None, networks={"type": "array", "items": {"type": "object", "properties": {"ssid": {}}}}),
+    )
+    return index
+
+
+def test_search_requires_every_term_and_reports_matches() -> None:
+    index = _index()
+    total, hits = index.search("update_interval accuracy_decimals")
+    assert total == 1
+    assert hits[0].to_json() == {
+        "kind": "platform",
+        "domain": "sensor",
+        "platform": "dht",
+        "score": hits[0].to_json()["score"],
+        "matches": [
+            {"term": "update_interval", "field": "option", "value": "update_interval"},
+            {"term": "accuracy_decimals", "field": "option", "value": "temperature.accuracy_decimals"},
+        ],
+    }
+    assert [h.key for h in index.search("update_interval")[1]] == ["sensor.adc", "sensor.dht"]
+    assert [h.key for h in index.search("am2302")[1]] == ["sensor.dht"]
+    assert [h.key for h in index.search("humidity")[1]] == ["sensor.dht"]
+    assert [h.key for h in index.search("ssid")[1]] == ["core:wifi"]
+    assert index.search("update_interval ssid") == (0, [])
+
+
+def test_search_ranks_names_first_and_completes_last_term() -> None:
+    index = _index()
+    index.add_component("text_sensor.dht_info")
+    assert [h.key for h in index.search("dht")[1]][0] == "sensor.dht"
+    assert [h.key for h in index.search("atten")[1]] == ["sensor.adc"]
+    assert [h.key for h in index.search("dht", include=lambda k: k != "sensor.dht")[1]] == ["text_sensor.dht_info"]
+
+
+def test_schema_updates_replace_previous_postings() -> None:
+    index = _index()
+    index.add_schema("sensor.adc", _schema(None, raw={"type": "boolean"}))
+    assert [h.key for h in index.search("attenuation")[1]] == []
+    assert [h.key for h in index.search("raw")[1]] == ["sensor.adc"]
+    index.remove("sensor.adc")
+    assert index.search("raw") == (0, [])
+    assert index.stats() == {"documents": 2, "withSchema": 2, "unavailable": 0, "tokens": index.stats()["tokens"]}
+
+
+def test_index_is_complete_once_every_schema_is_indexed_or_unavailable() -> None:
+    index = _index()
+    assert index.complete()
+    index.add_component("display.ili9xxx")
+    assert not index.complete()
+    index.mark_unavailable("display.ili9xxx")
+    assert index.complete()
+    assert index.stats()["unavailable"] == 1
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from eve_schema_service.shared_cache import SharedCache
+
+
+def test_shared_cache_is_visible_across_instances(tmp_path: Path) -> None:
+    path = tmp_path / "shared.sqlite3"
+    writer, reader = SharedCache(path), SharedCache(path)
+    assert reader.get("schema", "sensor.dht", token="t1") is None
+
+    writer.put("schema", "sensor.dht", b'{"x":1}', token="t1")
+    assert reader.get("schema", "sensor.dht", token="t1") == b'{"x":1}'
+    assert reader.get("schema", "sensor.dht", token="t2") is None  # other ESPHome/converter version
+    assert reader.get("schema", "sensor.dht", token="t1", max_age_s=-1) is None
+    assert reader.counts() == (1, 3, 1)
+
+    writer.put("schema", "switch.gpio", b"{}", token="t0")
+    assert writer.prune("schema", token="t1") == 1
+    assert reader.get("schema", "switch.gpio", token="t0") is None
+    writer.close()
+    reader.close()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# The Docker healthcheck gives the service a 10 s start period; keep well inside it.
+IMPORT_BUDGET_S = 1.5
+FIRST_META_BUDGET_S = 5.0
+
+
+def test_importing_the_app_has_no_side_effects(tmp_path: Path) -> None:
+    projects_dir = tmp_path / "projects"
+    code = (
+        "import sys, eve_schema_service.server as s;"
+        "print(s.svc.configured, 'voluptuous' in sys.modules, 'esphome' in sys.modules)"
+    )
+    env = {**os.environ, "PYTHONPATH": str(BACKEND / "src"), "PROJECTS_DIR": str(projects_dir)}
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False", "False"]
+    assert not projects_dir.exists()
+
+
+def test_startup_within_budget() -> None:
+    out = subprocess.run(
+        [sys.executable, str(BACKEND / "benchmarks" / "startup.py"), "--runs", "1", "--top", "0"],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+    result = json.loads(out.stdout)
+    assert result["heavyModulesImported"] == []
+    assert result["importSeconds"] < IMPORT_BUDGET_S
+    assert result["firstMetaSeconds"]["max"] < FIRST_META_BUDGET_S
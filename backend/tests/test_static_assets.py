@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from eve_schema_service.static_assets import PrecompressedStaticFiles, is_fingerprinted, precompress_directory
+
+
+def test_is_fingerprinted() -> None:
+    assert is_fingerprinted("assets/chunk-Bx3k_9aQ.js")
+    assert is_fingerprinted("assets/logo-4f1a2b3c.svg")
+    assert is_fingerprinted("assets/chunk-Bx3k_9aQ.js.map")
+    assert not is_fingerprinted("assets/app.js")
+    assert not is_fingerprinted("index.html")
+
+
+def test_precompressed_static_serving(tmp_path: Path) -> None:
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<!doctype html>" + "<p>x</p>" * 400, encoding="utf-8")
+    script = "console.log('hello');\n" * 200
+    (tmp_path / "assets" / "chunk-Bx3k_9aQ.js").write_text(script, encoding="utf-8")
+
+    assert precompress_directory(tmp_path) >= 2
+    assert precompress_directory(tmp_path) == 0  # siblings are up to date
+
+    client = TestClient(Starlette(routes=[Mount("/", app=PrecompressedStaticFiles(directory=tmp_path, html=True))]))
+
+    res = client.get("/assets/chunk-Bx3k_9aQ.js", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert res.headers["content-type"].startswith("text/javascript")
+    assert res.text == script
+    assert int(res.headers["content-length"]) == len(gzip.compress(script.encode(), compresslevel=9, mtime=0))
+
+    res = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in res.headers
+    assert res.headers["cache-control"] == "no-cache"
+    etag = res.headers["etag"]
+    assert client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": etag}).status_code == 304
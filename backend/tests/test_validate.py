@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import signal
+
+from eve_schema_service.validate import ValidationLimits, _limit_exceeded, validate_with_esphome_cli
+
+CONFIG = """\
+esphome:
+  name: sandbox-test
+esp32:
+  board: esp32dev
+wifi:
+  ssid: !secret wifi_ssid
+  password: !secret wifi_password
+sensor:
+  - platform: template
+    name: Value
+    lambda: return 1.0;
+"""
+
+
+def test_valid_config_reports_resource_usage() -> None:
+    res = validate_with_esphome_cli(CONFIG)
+    assert res.ok, res.stderr
+    assert res.limit_exceeded is None
+    assert res.peak_rss_bytes is not None and res.peak_rss_bytes > 10 << 20
+    assert res.cpu_seconds is not None and res.cpu_seconds > 0
+    assert res.wall_seconds > 0
+
+
+def test_memory_limit_fails_the_run() -> None:
+    # Far below what the interpreter needs to load ESPHome.
+    res = validate_with_esphome_cli(CONFIG, limits=ValidationLimits(memory_mb=16))
+    assert not res.ok
+
+
+def test_limit_classification() -> None:
+    limits = ValidationLimits(cpu_s=5)
+    assert _limit_exceeded(-signal.SIGXCPU, "", 5.0, limits) == "cpu"
+    assert _limit_exceeded(-signal.SIGKILL, "", 6.0, limits) == "cpu"
+    assert _limit_exceeded(-signal.SIGXFSZ, "", 0.1, limits) == "file_size"
+    assert _limit_exceeded(1, "...\nMemoryError\n", 0.5, limits) == "memory"
+    assert _limit_exceeded(1, "OSError: [Errno 12] Cannot allocate memory", 0.5, limits) == "memory"
+    assert _limit_exceeded(2, "Failed config", 0.5, limits) is None
+
+
+def test_timeout_kills_the_run() -> None:
+    res = validate_with_esphome_cli(CONFIG, timeout_s=0.2)
+    assert not res.ok
+    assert res.limit_exceeded == "timeout"
+    assert res.wall_seconds < 5
+
+
+def test_runs_in_the_configured_work_dir(tmp_path) -> None:
+    limits = ValidationLimits(tmp_dir=tmp_path)
+    assert limits.work_root() == str(tmp_path)
+    res = validate_with_esphome_cli("esphome: [", limits=limits)
+    assert not res.ok
+    assert res.limit_exceeded is None
+    assert not list(tmp_path.iterdir())
@@ -1,8 +1,19 @@
 import { apiJson } from "./services/api-client";
 import type { ComponentRef, CoreSchemaResponse, EspBoardDetails, EspBoardsCatalog, SchemaResponse } from "./types";
 
-export async function getMeta(): Promise<{ version: string; generatedAt: string; esphomeVersion?: string | null }> {
-  return apiJson("api/meta");
+// Set from /api/meta; schema URLs carrying it are cached by the browser until ESPHome or the allowlist changes.
+let schemaVersion: string | null = null;
+
+function withSchemaVersion(path: string): string {
+  return schemaVersion ? `${path}?v=${encodeURIComponent(schemaVersion)}` : path;
+}
+
+type Meta = { version: string; generatedAt: string; esphomeVersion?: string | null; schemaVersion?: string | null };
+
+export async function getMeta(): Promise<Meta> {
+  const meta = await apiJson<Meta>("api/meta");
+  schemaVersion = meta.schemaVersion ?? null;
+  return meta;
 }
 
 export async function getComponents(): Promise<{ allowlistMode: number; components: ComponentRef[] }> {
@@ -10,11 +21,11 @@ export async function getComponents(): Promise<{ allowlistMode: number; componen
 }
 
 export async function getSchema(domain: string, platform: string): Promise<SchemaResponse> {
-  return apiJson(`api/schema/${encodeURIComponent(domain)}/${encodeURIComponent(platform)}`);
+  return apiJson(withSchemaVersion(`api/schema/${encodeURIComponent(domain)}/${encodeURIComponent(platform)}`));
 }
 
 export async function getCoreSchema(name: string): Promise<CoreSchemaResponse> {
-  return apiJson(`api/core-schema/${encodeURIComponent(name)}`);
+  return apiJson(withSchemaVersion(`api/core-schema/${encodeURIComponent(name)}`));
 }
 
 export async function getEspBoards(target: "esp32" | "esp8266"): Promise<EspBoardsCatalog> {